@@ -0,0 +1,180 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Providers for a compact representation of detector events, with single precision
+coordinates and weights and without variances.
+
+Unit event weights of a compact event list are counts, so the variances are
+rebuilt from the counts when histogramming, see :py:func:`poisson_variances`
+and :py:func:`histogram_events`. Plain ``hist`` sums the weights in single precision
+and returns no variances.
+"""
+
+import scipp as sc
+import scippnexus as snx
+
+from ess.reduce.nexus.workflow import assemble_detector_data
+
+from .conversion import beamline_coords, tof_to_wavelength
+from .frames import assemble_detector_data_in_frames
+from .types import (
+    CoordTransformGraph,
+    DetectorLtotal,
+    EmptyDetector,
+    FrameAcceptance,
+    NeXusData,
+    RawDetector,
+    RunType,
+    TofDetector,
+    WavelengthConversionFactor,
+    WavelengthDetector,
+)
+
+
+def compact_events(da: sc.DataArray) -> sc.DataArray:
+    """
+    Convert the weights and the floating-point coordinates of events to single
+    precision and drop the variances of the weights.
+
+    Parameters
+    ----------
+    da:
+        Binned data.
+    """
+    constituents = da.bins.constituents
+    events = constituents['data']
+    data = events.data.to(dtype='float32', copy=False)
+    if data.variances is not None:
+        data = data.copy(deep=False)
+        data.variances = None
+    events = sc.DataArray(
+        data,
+        coords={
+            name: coord.to(dtype='float32', copy=False)
+            if coord.dtype == sc.DType.float64
+            else coord
+            for name, coord in events.coords.items()
+        },
+        masks=events.masks,
+    )
+    return da.assign(
+        sc.bins(
+            begin=constituents['begin'],
+            end=constituents['end'],
+            dim=constituents['dim'],
+            data=events,
+        )
+    )
+
+
+def poisson_variances(da: sc.DataArray) -> sc.DataArray:
+    """
+    Set the variances of a histogram of counts without variances to the counts.
+
+    Data that already has variances, or that is not in counts, is returned unchanged.
+
+    Parameters
+    ----------
+    da:
+        Histogrammed data.
+    """
+    if da.variances is not None or da.unit != 'counts':
+        return da
+    out = da.copy(deep=False)
+    out.data = out.data.copy()
+    out.variances = out.values
+    return out
+
+
+def _double_precision_weights(da: sc.DataArray) -> sc.DataArray:
+    # Histograms are accumulated in the dtype of the weights, and single precision
+    # sums stop counting at 2**24 events per bin.
+    if da.bins.constituents['data'].dtype != sc.DType.float32:
+        return da
+    return da.bins.assign(da.bins.data.to(dtype='float64'))
+
+
+def histogram_events(da: sc.DataArray) -> sc.DataArray:
+    """
+    Histogram binned data into a single bin per bin, like ``da.hist()``, and return
+    other data unchanged.
+
+    Unlike ``da.hist()``, single precision event weights are summed in double
+    precision, and the variances of counts without variances are set to the counts.
+    Use this instead of ``hist`` for compact events, or histogram the events in
+    wavelength with ``WavelengthSpectrum`` or ``WavelengthCube``.
+
+    Parameters
+    ----------
+    da:
+        Binned or histogrammed data.
+    """
+    if not isinstance(da, sc.DataArray) or da.bins is None:
+        return da
+    return poisson_variances(_double_precision_weights(da).hist())
+
+
+def assemble_compact_detector_data(
+    detector: EmptyDetector[RunType],
+    neutron_data: NeXusData[snx.NXdetector, RunType],
+) -> RawDetector[RunType]:
+    """
+    Assemble a detector data array with compact event data.
+
+    Replaces :py:func:`ess.reduce.nexus.workflow.assemble_detector_data`.
+    """
+    return RawDetector[RunType](
+        compact_events(assemble_detector_data(detector, neutron_data))
+    )
+
+
+def assemble_compact_detector_data_in_frames(
+    detector: EmptyDetector[RunType],
+    neutron_data: NeXusData[snx.NXdetector, RunType],
+    acceptance: FrameAcceptance[RunType],
+    ltotal: DetectorLtotal[RunType],
+) -> RawDetector[RunType]:
+    """
+    Assemble a detector data array with compact event data, keeping only the events
+    that can have been transmitted by the chopper cascade.
+
+    See :py:func:`ess.imaging.frames.assemble_detector_data_in_frames`.
+    """
+    return RawDetector[RunType](
+        compact_events(
+            assemble_detector_data_in_frames(detector, neutron_data, acceptance, ltotal)
+        )
+    )
+
+
+def compute_compact_detector_wavelength(
+    tof_data: TofDetector[RunType],
+    factor: WavelengthConversionFactor[RunType],
+    graph: CoordTransformGraph[RunType],
+) -> WavelengthDetector[RunType]:
+    """
+    Compute the wavelength of neutrons detected by the detector, as single precision.
+
+    The time-of-flight is converted to single precision and then overwritten with the
+    wavelength, so the result has a ``'wavelength'`` but no ``'tof'`` coordinate.
+    The pixel coordinates are the same as with
+    :py:func:`ess.imaging.conversion.compute_detector_wavelength`.
+
+    Parameters
+    ----------
+    tof_data:
+        Data with a time-of-flight coordinate.
+    factor:
+        Per-pixel factor converting time-of-flight to wavelength.
+    graph:
+        Graph of coordinate transformations.
+    """
+    tof = tof_data.bins.coords['tof'].to(dtype='float32')
+    wavelength = tof_to_wavelength(
+        tof_data.bins.assign_coords(tof=tof), factor, inplace=True
+    )
+    return WavelengthDetector[RunType](beamline_coords(wavelength, graph))
+
+
+providers = (assemble_compact_detector_data, compute_compact_detector_wavelength)
+"""Providers replacing the event-level steps of the workflow with compact events."""
@@ -4,15 +4,19 @@
 Contains the providers to compute neutron time-of-flight and wavelength.
 """
 
+import scipp as sc
 import scippneutron as scn
 import scippnexus as snx
+from scipp.constants import h, m_n
 
 from .types import (
     CoordTransformGraph,
+    EmptyDetector,
     GravityVector,
     Position,
     RunType,
     TofDetector,
+    WavelengthConversionFactor,
     WavelengthDetector,
 )
 
@@ -36,27 +40,120 @@ def make_coordinate_transform_graph(
     return CoordTransformGraph(graph)
 
 
+def compute_wavelength_conversion_factor(
+    detector: EmptyDetector[RunType],
+    graph: CoordTransformGraph[RunType],
+) -> WavelengthConversionFactor[RunType]:
+    """
+    Compute the per-pixel factor that converts time-of-flight to wavelength.
+
+    Only the detector geometry (without any events) goes through the coordinate
+    transformation graph, so the result can be computed once and re-used for all
+    runs recorded with the same geometry.
+
+    Parameters
+    ----------
+    detector:
+        Detector geometry with a position coordinate.
+    graph:
+        Graph of coordinate transformations.
+    """
+    ltotal = detector.transform_coords(
+        "Ltotal", graph=graph, keep_intermediate=False
+    ).coords["Ltotal"]
+    return WavelengthConversionFactor[RunType](
+        (h / m_n / ltotal).to(unit='angstrom/us')
+    )
+
+
+def tof_to_wavelength(
+    da: sc.DataArray, factor: sc.Variable, *, inplace: bool = False
+) -> sc.DataArray:
+    """
+    Convert the time-of-flight coordinate of events (or histogram bin edges) to
+    wavelength by multiplying with a pre-computed per-pixel factor.
+
+    Parameters
+    ----------
+    da:
+        Data with a time-of-flight coordinate named ``'tof'``.
+    factor:
+        Per-pixel conversion factor, see :func:`compute_wavelength_conversion_factor`.
+    inplace:
+        If ``True``, the time-of-flight values are overwritten with the wavelengths
+        and the ``'tof'`` coordinate is renamed to ``'wavelength'``.
+        This avoids allocating a new buffer for the events but modifies ``da``.
+        If ``False``, a new wavelength coordinate is added and ``'tof'`` is kept.
+    """
+    coords = da.coords if da.bins is None else da.bins.coords
+    tof = coords['tof']
+    elements = tof if tof.bins is None else tof.bins
+    factor = factor.to(unit=sc.units.angstrom / elements.unit, dtype=elements.dtype)
+    if not inplace:
+        wavelength = tof * factor
+        if da.bins is None:
+            return da.assign_coords(wavelength=wavelength)
+        return da.bins.assign_coords(wavelength=wavelength)
+    wavelength = coords.pop('tof')
+    wavelength *= factor
+    coords['wavelength'] = wavelength
+    return da
+
+
+def beamline_coords(da: sc.DataArray, graph: dict) -> sc.DataArray:
+    """
+    Add the ``source_position`` and the ``Ltotal`` of the pixels to detector data,
+    as unaligned coordinates like :py:meth:`scipp.DataArray.transform_coords` does.
+
+    Only the pixel positions go through the graph, so the cost does not depend on
+    the number of events.
+
+    Parameters
+    ----------
+    da:
+        Detector data with a position coordinate.
+    graph:
+        Graph of coordinate transformations.
+    """
+    pixels = sc.DataArray(
+        sc.zeros(sizes=da.coords['position'].sizes),
+        coords={'position': da.coords['position']},
+    ).transform_coords('Ltotal', graph=graph)
+    names = ('position', 'source_position', 'Ltotal')
+    out = da.assign_coords({name: pixels.coords[name] for name in names})
+    for name in names:
+        out.coords.set_aligned(name, False)
+    return out
+
+
 def compute_detector_wavelength(
     tof_data: TofDetector[RunType],
+    factor: WavelengthConversionFactor[RunType],
     graph: CoordTransformGraph[RunType],
 ) -> WavelengthDetector[RunType]:
     """
     Compute the wavelength of neutrons detected by the detector.
 
+    As with ``transform_coords``, the ``source_position`` and the ``Ltotal`` of the
+    pixels are added as unaligned coordinates, see :func:`beamline_coords`.
+
     Parameters
     ----------
     tof_data:
         Data with a time-of-flight coordinate.
+    factor:
+        Per-pixel factor converting time-of-flight to wavelength.
     graph:
         Graph of coordinate transformations.
     """
     return WavelengthDetector[RunType](
-        tof_data.transform_coords("wavelength", graph=graph)
+        beamline_coords(tof_to_wavelength(tof_data, factor), graph)
     )
 
 
 providers = (
     make_coordinate_transform_graph,
+    compute_wavelength_conversion_factor,
     compute_detector_wavelength,
 )
 """Providers to compute neutron time-of-flight and wavelength."""
@@ -0,0 +1,267 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for rejecting events that cannot have been transmitted by the chopper cascade,
+before they go through the time-of-flight and wavelength conversions.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import scipp as sc
+import scippnexus as snx
+from scippneutron.chopper import DiskChopper
+
+from ess.reduce.nexus.workflow import assemble_detector_data
+
+from .types import (
+    DetectorLtotal,
+    EmptyDetector,
+    FrameAcceptance,
+    NeXusData,
+    RawDetector,
+    RunType,
+)
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    '''Intersection of two lists of disjoint intervals with shape ``(n, 2)``.'''
+    lo = np.maximum(a[:, None, 0], b[None, :, 0]).ravel()
+    hi = np.minimum(a[:, None, 1], b[None, :, 1]).ravel()
+    keep = lo < hi
+    return np.stack([lo[keep], hi[keep]], axis=-1)
+
+
+def _chopper_windows(
+    chopper: DiskChopper, pulse_frequency: sc.Variable
+) -> tuple[float, np.ndarray]:
+    '''Rotation period and open windows within one rotation, in microseconds.'''
+    period = (1.0 / abs(chopper.frequency)).to(unit='us').value
+    open_ = chopper.time_offset_open(pulse_frequency=pulse_frequency)
+    close = chopper.time_offset_close(pulse_frequency=pulse_frequency)
+    begin = open_.to(unit='us').values % period
+    duration = (close - open_).to(unit='us').values
+    windows = np.unique(np.round(np.stack([begin, duration], axis=-1), 3), axis=0)
+    return period, np.stack([windows[:, 0], windows[:, 0] + windows[:, 1]], axis=-1)
+
+
+def _transmitted_wavelengths(
+    choppers: list[tuple[float, float, np.ndarray]],
+    t0: float,
+    wavelength_range: tuple[float, float],
+    alpha: float,
+) -> np.ndarray:
+    '''Wavelength intervals of neutrons emitted at ``t0`` that pass all choppers.'''
+    accepted = np.array([wavelength_range])
+    for distance, period, windows in choppers:
+        # Arrival time at the chopper is t0 + alpha * distance * wavelength
+        scale = alpha * distance
+        t_min = t0 + scale * wavelength_range[0]
+        t_max = t0 + scale * wavelength_range[1]
+        n = np.arange(
+            np.floor((t_min - windows[:, 1].max()) / period),
+            np.ceil((t_max - windows[:, 0].min()) / period) + 1,
+        )
+        times = (windows[None, :, :] + n[:, None, None] * period).reshape(-1, 2)
+        accepted = _intersect(accepted, (times - t0) / scale)
+        if len(accepted) == 0:
+            break
+    return accepted
+
+
+def compute_frame_acceptance(
+    choppers: Mapping[str, DiskChopper],
+    *,
+    source_position: sc.Variable,
+    distance: sc.Variable,
+    pulse_period: sc.Variable,
+    source_time: sc.Variable | None = None,
+    wavelength_range: tuple[sc.Variable, sc.Variable] | None = None,
+    time_resolution: sc.Variable | None = None,
+) -> sc.DataArray:
+    """
+    Compute the event time offsets at which neutrons transmitted by a chopper cascade
+    can arrive at a given distance from the source.
+
+    For every emission time in ``source_time``, the wavelength bands transmitted by
+    all choppers are computed exactly as intersections of the open windows.
+    The arrival times of these bands are then folded into the pulse period.
+    The result is conservative: a bin is accepted if any transmitted neutron can
+    arrive in it, and accepted regions are widened by one bin on each side.
+
+    Parameters
+    ----------
+    choppers:
+        The disk choppers of the beamline.
+    source_position:
+        Position of the source.
+    distance:
+        Bin edges of the distance from the source along the flight path.
+    pulse_period:
+        Period of the source pulses.
+    source_time:
+        Emission times of neutrons within a pulse.
+        Defaults to 0 - 6 ms in steps of 0.1 ms, which covers the ESS pulse.
+    wavelength_range:
+        Range of wavelengths emitted by the source. Defaults to 0.1 - 20 Å.
+    time_resolution:
+        Width of the event time offset bins. Defaults to 10 μs.
+
+    Returns
+    -------
+    :
+        Boolean data array with dimensions ``distance`` and ``event_time_offset``.
+    """
+    if source_time is None:
+        source_time = sc.linspace('time', 0.0, 6.0, 61, unit='ms')
+    if wavelength_range is None:
+        wavelength_range = (
+            sc.scalar(0.1, unit='angstrom'),
+            sc.scalar(20.0, unit='angstrom'),
+        )
+    if time_resolution is None:
+        time_resolution = sc.scalar(10.0, unit='us')
+    alpha = (sc.constants.m_n / sc.constants.h).to(unit='us/(angstrom*m)').value
+    period = pulse_period.to(unit='us').value
+    nbins = int(np.ceil(period / time_resolution.to(unit='us').value))
+    bin_width = period / nbins
+    pulse_frequency = 1.0 / pulse_period
+    cascade = [
+        (
+            sc.norm(chopper.axle_position - source_position).to(unit='m').value,
+            *_chopper_windows(chopper, pulse_frequency),
+        )
+        for chopper in choppers.values()
+    ]
+    lam_range = tuple(w.to(unit='angstrom').value for w in wavelength_range)
+    t0 = source_time.to(unit='us').values
+    t0_step = np.max(np.diff(t0), initial=0.0)
+    edges = distance.to(unit='m').values
+
+    starts = []
+    ends = []
+    for t in t0:
+        bands = _transmitted_wavelengths(cascade, t, lam_range, alpha)
+        # Arrival times grow with both distance and wavelength, so the arrivals of a
+        # band within a distance bin are bounded by the bin edges.
+        starts.append(t + alpha * edges[:-1, None] * bands[None, :, 0])
+        ends.append(t + t0_step + alpha * edges[1:, None] * bands[None, :, 1])
+    start = np.floor(np.concatenate(starts, axis=1) / bin_width).astype(np.int64) - 1
+    end = np.floor(np.concatenate(ends, axis=1) / bin_width).astype(np.int64) + 2
+
+    ndist = len(edges) - 1
+    accepted = np.zeros((ndist, nbins), dtype=bool)
+    if start.size:
+        start = np.maximum(start, 0)
+        full = (end - start) >= nbins
+        accepted[full.any(axis=1)] = True
+        nframes = int(end.max() // nbins) + 1
+        counts = np.zeros((ndist, nframes * nbins + 1), dtype=np.int64)
+        rows = np.broadcast_to(np.arange(ndist)[:, None], start.shape)
+        np.add.at(counts, (rows, start), 1)
+        np.add.at(counts, (rows, end), -1)
+        occupied = np.cumsum(counts[:, :-1], axis=1) > 0
+        accepted |= occupied.reshape(ndist, nframes, nbins).any(axis=1)
+
+    return sc.DataArray(
+        sc.array(dims=['distance', 'event_time_offset'], values=accepted),
+        coords={
+            'distance': distance.to(unit='m'),
+            'event_time_offset': sc.linspace(
+                'event_time_offset', 0.0, period, nbins + 1, unit='us'
+            ),
+        },
+    )
+
+
+def reject_events_outside_frames(
+    da: sc.DataArray, acceptance: sc.DataArray, ltotal: sc.Variable
+) -> sc.DataArray:
+    """
+    Remove events with an event time offset that is not accepted at the distance of
+    their pixel.
+
+    Parameters
+    ----------
+    da:
+        Binned detector data with an ``event_time_offset`` event coordinate.
+    acceptance:
+        Accepted event time offsets as a function of distance,
+        see :py:func:`compute_frame_acceptance`.
+    ltotal:
+        Distance from the source of each pixel.
+    """
+    if da.bins is None:
+        raise ValueError("reject_events_outside_frames requires binned data.")
+    constituents = da.bins.constituents
+    dim = constituents['dim']
+    buffer = constituents['data']
+    begin = constituents['begin'].values.ravel()
+    sizes = constituents['end'].values.ravel() - begin
+    # Buffer index of every event, in bin order. Bins need not be contiguous, so the
+    # events are looked up in place instead of copying the whole buffer.
+    offsets = np.cumsum(sizes) - sizes
+    event_index = np.arange(sizes.sum()) + np.repeat(begin - offsets, sizes)
+
+    distance_edges = acceptance.coords['distance'].to(unit='m').values
+    pixel_distance = np.clip(
+        np.searchsorted(
+            distance_edges,
+            ltotal.broadcast(sizes=da.sizes).to(unit='m').values.ravel(),
+            side='right',
+        )
+        - 1,
+        0,
+        len(distance_edges) - 2,
+    )
+    eto_edges = acceptance.coords['event_time_offset']
+    eto = buffer.coords['event_time_offset']
+    bin_width = (eto_edges[1] - eto_edges[0]).to(unit=eto.unit).value
+    nbins = acceptance.sizes['event_time_offset']
+    eto_index = np.clip(
+        (eto.values[event_index].astype(np.float64) // bin_width).astype(np.int64),
+        0,
+        nbins - 1,
+    )
+    event_pixel = np.repeat(np.arange(len(sizes)), sizes)
+    keep = np.zeros(buffer.sizes[dim], dtype=bool)
+    keep[event_index] = acceptance.values[pixel_distance[event_pixel], eto_index]
+
+    # Kept events stay in buffer order, so the bin bounds are shifted by the number
+    # of rejected events before them.
+    kept_before = np.concatenate([[0], np.cumsum(keep)])
+    shape = constituents['begin'].shape
+    dims = constituents['begin'].dims
+    return da.assign(
+        sc.bins(
+            begin=sc.array(
+                dims=dims, values=kept_before[begin].reshape(shape), unit=None
+            ),
+            end=sc.array(
+                dims=dims,
+                values=kept_before[begin + sizes].reshape(shape),
+                unit=None,
+            ),
+            dim=dim,
+            data=buffer[sc.array(dims=[dim], values=keep)],
+        )
+    )
+
+
+def assemble_detector_data_in_frames(
+    detector: EmptyDetector[RunType],
+    neutron_data: NeXusData[snx.NXdetector, RunType],
+    acceptance: FrameAcceptance[RunType],
+    ltotal: DetectorLtotal[RunType],
+) -> RawDetector[RunType]:
+    """
+    Assemble a detector data array with event data, keeping only the events that can
+    have been transmitted by the chopper cascade.
+
+    Replaces :py:func:`ess.reduce.nexus.workflow.assemble_detector_data`.
+    """
+    return RawDetector[RunType](
+        reject_events_outside_frames(
+            assemble_detector_data(detector, neutron_data), acceptance, ltotal
+        )
+    )
@@ -0,0 +1,293 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for building time-of-flight lookup tables from a simulation of the chopper
+cascade, run in parallel and cached on disk.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import scipp as sc
+from numpy.typing import NDArray
+from scippneutron.chopper import DiskChopper
+
+from ess.reduce import time_of_flight
+from ess.reduce.nexus.types import AnyRun
+
+_CACHE_VERSION = 2
+_NEUTRONS_PER_BATCH = 100_000
+
+
+def default_cache_dir() -> Path:
+    """
+    Directory where lookup tables are cached.
+
+    Set the ``ESSIMAGING_CACHE_DIR`` environment variable to override the default
+    ``essimaging/tof-lookup-tables`` directory inside the user cache directory.
+    """
+    if (path := os.environ.get('ESSIMAGING_CACHE_DIR')) is not None:
+        return Path(path)
+    base = os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')
+    return Path(base) / 'essimaging' / 'tof-lookup-tables'
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, sc.Variable):
+        return {
+            'values': np.asarray(value.values).tolist(),
+            'unit': None if value.unit is None else str(value.unit),
+            'dims': list(value.dims),
+            'dtype': str(value.dtype),
+        }
+    if dataclasses.is_dataclass(value):
+        return {
+            field.name: _to_json(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+        }
+    if isinstance(value, Mapping):
+        return {str(key): _to_json(val) for key, val in sorted(value.items())}
+    if isinstance(value, tuple | list):
+        return [_to_json(val) for val in value]
+    return value
+
+
+def _variable_from_json(value: dict) -> sc.Variable:
+    if value['dtype'] == 'vector3':
+        return sc.vectors(
+            dims=value['dims'], values=value['values'], unit=value['unit']
+        )
+    return sc.array(
+        dims=value['dims'],
+        values=value['values'],
+        unit=value['unit'],
+        dtype=value['dtype'],
+    )
+
+
+def tof_lookup_table_cache_key(**parameters: Any) -> str:
+    """
+    Hash of the parameters of a lookup table simulation.
+
+    Parameters
+    ----------
+    parameters:
+        Choppers, source position, distance range and all other settings of the
+        simulation and the table.
+    """
+    payload = json.dumps(
+        {'version': _CACHE_VERSION, **_to_json(parameters)}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _simulate_batch(
+    choppers: dict[str, dict], source_position: dict, **kwargs: Any
+) -> dict[str, dict]:
+    # Scipp objects cannot be pickled, so the inputs and outputs of the worker
+    # processes are passed as plain values.
+    results = time_of_flight.simulate_chopper_cascade_using_tof(
+        choppers={
+            name: DiskChopper(
+                **{
+                    field: None if value is None else _variable_from_json(value)
+                    for field, value in chopper.items()
+                }
+            )
+            for name, chopper in choppers.items()
+        },
+        source_position=_variable_from_json(source_position),
+        **kwargs,
+    )
+    return {
+        field.name: _to_json(getattr(results, field.name))
+        for field in dataclasses.fields(results)
+    }
+
+
+def _split_into_batches(neutrons: int, seed: int | None) -> tuple[NDArray, list[int]]:
+    """Sizes and random seeds of the batches of a simulation."""
+    nbatches = max(1, -(-neutrons // _NEUTRONS_PER_BATCH))
+    sizes = np.full(nbatches, neutrons // nbatches)
+    sizes[: neutrons % nbatches] += 1
+    seeds = [
+        int(s.generate_state(1)[0])
+        for s in np.random.SeedSequence(seed).spawn(nbatches)
+    ]
+    return sizes, seeds
+
+
+def simulate_chopper_cascade_in_parallel(
+    choppers: Mapping[str, DiskChopper],
+    *,
+    source_position: sc.Variable,
+    neutrons: int,
+    pulse_stride: int = 1,
+    seed: int | None = None,
+    facility: str = 'ess',
+    max_workers: int | None = None,
+) -> time_of_flight.SimulationResults:
+    """
+    Simulate neutrons propagating through a chopper cascade with the ``tof`` package,
+    splitting the neutrons into independent batches run on worker processes.
+
+    The neutrons are split into batches of at most 100,000 neutrons, each with its
+    own random seed derived from ``seed``. The batches only depend on ``neutrons``
+    and ``seed``, so the results are reproducible for a given seed regardless of the
+    number of workers.
+
+    Parameters
+    ----------
+    choppers:
+        The disk choppers of the beamline.
+    source_position:
+        Position of the source, in the same coordinate system as the choppers.
+    neutrons:
+        Total number of neutrons to simulate.
+    pulse_stride:
+        Number of pulses to simulate.
+    seed:
+        Seed for the random number generator.
+    facility:
+        Facility of the source, see the ``tof`` package.
+    max_workers:
+        The number of worker processes. Defaults to the number of cores.
+        This does not change the results.
+    """
+    sizes, seeds = _split_into_batches(neutrons, seed)
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers or os.cpu_count() or 1, len(sizes))
+    ) as pool:
+        futures = [
+            pool.submit(
+                _simulate_batch,
+                choppers=_to_json(dict(choppers)),
+                source_position=_to_json(source_position),
+                neutrons=int(size),
+                pulse_stride=pulse_stride,
+                seed=batch_seed,
+                facility=facility,
+            )
+            for size, batch_seed in zip(sizes, seeds, strict=True)
+        ]
+        batches = [future.result() for future in futures]
+    return time_of_flight.SimulationResults(
+        **{
+            field: sc.concat(
+                [_variable_from_json(batch[field]) for batch in batches], 'event'
+            )
+            for field in ('time_of_arrival', 'speed', 'wavelength', 'weight')
+        },
+        distance=_variable_from_json(batches[0]['distance']),
+    )
+
+
+def build_tof_lookup_table(
+    choppers: Mapping[str, DiskChopper],
+    *,
+    source_position: sc.Variable,
+    ltotal_range: tuple[sc.Variable, sc.Variable],
+    neutrons: int = 1_000_000,
+    pulse_stride: int = 1,
+    distance_resolution: sc.Variable | None = None,
+    time_resolution: sc.Variable | None = None,
+    error_threshold: float = 0.1,
+    seed: int | None = 1234,
+    facility: str = 'ess',
+    max_workers: int | None = None,
+    use_cache: bool = True,
+    cache_dir: str | os.PathLike | None = None,
+) -> sc.DataArray:
+    """
+    Build a time-of-flight lookup table, or load it from the cache.
+
+    Tables are stored in ``cache_dir`` under a hash of all the parameters below
+    (except ``max_workers``, which does not change the table), so a table is only
+    simulated again when the choppers, the source or the distance range change.
+
+    Parameters
+    ----------
+    choppers:
+        The disk choppers of the beamline.
+    source_position:
+        Position of the source, in the same coordinate system as the choppers.
+    ltotal_range:
+        Range of total flight path lengths covered by the table.
+    neutrons:
+        Number of neutrons to simulate.
+    pulse_stride:
+        Stride of used pulses.
+    distance_resolution:
+        Resolution of the distance axis. Defaults to 0.1 m.
+    time_resolution:
+        Resolution of the event time offset axis. Defaults to 250 μs.
+    error_threshold:
+        Relative standard deviation of the time-of-flight above which table
+        entries are masked.
+    seed:
+        Seed for the random number generator of the simulation.
+    facility:
+        Facility of the source, see the ``tof`` package.
+    max_workers:
+        The number of worker processes used for the simulation.
+    use_cache:
+        If ``False``, always run the simulation and do not store the table.
+    cache_dir:
+        Directory of the cache. Defaults to :py:func:`default_cache_dir`.
+    """
+    if distance_resolution is None:
+        distance_resolution = sc.scalar(0.1, unit='m')
+    if time_resolution is None:
+        time_resolution = sc.scalar(250.0, unit='us')
+    parameters = {
+        'choppers': choppers,
+        'source_position': source_position,
+        'ltotal_range': ltotal_range,
+        'neutrons': neutrons,
+        'pulse_stride': pulse_stride,
+        'distance_resolution': distance_resolution,
+        'time_resolution': time_resolution,
+        'error_threshold': error_threshold,
+        'seed': seed,
+        'facility': facility,
+    }
+    path = None
+    if use_cache:
+        key = tof_lookup_table_cache_key(**parameters)
+        path = Path(default_cache_dir() if cache_dir is None else cache_dir)
+        path = path / f'tof-lookup-table-{key}.h5'
+        if path.exists():
+            return sc.io.load_hdf5(path)
+
+    wf = time_of_flight.TofLookupTableWorkflow()
+    wf[time_of_flight.SimulationResults] = simulate_chopper_cascade_in_parallel(
+        choppers,
+        source_position=source_position,
+        neutrons=neutrons,
+        pulse_stride=pulse_stride,
+        seed=seed,
+        facility=facility,
+        max_workers=max_workers,
+    )
+    wf[time_of_flight.DiskChoppers[AnyRun]] = choppers
+    wf[time_of_flight.SourcePosition] = source_position
+    wf[time_of_flight.LtotalRange] = ltotal_range
+    wf[time_of_flight.PulseStride] = pulse_stride
+    wf[time_of_flight.DistanceResolution] = distance_resolution
+    wf[time_of_flight.TimeResolution] = time_resolution
+    wf[time_of_flight.LookupTableRelativeErrorThreshold] = error_threshold
+    table = wf.compute(time_of_flight.TimeOfFlightLookupTable)
+
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        table.save_hdf5(tmp)
+        os.replace(tmp, path)
+    return table
@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for reducing event data in chunks of neutron pulses, so that the memory usage
+is bounded by the size of a chunk instead of the size of the run.
+
+The same machinery is used for live reduction, where event batches arrive from a
+source while the run is still acquiring.
+"""
+
+import queue
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import sciline
+import scipp as sc
+import scippnexus as snx
+
+from ess.reduce.nexus import load_data, open_component_group
+from ess.reduce.nexus.types import NeXusData, NeXusDataLocationSpec
+from ess.reduce.streaming import EternalAccumulator, StreamProcessor
+
+from .compact import histogram_events
+from .types import SampleRun
+
+
+def number_of_pulses(location: NeXusDataLocationSpec) -> int:
+    """
+    Return the number of neutron pulses (``event_time_zero``) recorded in the event
+    data of a detector.
+
+    Parameters
+    ----------
+    location:
+        Location of the detector data in the NeXus file.
+    """
+    with open_component_group(location, nx_class=snx.NXdetector) as detector:
+        events = list(detector[snx.NXevent_data].values())
+        if len(events) != 1:
+            raise ValueError(
+                f"Expected exactly one NXevent_data group in detector "
+                f"'{location.component_name}', got {len(events)}."
+            )
+        return events[0].sizes['event_time_zero']
+
+
+def iter_pulse_chunks(
+    location: NeXusDataLocationSpec, pulses_per_chunk: int
+) -> Iterator[sc.DataArray]:
+    """
+    Load the event data of a detector in chunks of consecutive neutron pulses.
+
+    Parameters
+    ----------
+    location:
+        Location of the detector data in the NeXus file.
+    pulses_per_chunk:
+        Number of pulses (``event_time_zero`` entries) to load at once.
+    """
+    npulses = number_of_pulses(location)
+    for start in range(0, npulses, pulses_per_chunk):
+        yield load_data(
+            location.filename,
+            selection=slice(start, min(start + pulses_per_chunk, npulses)),
+            entry_name=location.entry_name,
+            component_name=location.component_name,
+        )
+
+
+def replay_pulse_chunks(
+    workflow: sciline.Pipeline,
+    *,
+    run_types: Iterable[sciline.typing.Key] = (SampleRun,),
+    pulses_per_chunk: int = 1000,
+) -> Iterator[dict[sciline.typing.Key, sc.DataArray]]:
+    """
+    Replay the detector events of NeXus files as a stream of batches.
+
+    This is a stand-in for a live event source, e.g., for testing
+    :py:func:`reduce_live` with recorded data.
+
+    Parameters
+    ----------
+    workflow:
+        Workflow defining the files and detector to load.
+    run_types:
+        The runs to replay, one after the other.
+    pulses_per_chunk:
+        Number of pulses in each batch.
+
+    Yields
+    ------
+    :
+        Dicts mapping ``NeXusData[NXdetector, RunType]`` to a batch of events.
+    """
+    for run in run_types:
+        key = NeXusData[snx.NXdetector, run]
+        location = workflow.compute(NeXusDataLocationSpec[snx.NXdetector, run])
+        for chunk in iter_pulse_chunks(location, pulses_per_chunk):
+            yield {key: chunk}
+
+
+def queue_source(
+    source: queue.Queue, *, timeout: float | None = None
+) -> Iterator[dict[sciline.typing.Key, sc.DataArray]]:
+    """
+    Yield event batches put into an in-process queue.
+
+    The producer puts dicts mapping ``NeXusData[NXdetector, RunType]`` to a batch of
+    events into the queue, and ``None`` to signal the end of the stream.
+
+    Parameters
+    ----------
+    source:
+        The queue to consume.
+    timeout:
+        Maximum time in seconds to wait for a batch.
+        Raises :py:class:`queue.Empty` if no batch arrives in time.
+        Waits indefinitely by default.
+    """
+    while (batch := source.get(timeout=timeout)) is not None:
+        yield batch
+
+
+def _make_processor(
+    workflow: sciline.Pipeline,
+    targets: Iterable[sciline.typing.Key],
+    accumulate: Iterable[sciline.typing.Key],
+    run_types: Iterable[sciline.typing.Key],
+) -> StreamProcessor:
+    return StreamProcessor(
+        workflow,
+        dynamic_keys=tuple(NeXusData[snx.NXdetector, run] for run in run_types),
+        target_keys=tuple(targets),
+        accumulators={
+            key: EternalAccumulator(preprocess=histogram_events) for key in accumulate
+        },
+    )
+
+
+def reduce_live(
+    workflow: sciline.Pipeline,
+    source: Iterable[dict[sciline.typing.Key, sc.DataArray]],
+    *,
+    targets: Iterable[sciline.typing.Key],
+    accumulate: Iterable[sciline.typing.Key],
+    run_types: Iterable[sciline.typing.Key] = (SampleRun,),
+    update_every: int = 1,
+) -> Iterator[dict[sciline.typing.Key, Any]]:
+    """
+    Incrementally reduce event batches from a live source.
+
+    Only the new events of each batch are converted to time-of-flight and wavelength
+    and masked. The results are added to the histograms given by ``accumulate``,
+    so that the cost of an update is proportional to the size of the batch.
+    Runs that are not in ``run_types``, e.g., a previously recorded open beam run,
+    are loaded and reduced from file once.
+
+    Parameters
+    ----------
+    workflow:
+        Workflow with all parameters set, e.g., an ``OdinBraggEdgeWorkflow``.
+    source:
+        Iterable of dicts mapping ``NeXusData[NXdetector, RunType]`` to a batch of
+        events, e.g., :py:func:`queue_source` or :py:func:`replay_pulse_chunks`.
+    targets:
+        Keys to compute.
+    accumulate:
+        Keys of histograms that are summed over all batches.
+        See :py:func:`reduce_in_pulse_chunks`.
+    run_types:
+        The runs whose events arrive from ``source``.
+    update_every:
+        Compute the targets after every ``update_every`` batches.
+        The targets are always computed after the last batch.
+
+    Yields
+    ------
+    :
+        Dicts of the targets, computed from all batches received so far.
+    """
+    processor = _make_processor(workflow, targets, accumulate, run_types)
+    pending = 0
+    for batch in source:
+        processor.accumulate(batch)
+        pending += 1
+        if pending == update_every:
+            pending = 0
+            yield processor.finalize()
+    if pending:
+        yield processor.finalize()
+
+
+def reduce_in_pulse_chunks(
+    workflow: sciline.Pipeline,
+    *,
+    targets: Iterable[sciline.typing.Key],
+    accumulate: Iterable[sciline.typing.Key],
+    run_types: Iterable[sciline.typing.Key] = (SampleRun,),
+    pulses_per_chunk: int = 1000,
+) -> dict[sciline.typing.Key, Any]:
+    """
+    Reduce event data by streaming chunks of neutron pulses through a workflow.
+
+    Everything that does not depend on the events (geometry, time-of-flight lookup
+    table, wavelength conversion factors, ...) is computed once.
+    Each chunk is then converted to time-of-flight and wavelength and added to the
+    histograms given by ``accumulate``, so that the full event list is never held in
+    memory. Binned (event) results pushed to the accumulators are histogrammed first,
+    e.g., accumulating ``CorrectedDetector[SampleRun]`` yields a detector image.
+    This uses :py:func:`ess.imaging.compact.histogram_events`, so compact events are
+    summed in double precision and get Poisson variances.
+
+    The keys in ``accumulate`` must be linear in the events, such as
+    ``WavelengthSpectrum[SampleRun]`` or ``WavelengthCube[SampleRun]``.
+    Ratios such as ``TransmissionSpectrum`` must be given as ``targets`` and are
+    computed from the accumulated histograms once all chunks have been processed.
+
+    Parameters
+    ----------
+    workflow:
+        Workflow with all parameters set, e.g., an ``OdinBraggEdgeWorkflow`` or
+        a ``TblWorkflow``.
+    targets:
+        Keys to compute.
+    accumulate:
+        Keys of histograms that are summed over all chunks.
+    run_types:
+        The runs to stream. The detector events of each run are loaded in chunks.
+    pulses_per_chunk:
+        Number of pulses in each chunk.
+
+    Returns
+    -------
+    :
+        Dict of the computed targets.
+    """
+    run_types = tuple(run_types)
+    processor = _make_processor(workflow, targets, accumulate, run_types)
+    for batch in replay_pulse_chunks(
+        workflow, run_types=run_types, pulses_per_chunk=pulses_per_chunk
+    ):
+        processor.accumulate(batch)
+    return processor.finalize()
@@ -2,24 +2,64 @@
 # Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
 
 
-from .analysis import blockify, laplace_2d, resample, resize, sharpness
+from .analysis import (
+    blockify,
+    convolve_2d,
+    laplace_2d,
+    resample,
+    resample_events,
+    rescale,
+    resize,
+    sharpness,
+)
+from .bragg_edge import fit_bragg_edges
+from .focus import estimate_focus_point, find_focus, focus_metrics, stream_sharpness
+from .pyramid import ImagePyramid
+from .registration import apply_shifts, estimate_shifts
 from .resolution import (
+    cut_off_frequency_map,
+    estimate_cut_off_frequencies,
     estimate_cut_off_frequency,
+    local_modulation_transfer_function,
     maximum_resolution_achievable,
+    maximum_resolution_frontier,
     modulation_transfer_function,
     mtf_less_than,
+    slanted_edge_mtf,
+)
+from .saturation import (
+    IncrementalSaturationIndicator,
+    saturation_indicator,
+    saturation_map,
 )
-from .saturation import saturation_indicator
 
 __all__ = [
+    "ImagePyramid",
+    "IncrementalSaturationIndicator",
+    "apply_shifts",
     "blockify",
+    "convolve_2d",
+    "cut_off_frequency_map",
+    "estimate_cut_off_frequencies",
     "estimate_cut_off_frequency",
+    "estimate_focus_point",
+    "estimate_shifts",
+    "find_focus",
+    "fit_bragg_edges",
+    "focus_metrics",
     "laplace_2d",
+    "local_modulation_transfer_function",
     "maximum_resolution_achievable",
+    "maximum_resolution_frontier",
     "modulation_transfer_function",
     "mtf_less_than",
     "resample",
+    "resample_events",
+    "rescale",
     "resize",
     "saturation_indicator",
+    "saturation_map",
     "sharpness",
+    "slanted_edge_mtf",
+    "stream_sharpness",
 ]
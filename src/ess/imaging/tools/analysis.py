@@ -5,10 +5,13 @@ Tools for image analysis and manipulation.
 """
 
 from collections.abc import Callable
-from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
 
 import numpy as np
 import scipp as sc
+from numpy.typing import ArrayLike
+from scipy import sparse
 
 
 def blockify(
@@ -74,6 +77,85 @@ def resample(
     return out
 
 
+def resample_events(da: sc.DataArray, sizes: dict[str, int]) -> sc.DataArray:
+    """
+    Resample binned (event) data by grouping the pixel bins into super-pixels of
+    specified sizes. The events of all pixels in a super-pixel end up in the same bin.
+    This is the equivalent of :func:`resample` with ``method='sum'`` for event data,
+    but without histogramming the events.
+    The shape of the input data must be divisible by the block sizes.
+
+    The super-pixel bins are computed from the begin and end indices of the pixel
+    bins. The output bins are views into the original event buffer only if the
+    events of the pixels in each super-pixel are contiguous in the buffer. For
+    freshly grouped data, this is only the case when the innermost dimension alone
+    is resampled. In all other cases, e.g., for super-pixels of 4x4 pixels, the
+    whole event list is copied into the new bins.
+
+    Masks that depend on the resampled dimensions are converted to event masks,
+    which allocates a mask with one element per event.
+
+    To histogram the events of super-pixels without copying the events, fold the
+    pixel dimensions with :func:`blockify` instead, and histogram over the block
+    dimensions, e.g., ``blocked.hist(wavelength=bins, dim=block_dims)`` where
+    ``block_dims`` are the dimensions of ``blocked`` that are not in ``da``.
+
+    Parameters
+    ----------
+    da:
+        The binned data to resample.
+    sizes:
+        A dictionary specifying the block sizes for each dimension.
+        For example, ``{'x': 4, 'y': 4}`` will group blocks of 4x4 pixels.
+    """
+    if da.bins is None:
+        raise ValueError(
+            "resample_events requires binned data, use resample for dense data."
+        )
+    pixel_masks = {
+        name: mask for name, mask in da.masks.items() if set(mask.dims) & set(sizes)
+    }
+    if pixel_masks:
+        da = da.drop_masks(list(pixel_masks)).bins.assign_masks(
+            {name: sc.bins_like(da.data, mask) for name, mask in pixel_masks.items()}
+        )
+    blocked = blockify(da, sizes=sizes)
+    block_dims = [dim for dim in blocked.dims if dim not in da.dims]
+    outer_dims = [dim for dim in blocked.dims if dim in da.dims]
+
+    parts = blocked.bins.constituents
+    begin = parts['begin'].transpose([*outer_dims, *block_dims]).copy()
+    end = parts['end'].transpose([*outer_dims, *block_dims]).copy()
+    begin = begin.flatten(dims=block_dims, to='pixel_in_block')
+    end = end.flatten(dims=block_dims, to='pixel_in_block')
+    if sc.all(end['pixel_in_block', :-1] == begin['pixel_in_block', 1:]).value:
+        data = sc.bins(
+            begin=begin['pixel_in_block', 0],
+            end=end['pixel_in_block', -1],
+            dim=parts['dim'],
+            data=parts['data'],
+        )
+    else:
+        data = blocked.bins.concat(block_dims).data
+
+    out = sc.DataArray(
+        data,
+        coords={
+            name: coord
+            for name, coord in blocked.coords.items()
+            if set(coord.dims) <= set(outer_dims)
+        },
+        masks={
+            name: mask
+            for name, mask in blocked.masks.items()
+            if set(mask.dims) <= set(outer_dims)
+        },
+    )
+    if 'position' in blocked.coords:
+        out.coords['position'] = blocked.coords['position'].mean(block_dims)
+    return out
+
+
 def resize(
     image: sc.Variable | sc.DataArray,
     sizes: dict[str, int],
@@ -114,6 +196,357 @@ def resize(
     return resample(image, sizes=block_sizes, method=method)
 
 
+def _rescale_weights(n_in: int, n_out: int, mode: str) -> sparse.csr_array:
+    """Banded matrix mapping ``n_in`` pixels to ``n_out`` pixels along one axis."""
+    if mode == 'bilinear':
+        # Centers of the output pixels in units of input pixel indices
+        centers = np.clip((np.arange(n_out) + 0.5) * n_in / n_out - 0.5, 0, n_in - 1)
+        lower = np.minimum(np.floor(centers).astype(np.int64), max(n_in - 2, 0))
+        fraction = centers - lower
+        rows = np.arange(n_out)
+        if n_in == 1:
+            return sparse.csr_array(
+                (np.ones(n_out), (rows, lower)), shape=(n_out, n_in)
+            )
+        return sparse.csr_array(
+            (
+                np.concatenate([1 - fraction, fraction]),
+                (np.concatenate([rows, rows]), np.concatenate([lower, lower + 1])),
+            ),
+            shape=(n_out, n_in),
+        )
+    # Overlap of the output pixel [j, j + 1) * scale with the input pixel [i, i + 1)
+    scale = n_in / n_out
+    edges = np.arange(n_out + 1) * scale
+    first = np.floor(edges[:-1]).astype(np.int64)
+    last = np.minimum(np.ceil(edges[1:]).astype(np.int64), n_in)
+    counts = last - first
+    rows = np.repeat(np.arange(n_out), counts)
+    cols = np.arange(counts.sum()) + np.repeat(
+        first - (np.cumsum(counts) - counts), counts
+    )
+    weights = np.clip(
+        np.minimum(edges[rows + 1], cols + 1) - np.maximum(edges[rows], cols), 0, None
+    )
+    if mode == 'mean':
+        weights /= scale
+    return sparse.csr_array((weights, (rows, cols)), shape=(n_out, n_in))
+
+
+def _rescale_axis(
+    values: np.ndarray, axis: int, n_out: int, mode: str, power: int = 1
+) -> np.ndarray:
+    """Rescale one axis of an array, with the weights raised to ``power``."""
+    n_in = values.shape[axis]
+    if mode != 'bilinear' and n_in % n_out == 0:
+        # Whole input pixels per output pixel, sum over folded blocks
+        block = n_in // n_out
+        shape = (*values.shape[:axis], n_out, block, *values.shape[axis + 1 :])
+        out = values.reshape(shape).sum(axis=axis + 1)
+        if mode == 'mean':
+            out /= block**power
+        return out
+    weights = _rescale_weights(n_in, n_out, mode)
+    if power != 1:
+        weights = weights.power(power)
+    moved = np.moveaxis(values, axis, 0)
+    out = weights @ moved.reshape(n_in, -1)
+    return np.moveaxis(out.reshape(n_out, *moved.shape[1:]), 0, axis)
+
+
+def rescale(
+    image: sc.Variable | sc.DataArray,
+    sizes: dict[str, int],
+    mode: Literal['sum', 'mean', 'bilinear'] = 'sum',
+) -> sc.Variable | sc.DataArray:
+    """
+    Resize an image to arbitrary sizes.
+
+    Unlike :func:`resize`, the original sizes do not need to be divisible by the
+    requested sizes, and images can also be enlarged.
+    With the area-weighted modes ``'sum'`` and ``'mean'``, each input pixel
+    contributes to an output pixel with the fraction of its area that overlaps with
+    the output pixel. This is identical to :func:`resize` when the sizes are
+    divisible. With ``'bilinear'``, the output pixels are interpolated linearly from
+    the input pixels nearest to their centers.
+    Each dimension is resampled with a banded sparse matrix product, or by summing
+    blocks of pixels if the sizes are divisible.
+
+    Parameters
+    ----------
+    image:
+        The image to resize.
+    sizes:
+        A dictionary specifying the desired size of the output image for each dimension.
+        For example, ``{'x': 100, 'y': 300}``.
+    mode:
+        ``'sum'`` conserves the total intensity of the image, ``'mean'`` keeps the
+        intensity per pixel and ``'bilinear'`` interpolates the pixel values.
+
+    Returns
+    -------
+    :
+        The resized image, as floating point values.
+        Variances are propagated assuming uncorrelated pixels.
+        Bin-edge coordinates are interpolated, and other floating point coordinates
+        (including the ``position``) are averaged like the data with ``mode='mean'``.
+        Other coordinates that depend on resized dimensions are dropped.
+        As in scipp reductions, masks that depend on resized dimensions are applied,
+        i.e., masked pixels do not contribute, and are dropped from the output.
+    """
+    if mode not in ('sum', 'mean', 'bilinear'):
+        raise ValueError(
+            f"Unknown mode '{mode}', expected 'sum', 'mean' or 'bilinear'."
+        )
+    data = image if isinstance(image, sc.Variable) else image.data
+
+    # Sparse products along the innermost axis are slow, so it is resized last when
+    # the other axes have already been reduced
+    axes = sorted(data.dims.index(dim) for dim in sizes)
+
+    def apply(values: np.ndarray, power: int = 1) -> np.ndarray:
+        for axis in axes:
+            values = _rescale_axis(values, axis, sizes[data.dims[axis]], mode, power)
+        return values
+
+    masks = {}
+    applied = []
+    if isinstance(image, sc.DataArray):
+        for name, mask in image.masks.items():
+            if set(mask.dims) & set(sizes):
+                applied.append(mask)
+            else:
+                masks[name] = mask
+    values = np.asarray(data.values, dtype=np.float64)
+    variances = data.variances
+    norm = None
+    if applied:
+        # Like scipp reductions, masked pixels do not contribute to the output
+        keep = ~np.logical_or.reduce(
+            [
+                mask.broadcast(sizes=data.sizes).transpose(data.dims).values
+                for mask in applied
+            ]
+        )
+        values = np.where(keep, values, 0.0)
+        if variances is not None:
+            variances = np.where(keep, variances, 0.0)
+        if mode != 'sum':
+            norm = apply(keep.astype(np.float64))
+    values = apply(values)
+    if variances is not None:
+        variances = apply(variances, power=2)
+    if norm is not None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values /= norm
+            if variances is not None:
+                variances /= norm**2
+    out = sc.array(dims=data.dims, values=values, variances=variances, unit=data.unit)
+    if isinstance(image, sc.Variable):
+        return out
+
+    coord_mode = 'bilinear' if mode == 'bilinear' else 'mean'
+    coords = {}
+    for name, coord in image.coords.items():
+        resized = [dim for dim in coord.dims if dim in sizes]
+        if not resized:
+            coords[name] = coord
+        elif len(resized) == 1 and image.coords.is_edges(name, resized[0]):
+            dim = resized[0]
+            positions = np.linspace(0, image.sizes[dim], sizes[dim] + 1)
+            edges = np.interp(positions, np.arange(image.sizes[dim] + 1), coord.values)
+            coords[name] = sc.array(dims=[dim], values=edges, unit=coord.unit)
+        elif coord.dtype in (sc.DType.float64, sc.DType.float32, sc.DType.vector3):
+            vals = np.asarray(coord.values, dtype=np.float64)
+            for dim in resized:
+                vals = _rescale_axis(
+                    vals, coord.dims.index(dim), sizes[dim], coord_mode
+                )
+            make = sc.vectors if coord.dtype == sc.DType.vector3 else sc.array
+            coords[name] = make(dims=coord.dims, values=vals, unit=coord.unit)
+    return sc.DataArray(out, coords=coords, masks=masks)
+
+
+def _separable_factors(kernel: np.ndarray) -> tuple[np.ndarray, np.ndarray] | None:
+    """Return column and row vectors whose outer product is the kernel, if any."""
+    u, s, vt = np.linalg.svd(kernel)
+    if len(s) > 1 and s[1] > 1e-12 * s[0]:
+        return None
+    scale = np.sqrt(s[0])
+    return u[:, 0] * scale, vt[0] * scale
+
+
+def _correlate_frames(
+    frames: np.ndarray,
+    kernel: np.ndarray,
+    separable: tuple[np.ndarray, np.ndarray] | None,
+    out: np.ndarray,
+) -> None:
+    """Correlate a stack of frames with a kernel, writing the valid region to out."""
+    ho, wo = out.shape[-2:]
+    if separable is not None:
+        column, row = separable
+        rows = np.zeros((*frames.shape[:-1], wo), dtype=out.dtype)
+        tmp = np.empty_like(rows)
+        for j, weight in enumerate(row):
+            if weight != 0:
+                np.multiply(frames[..., j : j + wo], weight, out=tmp)
+                rows += tmp
+        out[...] = 0
+        tmp = np.empty_like(out)
+        for i, weight in enumerate(column):
+            if weight != 0:
+                np.multiply(rows[..., i : i + ho, :], weight, out=tmp)
+                out += tmp
+        return
+    out[...] = 0
+    tmp = np.empty(out.shape, dtype=out.dtype)
+    for (i, j), weight in np.ndenumerate(kernel):
+        if weight != 0:
+            np.multiply(frames[..., i : i + ho, j : j + wo], weight, out=tmp)
+            out += tmp
+
+
+def _convolve_values(
+    values: np.ndarray,
+    kernel: np.ndarray,
+    dtype: np.dtype,
+    mode: str,
+    fill_value: float,
+    chunk_size: int | None,
+    max_workers: int | None,
+) -> np.ndarray:
+    height, width = values.shape[-2:]
+    kh, kw = kernel.shape
+    ho, wo = height - kh + 1, width - kw + 1
+    if ho < 1 or wo < 1:
+        raise ValueError(
+            f"Kernel of shape {kernel.shape} is larger than the image "
+            f"({height}, {width})."
+        )
+    frames = values.reshape(-1, height, width)
+    if mode == 'valid':
+        out = np.empty((len(frames), ho, wo), dtype=dtype)
+        interior = out
+    else:
+        out = np.full((len(frames), height, width), fill_value, dtype=dtype)
+        top, left = (kh - 1) // 2, (kw - 1) // 2
+        interior = out[:, top : top + ho, left : left + wo]
+
+    # Convolution is a correlation with the flipped kernel
+    kernel = kernel[::-1, ::-1]
+    separable = (
+        _separable_factors(kernel) if np.issubdtype(dtype, np.floating) else None
+    )
+    if chunk_size is None:
+        # Bound the working set of each task to about 2**22 elements per buffer
+        chunk_size = max(1, 2**22 // (height * width))
+    starts = range(0, len(frames), chunk_size)
+
+    def run(start: int) -> None:
+        _correlate_frames(
+            frames[start : start + chunk_size],
+            kernel,
+            separable,
+            interior[start : start + chunk_size],
+        )
+
+    if len(starts) == 1:
+        run(0)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(run, starts))
+    return out.reshape(*values.shape[:-2], *out.shape[-2:])
+
+
+def convolve_2d(
+    image: sc.Variable | sc.DataArray,
+    kernel: sc.Variable | ArrayLike,
+    dims: tuple[str, str] | list[str],
+    *,
+    mode: Literal['same', 'valid'] = 'same',
+    fill_value: float = 0,
+    chunk_size: int | None = None,
+    max_workers: int | None = None,
+) -> sc.Variable | sc.DataArray:
+    """
+    Convolve a 2d image, or a stack of images, with a small kernel.
+
+    Each kernel weight is applied to a shifted view of the image and accumulated
+    into a single output buffer. Kernels that are the outer product of two vectors
+    are applied as two one-dimensional passes. All dimensions other than ``dims`` are
+    treated as a stack of images, which is processed in chunks of ``chunk_size``
+    images on a thread pool.
+
+    Parameters
+    ----------
+    image:
+        The input image.
+    kernel:
+        The convolution kernel. Either a variable with the dimensions ``dims``, or
+        a 2d array where the first axis corresponds to ``dims[0]``.
+    dims:
+        The two dimensions of the image to convolve over.
+    mode:
+        ``'same'`` returns an output with the shape of the image, where pixels for
+        which the kernel does not fit entirely inside the image are set to
+        ``fill_value``. ``'valid'`` only returns those pixels where the kernel fits.
+    fill_value:
+        Value of the border pixels for ``mode='same'``.
+    chunk_size:
+        Number of images processed at once by one worker.
+        Defaults to a number that keeps each chunk below a few million pixels.
+    max_workers:
+        The number of worker threads. Defaults to the number of cores.
+
+    Returns
+    -------
+    :
+        The convolved image, with the unit of the image times the unit of the kernel.
+        Variances are propagated assuming uncorrelated pixels.
+        Coordinates and masks of a data array are kept for ``mode='same'``.
+    """
+    dims = tuple(dims)
+    if mode not in ('same', 'valid'):
+        raise ValueError(f"Unknown mode '{mode}', expected 'same' or 'valid'.")
+    if isinstance(kernel, sc.Variable):
+        unit = kernel.unit
+        kernel = kernel.transpose(dims).values
+    else:
+        unit = sc.units.one
+        kernel = np.asarray(kernel)
+    if kernel.ndim != 2:
+        raise ValueError(f"Expected a 2d kernel, got shape {kernel.shape}.")
+
+    data = image if isinstance(image, sc.Variable) else image.data
+    other = [dim for dim in data.dims if dim not in dims]
+    data = data.transpose([*other, *dims])
+    dtype = np.result_type(data.values.dtype, kernel.dtype)
+    options = {
+        'mode': mode,
+        'fill_value': fill_value,
+        'chunk_size': chunk_size,
+        'max_workers': max_workers,
+    }
+    values = _convolve_values(data.values, kernel, dtype, **options)
+    variances = (
+        None
+        if data.variances is None
+        else _convolve_values(data.variances, kernel**2, dtype, **options)
+    )
+    out = sc.array(
+        dims=data.dims,
+        values=values,
+        variances=variances,
+        unit=None if data.unit is None else data.unit * unit,
+    ).transpose(image.dims)
+    if isinstance(image, sc.Variable):
+        return out
+    if mode == 'valid':
+        return sc.DataArray(out)
+    return sc.DataArray(out, coords=image.coords, masks=image.masks)
+
+
 def laplace_2d(
     image: sc.Variable | sc.DataArray, dims: tuple[str, str] | list[str]
 ) -> sc.Variable | sc.DataArray:
@@ -127,6 +560,7 @@ def laplace_2d(
     a new image where each pixel value represents the sum of the second
     derivatives in the x and y directions, effectively highlighting areas of
     high curvature or rapid intensity change.
+    The border pixels, where the kernel does not fit inside the image, are zero.
 
     Parameters
     ----------
@@ -136,54 +570,13 @@ def laplace_2d(
         The dimensions of the image over which to compute the Laplace operator.
         Other dimensions will be preserved in the output.
     """
-    kernel = [8] + ([-1] * 8)
-    ii = np.repeat([0, -1, 1], 3)
-    jj = np.tile([0, -1, 1], 3)
-
-    lp2d = sc.reduce(
-        (
-            image[dims[0], (1 + j) : (image.sizes[dims[0]] - 1 + j)][
-                dims[1], (1 + i) : (image.sizes[dims[1]] - 1 + i)
-            ]
-            * k
-            for i, j, k in zip(ii, jj, kernel, strict=True)
-        )
-    ).sum()
-
-    lp2d.unit = ""  # Laplacian is dimensionless
-    out = (
-        sc.DataArray(data=sc.zeros(sizes=image.sizes, dtype=lp2d.dtype))
-        .assign_coords(image.coords)
-        .assign_masks(image.masks)
-    )
-    out[dims[0], 1:-1][dims[1], 1:-1] = lp2d
+    kernel = -np.ones((3, 3), dtype=np.int64)
+    kernel[1, 1] = 8
+    out = convolve_2d(image, kernel, dims=dims)
+    out.unit = ""  # Laplacian is dimensionless
     return out
 
 
-def _prime_factors(n):
-    i = 2
-    factors = []
-    while i * i <= n:
-        if n % i == 0:
-            factors.append(i)
-            n //= i
-        else:
-            i += 1
-    if n > 1:
-        factors.append(n)
-    return factors
-
-
-def _best_subset_product(factors, target):
-    best_product = 1
-    for r in range(1, len(factors) + 1):
-        for combo in combinations(factors, r):
-            prod = np.prod(combo)
-            if abs(prod - target) < abs(best_product - target):
-                best_product = prod
-    return best_product
-
-
 def sharpness(
     image: sc.Variable | sc.DataArray,
     dims: tuple[str, str] | list[str],
@@ -212,13 +605,8 @@ def sharpness(
         expensive.
     """
     if max_size is not None:
-        sizes = {}
-        for dim in dims:
-            if image.sizes[dim] > max_size:
-                # Decompose size into prime numbers to find the best subset product
-                # closest to the maximum size
-                factors = _prime_factors(image.sizes[dim])
-                sizes[dim] = _best_subset_product(factors, max_size)
-        image = resize(image, sizes=sizes)
+        sizes = {dim: max_size for dim in dims if image.sizes[dim] > max_size}
+        if sizes:
+            image = rescale(image, sizes=sizes)
 
     return laplace_2d(image, dims=dims).var(dim=dims, ddof=1)
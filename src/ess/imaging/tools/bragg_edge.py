@@ -0,0 +1,253 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for fitting Bragg edges in wavelength-resolved transmission data.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipp as sc
+from numpy.typing import NDArray
+from scipy.special import erfc
+
+_PARAMETERS = ('edge', 'width', 'height', 'offset')
+
+
+def _bragg_edge_model(wavelength: NDArray, params: NDArray) -> NDArray:
+    '''Evaluates the edge model for a batch of parameters.
+
+    The model is ``offset + height / 2 * erfc((wavelength - edge) / (sqrt(2) * width))``
+    '''
+    edge, width, height, offset = (p[:, None] for p in params.T)
+    return offset + 0.5 * height * erfc((wavelength - edge) / (np.sqrt(2) * width))
+
+
+def _bragg_edge_jacobian(wavelength: NDArray, params: NDArray) -> NDArray:
+    '''Derivatives of the edge model with respect to the parameters.'''
+    edge, width, height, _ = (p[:, None] for p in params.T)
+    u = (wavelength - edge) / (np.sqrt(2) * width)
+    jac = np.empty((*u.shape, 4))
+    gauss = np.exp(-(u**2)) * (height / np.sqrt(np.pi))
+    jac[..., 0] = gauss / (np.sqrt(2) * width)
+    jac[..., 1] = u * gauss / width
+    jac[..., 2] = 0.5 * erfc(u)
+    jac[..., 3] = 1.0
+    return jac
+
+
+def _fit_chunk(
+    wavelength: NDArray,
+    y: NDArray,
+    weights: NDArray,
+    params: NDArray,
+    max_iterations: int,
+    tolerance: float,
+) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    '''Batched Levenberg-Marquardt fit of all spectra in a chunk.
+
+    Only the spectra that have not yet converged are updated in each iteration.
+    '''
+    params = params.copy()
+    sqrt_w = np.sqrt(weights)
+    model = _bragg_edge_model(wavelength, params)
+    cost = (weights * (y - model) ** 2).sum(axis=-1)
+    damping = np.full(len(y), 1e-3)
+    converged = np.zeros(len(y), dtype=bool)
+    active = np.arange(len(y))
+    for _ in range(max_iterations):
+        p = params[active]
+        jac = _bragg_edge_jacobian(wavelength, p)
+        jac *= sqrt_w[active][..., None]
+        residual = sqrt_w[active] * (y[active] - model[active])
+        a = np.matmul(jac.transpose(0, 2, 1), jac)
+        g = np.matmul(jac.transpose(0, 2, 1), residual[..., None])[..., 0]
+        diag = np.maximum(np.diagonal(a, axis1=1, axis2=2), 1e-12)
+        damped = a + (damping[active, None] * diag)[..., None] * np.eye(4)
+        step = np.linalg.solve(damped, g[..., None])[..., 0]
+        trial = p + step
+        trial[:, 1] = np.abs(trial[:, 1])
+        trial_model = _bragg_edge_model(wavelength, trial)
+        trial_cost = (weights[active] * (y[active] - trial_model) ** 2).sum(axis=-1)
+        accept = trial_cost <= cost[active]
+        improvement = cost[active] - trial_cost
+        params[active[accept]] = trial[accept]
+        cost[active[accept]] = trial_cost[accept]
+        model[active[accept]] = trial_model[accept]
+        damping[active] = np.where(
+            accept,
+            np.maximum(damping[active] / 10, 1e-10),
+            np.minimum(damping[active] * 10, 1e10),
+        )
+        done = (accept & (improvement <= tolerance * cost[active])) | (
+            damping[active] >= 1e10
+        )
+        converged[active[done]] = True
+        active = active[~done]
+        if len(active) == 0:
+            break
+
+    jac = _bragg_edge_jacobian(wavelength, params)
+    jac *= sqrt_w[..., None]
+    covariance = np.linalg.pinv(np.matmul(jac.transpose(0, 2, 1), jac))
+    return params, covariance, cost, converged
+
+
+def fit_bragg_edges(
+    transmission: sc.DataArray,
+    edge: sc.Variable,
+    width: sc.Variable | None = None,
+    *,
+    dim: str = 'wavelength',
+    max_iterations: int = 100,
+    tolerance: float = 1e-8,
+    chunk_size: int = 16384,
+    max_workers: int | None = None,
+) -> sc.DataGroup:
+    '''Fits a Bragg edge to every spectrum in ``transmission`` simultaneously.
+
+    The edge is modelled as
+
+    .. math::
+
+        T(\\lambda) = c + \\frac{h}{2}
+        \\mathrm{erfc}\\left(\\frac{\\lambda - \\lambda_0}{\\sqrt{2}\\sigma}\\right)
+
+    where :math:`\\lambda_0` is the edge position, :math:`\\sigma` the edge width,
+    :math:`h` the edge height and :math:`c` the transmission above the edge.
+
+    All spectra are fitted together with a batched Levenberg-Marquardt solver.
+    The spectra are split into chunks of ``chunk_size`` that are fitted in parallel
+    on a thread pool.
+
+    Parameters
+    ------------
+    transmission:
+        Transmission spectra, with the dimension ``dim`` and any number of other
+        dimensions, e.g. pixels or super-pixels.
+        The data should be restricted to a wavelength range around a single edge.
+        If the data has variances they are used as weights in the fit.
+        Masked, NaN and infinite values are ignored.
+    edge:
+        Approximate edge position, either a scalar or a variable that can be
+        broadcast to the non-wavelength dimensions of ``transmission``.
+        It splits each spectrum into the parts below and above the edge, whose mean
+        transmissions are the initial guesses of the height and the offset.
+        The starting point of the edge position is then estimated from the integral
+        of the normalized step, which is more robust than a shared guess, so
+        ``edge`` only needs to lie between the plateaus below and above the edge.
+    width:
+        Initial guess for the edge width, as a scalar.
+        Defaults to 1/20 of the fitted range.
+    dim:
+        The wavelength dimension.
+    max_iterations:
+        The maximum number of iterations of the solver.
+    tolerance:
+        A spectrum is converged when an accepted step reduces the cost by less
+        than ``tolerance`` times the cost.
+    chunk_size:
+        The number of spectra fitted at once by one worker.
+    max_workers:
+        The number of worker threads. Defaults to the number of cores.
+
+    Returns
+    ------------
+    :
+        Data group with maps of the fitted ``'edge'``, ``'width'``, ``'height'``
+        and ``'offset'``, with variances from the covariance of the fit.
+        The maps have a ``'not_converged'`` mask for spectra where the solver did
+        not converge within ``max_iterations``.
+    '''
+    da = transmission.transpose([*(d for d in transmission.dims if d != dim), dim])
+    coord = da.coords[dim]
+    if da.coords.is_edges(dim, dim):
+        coord = sc.midpoints(coord, dim)
+    wavelength = coord.values
+    batch_sizes = {d: s for d, s in da.sizes.items() if d != dim}
+    nspectra = int(np.prod(list(batch_sizes.values()), dtype=np.int64))
+
+    y = np.array(da.values, dtype=np.float64).reshape(nspectra, -1)
+    if da.variances is not None:
+        with np.errstate(divide='ignore'):
+            weights = 1.0 / da.variances.reshape(nspectra, -1)
+    else:
+        weights = np.ones_like(y)
+    if da.masks:
+        mask = sc.reduce(list(da.masks.values())).any()
+        weights[mask.broadcast(sizes=da.sizes).values.reshape(nspectra, -1)] = 0.0
+    invalid = ~np.isfinite(y) | ~np.isfinite(weights)
+    weights[invalid] = 0.0
+    y[invalid] = 0.0
+
+    params = np.empty((nspectra, 4))
+    params[:, 0] = (
+        edge.to(unit=coord.unit, dtype='float64')
+        .broadcast(sizes=batch_sizes)
+        .values.reshape(-1)
+    )
+    params[:, 1] = (
+        (wavelength[-1] - wavelength[0]) / 20
+        if width is None
+        else width.to(unit=coord.unit, dtype='float64').value
+    )
+    above = wavelength > params[:, :1]
+    weight_above = np.maximum((weights * above).sum(axis=-1), 1e-12)
+    weight_below = np.maximum((weights * ~above).sum(axis=-1), 1e-12)
+    params[:, 3] = (weights * y * above).sum(axis=-1) / weight_above
+    params[:, 2] = (weights * y * ~above).sum(axis=-1) / weight_below - params[:, 3]
+    # The integral of the normalized step over wavelength is the distance from the
+    # start of the range to the edge, which is a robust estimate of the edge position.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.clip((y - params[:, 3:]) / params[:, 2:3], 0.0, 1.0)
+    step = np.where((weights > 0) & np.isfinite(step), step, ~above)
+    bin_widths = np.gradient(wavelength)
+    params[:, 0] = wavelength[0] - bin_widths[0] / 2 + step @ bin_widths
+
+    starts = range(0, nspectra, chunk_size)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(
+            pool.map(
+                lambda i: _fit_chunk(
+                    wavelength,
+                    y[i : i + chunk_size],
+                    weights[i : i + chunk_size],
+                    params[i : i + chunk_size],
+                    max_iterations,
+                    tolerance,
+                ),
+                starts,
+            )
+        )
+    fitted, covariance, cost, converged = (
+        np.concatenate(parts) for parts in zip(*results, strict=True)
+    )
+    if da.variances is None:
+        # Without known uncertainties, scale the covariance by the reduced chi^2.
+        dof = np.maximum((weights > 0).sum(axis=-1) - 4, 1)
+        covariance = covariance * (cost / dof)[:, None, None]
+
+    coords = {
+        name: c
+        for name, c in da.coords.items()
+        if dim not in c.dims and set(c.dims) <= set(batch_sizes)
+    }
+    not_converged = sc.array(dims=['spectrum'], values=~converged).fold(
+        'spectrum', sizes=batch_sizes
+    )
+    units = (coord.unit, coord.unit, da.unit, da.unit)
+    return sc.DataGroup(
+        {
+            name: sc.DataArray(
+                sc.array(
+                    dims=['spectrum'],
+                    values=fitted[:, i],
+                    variances=covariance[:, i, i],
+                    unit=unit,
+                ).fold('spectrum', sizes=batch_sizes),
+                coords=coords,
+                masks={'not_converged': not_converged},
+            )
+            for i, (name, unit) in enumerate(zip(_PARAMETERS, units, strict=True))
+        }
+    )
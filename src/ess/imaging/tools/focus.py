@@ -0,0 +1,444 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for finding the focus point of an imaging detector from a series of images
+recorded at different camera positions.
+"""
+
+import os
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import scipp as sc
+import scippnexus as snx
+
+from .analysis import laplace_2d, rescale, sharpness
+
+
+def estimate_focus_point(sharp: sc.DataArray, percentile: float = 75) -> sc.Variable:
+    """
+    Estimate the focus point from a sharpness curve.
+
+    Points below the given percentile of the sharpness are discarded as outliers,
+    and the focus point is the mean position of the remaining points weighted by
+    their sharpness.
+
+    Parameters
+    ----------
+    sharp:
+        One-dimensional sharpness curve with a coordinate for the camera position.
+    percentile:
+        Percentile of the sharpness below which points are discarded.
+    """
+    (dim,) = sharp.dims
+    threshold = sc.scalar(np.percentile(sharp.values, percentile), unit=sharp.unit)
+    subset = sharp[sharp.data >= threshold]
+    position = subset.coords[dim]
+    return (position * subset.data).sum() / subset.data.sum()
+
+
+FOCUS_METRICS = (
+    'laplacian',
+    'tenengrad',
+    'brenner',
+    'normalized_variance',
+    'fft_high_frequency',
+)
+
+
+def _frame_metrics(
+    frames: np.ndarray, metrics: tuple[str, ...], cutoff: float
+) -> dict[str, np.ndarray]:
+    """Compute focus metrics for a stack of frames with the image axes last."""
+    axes = (-2, -1)
+    out = {}
+    if 'brenner' in metrics or 'tenengrad' in metrics:
+        # Central differences, shared by the Brenner and Sobel operators
+        d0 = frames[..., 2:, :] - frames[..., :-2, :]
+        d1 = frames[..., :, 2:] - frames[..., :, :-2]
+        if 'brenner' in metrics:
+            out['brenner'] = (d0**2).mean(axis=axes) + (d1**2).mean(axis=axes)
+        if 'tenengrad' in metrics:
+            sobel0 = d0[..., :, :-2] + 2 * d0[..., :, 1:-1] + d0[..., :, 2:]
+            sobel1 = d1[..., :-2, :] + 2 * d1[..., 1:-1, :] + d1[..., 2:, :]
+            out['tenengrad'] = (sobel0**2 + sobel1**2).mean(axis=axes)
+    if 'normalized_variance' in metrics:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['normalized_variance'] = frames.var(axis=axes, ddof=1) / frames.mean(
+                axis=axes
+            )
+    if 'fft_high_frequency' in metrics:
+        power = np.abs(np.fft.rfft2(frames - frames.mean(axis=axes, keepdims=True)))
+        power **= 2
+        f0 = np.fft.fftfreq(frames.shape[-2])[:, None]
+        f1 = np.fft.rfftfreq(frames.shape[-1])[None, :]
+        # Frequencies in units of the Nyquist frequency
+        high = np.hypot(f0, f1) > cutoff / 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['fft_high_frequency'] = power[..., high].sum(axis=-1) / power.sum(
+                axis=axes
+            )
+    return out
+
+
+def focus_metrics(
+    image: sc.Variable | sc.DataArray,
+    dims: tuple[str, str] | list[str],
+    *,
+    metrics: Iterable[str] = FOCUS_METRICS,
+    roi: dict[str, slice] | None = None,
+    max_size: int | None = None,
+    fft_cutoff: float = 0.25,
+    chunk_size: int | None = None,
+    max_workers: int | None = None,
+) -> sc.DataGroup:
+    """
+    Compute several focus metrics of an image, or a stack of images, in one pass.
+
+    The available metrics are
+
+    - ``'laplacian'``: variance of the Laplacian, see :func:`sharpness`.
+    - ``'tenengrad'``: mean squared magnitude of the Sobel gradient.
+    - ``'brenner'``: mean squared difference between pixels two apart, along
+      both image dimensions.
+    - ``'normalized_variance'``: variance of the pixel values divided by their mean.
+    - ``'fft_high_frequency'``: fraction of the power spectrum above ``fft_cutoff``
+      times the Nyquist frequency.
+
+    The gradient based metrics share the differences between neighboring pixels.
+    All dimensions other than ``dims`` are processed as a stack of images,
+    in chunks of ``chunk_size`` images on a thread pool.
+    Cheap metrics such as ``'brenner'`` are well suited for live focusing.
+
+    Parameters
+    ----------
+    image:
+        The input image.
+    dims:
+        The two image dimensions.
+    metrics:
+        Names of the metrics to compute.
+    roi:
+        Region of interest, e.g. ``{'x': slice(100, 300)}``. Slices can be given
+        as indices or as coordinate values.
+    max_size:
+        If given, images larger than this are first downsampled with
+        :func:`rescale` to at most ``max_size`` pixels along each image dimension.
+    fft_cutoff:
+        Lowest frequency counted as high frequency, relative to the Nyquist frequency.
+    chunk_size:
+        Number of images processed at once by one worker.
+        Defaults to a number that keeps each chunk below a few million pixels.
+    max_workers:
+        The number of worker threads. Defaults to the number of cores.
+
+    Returns
+    -------
+    :
+        Data group with one entry per metric, with the dimensions of the image
+        other than ``dims``. Masks of the image are ignored.
+    """
+    dims = tuple(dims)
+    metrics = tuple(metrics)
+    if unknown := set(metrics) - set(FOCUS_METRICS):
+        raise ValueError(
+            f"Unknown focus metrics {sorted(unknown)}, expected any of {FOCUS_METRICS}."
+        )
+    if isinstance(image, sc.DataArray):
+        image = image.drop_masks(list(image.masks))
+    for dim, selection in (roi or {}).items():
+        image = image[dim, selection]
+    if max_size is not None:
+        sizes = {dim: max_size for dim in dims if image.sizes[dim] > max_size}
+        if sizes:
+            image = rescale(image, sizes=sizes)
+
+    data = image if isinstance(image, sc.Variable) else image.data
+    other = [dim for dim in data.dims if dim not in dims]
+    data = data.transpose([*other, *dims])
+    frames = np.asarray(data.values, dtype=np.float64)
+    frames = frames.reshape(-1, *frames.shape[-2:])
+    if chunk_size is None:
+        chunk_size = max(1, 2**22 // (frames.shape[-2] * frames.shape[-1]))
+    array_metrics = tuple(m for m in metrics if m != 'laplacian')
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        chunks = list(
+            pool.map(
+                lambda i: _frame_metrics(
+                    frames[i : i + chunk_size], array_metrics, fft_cutoff
+                ),
+                range(0, len(frames), chunk_size),
+            )
+        )
+
+    units = {
+        'tenengrad': data.unit**2,
+        'brenner': data.unit**2,
+        'normalized_variance': data.unit,
+        'fft_high_frequency': sc.units.one,
+    }
+    shape = [data.sizes[dim] for dim in other]
+    out = {}
+    for name in metrics:
+        if name == 'laplacian':
+            out[name] = laplace_2d(image, dims=dims).var(dim=dims, ddof=1)
+            continue
+        var = sc.array(
+            dims=other,
+            values=np.concatenate([c[name] for c in chunks]).reshape(shape),
+            unit=units[name],
+        )
+        if isinstance(image, sc.DataArray):
+            var = sc.DataArray(
+                var,
+                coords={
+                    key: coord
+                    for key, coord in image.coords.items()
+                    if not set(coord.dims) & set(dims)
+                },
+            )
+        out[name] = var
+    return sc.DataGroup(out)
+
+
+def _load_positions(
+    file: snx.Group, path: str, frame_dim: str, nframes: int
+) -> sc.Variable:
+    value = file[path]['value'][()]
+    if isinstance(value, sc.DataArray):
+        value = value.data
+    if value.sizes[value.dim] != nframes:
+        raise ValueError(
+            f"Expected {nframes} camera positions in '{path}', "
+            f"got {value.sizes[value.dim]}."
+        )
+    return value.rename_dims({value.dim: frame_dim})
+
+
+def stream_sharpness(
+    filename: str | os.PathLike,
+    dims: tuple[str, str] | list[str],
+    *,
+    detector: str = 'entry/instrument/orca_detector',
+    position: str | None = 'entry/instrument/camera_stage/position_setpoint',
+    frame_dim: str = 'time',
+    frames_per_chunk: int = 4,
+    max_size: int | None = 512,
+    percentile: float = 75,
+    max_workers: int = 2,
+) -> sc.DataGroup:
+    """
+    Compute the sharpness of a series of images stored in a NeXus file, and estimate
+    the focus point.
+
+    The images are read in chunks of ``frames_per_chunk`` frames and the sharpness of
+    each chunk is computed on a thread pool while the next chunk is read.
+    At most ``max_workers`` chunks are processed while the next one is read,
+    so the memory is bounded by ``max_workers + 1`` chunks, independently of the
+    number of cores, and the full image stack is never loaded.
+
+    Parameters
+    ----------
+    filename:
+        Path to the NeXus file.
+    dims:
+        The two image dimensions, see :py:func:`sharpness`.
+    detector:
+        Path to the detector group in the file. The images are read from its
+        ``data`` field.
+    position:
+        Path to the log of the camera positions, with one entry per frame.
+        If ``None``, the frame index is used as position.
+    frame_dim:
+        The dimension of the frames in the detector data.
+    frames_per_chunk:
+        Number of frames read at once.
+    max_size:
+        Maximum size of the images the sharpness is computed on,
+        see :py:func:`sharpness`.
+    percentile:
+        Percentile used to discard outliers, see :py:func:`estimate_focus_point`.
+    max_workers:
+        The number of worker threads, which is also the maximum number of chunks
+        in flight.
+
+    Returns
+    -------
+    :
+        Data group with the ``'sharpness'`` as a function of ``'position'``
+        and the ``'focus_point'``.
+    """
+    with snx.File(filename) as f:
+        field = f[detector]['data']
+        nframes = field.sizes[frame_dim]
+        positions = (
+            sc.arange(frame_dim, nframes)
+            if position is None
+            else _load_positions(f, position, frame_dim, nframes)
+        )
+        chunks = []
+        pending: deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for start in range(0, nframes, frames_per_chunk):
+                if len(pending) == max_workers:
+                    chunks.append(pending.popleft().result())
+                image = sc.DataArray(field[frame_dim, start : start + frames_per_chunk])
+                pending.append(pool.submit(sharpness, image, dims, max_size))
+            chunks.extend(future.result() for future in pending)
+
+    sharp = sc.concat(chunks, frame_dim).rename_dims({frame_dim: 'position'})
+    sharp.coords['position'] = positions.rename_dims({frame_dim: 'position'})
+    return sc.DataGroup(
+        {
+            'sharpness': sharp,
+            'focus_point': estimate_focus_point(sharp, percentile=percentile),
+        }
+    )
+
+
+_GOLDEN = (3 - np.sqrt(5)) / 2
+
+
+def _brent_maximize(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    x: float,
+    fx: float,
+    tol: float,
+    max_evaluations: int,
+) -> float:
+    """Maximize f in [a, b] with Brent's method, starting from the point x."""
+    # Brent's method minimizes, so work with -f
+    fx = -fx
+    w = v = x
+    fw = fv = fx
+    d = e = 0.0
+    for _ in range(max_evaluations):
+        m = (a + b) / 2
+        tol1 = tol / 2
+        if abs(x - m) <= 2 * tol1 - (b - a) / 2:
+            break
+        parabolic = False
+        if abs(e) > tol1:
+            # Fit a parabola through x, w and v
+            r = (x - w) * (fx - fv)
+            q = (x - v) * (fx - fw)
+            p = (x - v) * q - (x - w) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            previous_e, e = e, d
+            if abs(p) < abs(q * previous_e / 2) and q * (a - x) < p < q * (b - x):
+                d = p / q
+                if (x + d) - a < 2 * tol1 or b - (x + d) < 2 * tol1:
+                    d = tol1 if x < m else -tol1
+                parabolic = True
+        if not parabolic:
+            # Golden-section step into the larger of the two intervals
+            e = (b - x) if x < m else (a - x)
+            d = _GOLDEN * e
+        u = x + (d if abs(d) >= tol1 else np.copysign(tol1, d))
+        fu = -f(u)
+        if fu <= fx:
+            if u < x:
+                b = x
+            else:
+                a = x
+            v, fv, w, fw, x, fx = w, fw, x, fx, u, fu
+        else:
+            if u < x:
+                a = u
+            else:
+                b = u
+            if fu <= fw or w == x:
+                v, fv, w, fw = w, fw, u, fu
+            elif fu <= fv or v in (x, w):
+                v, fv = u, fu
+    return x
+
+
+def find_focus(
+    acquire: Callable[[sc.Variable], sc.Variable | sc.DataArray],
+    bounds: tuple[sc.Variable, sc.Variable],
+    dims: tuple[str, str] | list[str],
+    *,
+    tolerance: sc.Variable,
+    initial_steps: int = 5,
+    max_acquisitions: int = 30,
+    max_size: int | None = 512,
+) -> sc.DataGroup:
+    """
+    Find the focus point by adaptively choosing the camera positions at which
+    images are acquired.
+
+    Images are first acquired at ``initial_steps`` equally spaced positions
+    between the bounds, to bracket the sharpest position.
+    The maximum of the sharpness is then refined with Brent's method, which combines
+    parabolic interpolation with golden-section steps. This typically converges with
+    far fewer images than a dense scan of the camera stage.
+
+    Parameters
+    ----------
+    acquire:
+        Callable that moves the camera to the given position and returns an image.
+    bounds:
+        The lowest and highest camera positions to consider.
+    dims:
+        The two image dimensions, see :py:func:`sharpness`.
+    tolerance:
+        The search stops when the focus point is known to within this tolerance.
+    initial_steps:
+        Number of positions of the initial coarse scan. Must be at least 3.
+    max_acquisitions:
+        Maximum total number of images to acquire.
+    max_size:
+        Maximum size of the images the sharpness is computed on,
+        see :py:func:`sharpness`.
+
+    Returns
+    -------
+    :
+        Data group with the ``'focus_point'`` and the ``'sharpness'`` of all acquired
+        images as a function of ``'position'``, sorted by position.
+    """
+    if initial_steps < 3:
+        raise ValueError(f"initial_steps must be at least 3, got {initial_steps}.")
+    low, high = bounds
+    unit = low.unit
+    sharpness_of = {}
+
+    def evaluate(position: float) -> float:
+        image = acquire(sc.scalar(position, unit=unit))
+        if isinstance(image, sc.Variable):
+            image = sc.DataArray(image)
+        sharpness_of[position] = sharpness(image, dims=dims, max_size=max_size).data
+        return sharpness_of[position].value
+
+    grid = np.linspace(low.value, high.to(unit=unit).value, initial_steps)
+    values = [evaluate(position) for position in grid]
+    best = int(np.argmax(values))
+    position = _brent_maximize(
+        evaluate,
+        a=grid[max(best - 1, 0)],
+        b=grid[min(best + 1, initial_steps - 1)],
+        x=grid[best],
+        fx=values[best],
+        tol=tolerance.to(unit=unit).value,
+        max_evaluations=max_acquisitions - initial_steps,
+    )
+    positions = sorted(sharpness_of)
+    return sc.DataGroup(
+        {
+            'focus_point': sc.scalar(position, unit=unit),
+            'sharpness': sc.DataArray(
+                sc.concat([sharpness_of[p] for p in positions], 'position'),
+                coords={
+                    'position': sc.array(dims=['position'], values=positions, unit=unit)
+                },
+            ),
+        }
+    )
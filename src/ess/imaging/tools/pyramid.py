@@ -0,0 +1,234 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Multi-resolution image pyramids for looking at large images and image stacks at
+different zoom levels.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+import scipp as sc
+
+from .analysis import resample
+
+
+@dataclass
+class _Level:
+    dims: tuple[str, ...]
+    unit: sc.Unit | None
+    values: np.ndarray
+    variances: np.ndarray | None
+    coords: dict[str, sc.Variable]
+    edges: dict[str, str | None]
+    masks: dict[str, sc.Variable]
+
+    @classmethod
+    def from_data_array(cls, da: sc.DataArray) -> '_Level':
+        return cls(
+            dims=da.dims,
+            unit=da.unit,
+            values=da.values,
+            variances=da.variances,
+            coords=dict(da.coords),
+            edges={
+                name: next((d for d in coord.dims if da.coords.is_edges(name, d)), None)
+                for name, coord in da.coords.items()
+            },
+            masks=dict(da.masks),
+        )
+
+    def to_data_array(self, region: dict[str, slice]) -> sc.DataArray:
+        index = tuple(region.get(dim, slice(None)) for dim in self.dims)
+        variances = None if self.variances is None else self.variances[index]
+        data = sc.array(
+            dims=self.dims,
+            values=np.array(self.values[index]),
+            variances=None if variances is None else np.array(variances),
+            unit=self.unit,
+        )
+
+        def crop(var: sc.Variable, edge_dim: str | None = None) -> sc.Variable:
+            for dim in var.dims:
+                if dim in region:
+                    s = region[dim]
+                    stop = s.stop + 1 if dim == edge_dim else s.stop
+                    var = var[dim, s.start : stop]
+            return var
+
+        return sc.DataArray(
+            data,
+            coords={
+                name: crop(coord, self.edges[name])
+                for name, coord in self.coords.items()
+            },
+            masks={name: crop(mask).copy() for name, mask in self.masks.items()},
+        )
+
+
+class ImagePyramid:
+    """
+    Multi-resolution pyramid of an image or a stack of images.
+
+    Level ``n`` of the pyramid has ``2**n`` times fewer pixels along each image
+    dimension than the original image, which is level ``0``.
+    Levels are computed on demand, each from the previous level with
+    :func:`resample`, and cached.
+    A trailing row or column of pixels is dropped when a level has an odd size.
+
+    Parameters
+    ----------
+    image:
+        The full resolution image. Other dimensions than ``dims``, e.g., ``time``,
+        are kept at every level.
+    dims:
+        The image dimensions that are reduced.
+    method:
+        The reduction method applied to blocks of 2x2 pixels, see :func:`resample`.
+    min_size:
+        The coarsest level is the last level with at least ``min_size`` pixels
+        along each image dimension.
+    cache_dir:
+        If given, the pixel values of the computed levels are stored in
+        memory-mapped files in this directory instead of in memory, so that windows
+        of a level can be read without loading the entire level.
+        Every pyramid writes its files into a new subdirectory of ``cache_dir``,
+        so pyramids can share the same ``cache_dir``. The subdirectory is removed
+        by :meth:`close`, when leaving a ``with`` block, or when the pyramid is
+        garbage collected.
+        Coordinates and masks are kept in memory.
+    """
+
+    def __init__(
+        self,
+        image: sc.DataArray,
+        dims: tuple[str, ...] | list[str],
+        *,
+        method: str | Callable = 'mean',
+        min_size: int = 16,
+        cache_dir: str | os.PathLike | None = None,
+    ) -> None:
+        self._dims = tuple(dims)
+        self._method = method
+        self._sizes = image.sizes
+        self._levels = {0: _Level.from_data_array(image)}
+        self._cache_dir = None
+        self._finalizer = None
+        if cache_dir is not None:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            self._cache_dir = Path(tempfile.mkdtemp(prefix='pyramid-', dir=cache_dir))
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, self._cache_dir, ignore_errors=True
+            )
+        nlevels = 1
+        while all(self._sizes[dim] >> nlevels >= min_size for dim in self._dims):
+            nlevels += 1
+        self._nlevels = nlevels
+
+    def __len__(self) -> int:
+        return self._nlevels
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove the cached levels and their files in ``cache_dir``.
+
+        The pyramid remains usable, and levels that are requested again are
+        recomputed and kept in memory.
+        """
+        self._levels = {0: self._levels[0]}
+        self._cache_dir = None
+        if self._finalizer is not None:
+            self._finalizer()
+
+    @property
+    def dims(self) -> tuple[str, ...]:
+        """The image dimensions that are reduced."""
+        return self._dims
+
+    def sizes(self, level: int) -> dict[str, int]:
+        """The sizes of a level."""
+        self._check_level(level)
+        return {
+            dim: size >> level if dim in self._dims else size
+            for dim, size in self._sizes.items()
+        }
+
+    def level(self, level: int) -> sc.DataArray:
+        """Return an entire level of the pyramid."""
+        return self.window(level, {})
+
+    def window(self, level: int, region: dict[str, slice]) -> sc.DataArray:
+        """
+        Return a window of a level of the pyramid.
+
+        Parameters
+        ----------
+        level:
+            The level of the pyramid.
+        region:
+            The window, as slices of pixel indices at full resolution, e.g.,
+            ``{'x': slice(1024, 1536)}``. The slices are mapped to the pixels of the
+            level that overlap with the window, so the same region can be requested
+            at every level. Dimensions that are not given are not restricted.
+        """
+        self._check_level(level)
+        sizes = self.sizes(level)
+        scaled = {}
+        for dim, s in region.items():
+            start, stop, step = s.indices(self._sizes[dim])
+            if step != 1:
+                raise ValueError(f"Window slices must have step 1, got {s}.")
+            if dim in self._dims:
+                start, stop = start >> level, -((-stop) >> level)
+            scaled[dim] = slice(start, min(stop, sizes[dim]))
+        self._compute(level)
+        return self._levels[level].to_data_array(scaled)
+
+    def _check_level(self, level: int) -> None:
+        if not 0 <= level < self._nlevels:
+            raise IndexError(
+                f"Level {level} is out of range for a pyramid with "
+                f"{self._nlevels} levels."
+            )
+
+    def _compute(self, level: int) -> None:
+        for n in range(1, level + 1):
+            if n in self._levels:
+                continue
+            previous = self._levels[n - 1].to_data_array(
+                {dim: slice(0, self._sizes[dim] >> n << 1) for dim in self._dims}
+            )
+            coarse = resample(
+                previous, sizes=dict.fromkeys(self._dims, 2), method=self._method
+            ).transpose(previous.dims)
+            self._levels[n] = self._store(n, coarse)
+
+    def _store(self, level: int, da: sc.DataArray) -> _Level:
+        stored = _Level.from_data_array(da.copy())
+        if self._cache_dir is None:
+            return stored
+        for name in ('values', 'variances'):
+            array = getattr(stored, name)
+            if array is None:
+                continue
+            path = self._cache_dir / f'level-{level}-{name}.npy'
+            out = np.lib.format.open_memmap(
+                path, mode='w+', dtype=array.dtype, shape=array.shape
+            )
+            out[...] = array
+            out.flush()
+            setattr(stored, name, np.load(path, mmap_mode='r'))
+        return stored
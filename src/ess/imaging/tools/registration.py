@@ -0,0 +1,218 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Tools for estimating and correcting the drift of images in a stack, e.g., over the
+frames of a long acquisition.
+"""
+
+import numpy as np
+import scipp as sc
+from numpy.typing import NDArray
+from scipy import fft
+
+
+def _as_frames(
+    images: sc.Variable | sc.DataArray, dims: tuple[str, str]
+) -> tuple[NDArray, list[str]]:
+    data = images if isinstance(images, sc.Variable) else images.data
+    other = [dim for dim in data.dims if dim not in dims]
+    values = data.transpose([*other, *dims]).values
+    return values.reshape(-1, *values.shape[-2:]), other
+
+
+def _subpixel_offset(left: NDArray, center: NDArray, right: NDArray) -> NDArray:
+    """Subpixel position of a phase correlation peak from its two neighbors.
+
+    For a pure translation, the phase correlation is a Dirichlet kernel centered at
+    the shift, and the ratio of the peak to its larger neighbor gives the fractional
+    part of the shift (Foroosh et al., IEEE Trans. Image Process. 11, 188 (2002)).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = np.where(
+            right >= left, right / (right + center), -left / (left + center)
+        )
+    return np.where(np.isfinite(offset), np.clip(offset, -0.5, 0.5), 0.0)
+
+
+def _chunk_shifts(
+    frames: NDArray, reference: NDArray, window: NDArray | None, workers: int
+) -> NDArray:
+    if window is not None:
+        frames = frames * window
+    cross = fft.rfft2(frames, workers=workers) * reference
+    cross /= np.maximum(np.abs(cross), np.finfo(np.float64).tiny)
+    correlation = fft.irfft2(cross, s=frames.shape[-2:], workers=workers)
+    n0, n1 = correlation.shape[-2:]
+    peak = np.argmax(correlation.reshape(len(correlation), -1), axis=-1)
+    i0, i1 = np.unravel_index(peak, (n0, n1))
+    frame = np.arange(len(correlation))
+    center = correlation[frame, i0, i1]
+    d0 = _subpixel_offset(
+        correlation[frame, (i0 - 1) % n0, i1],
+        center,
+        correlation[frame, (i0 + 1) % n0, i1],
+    )
+    d1 = _subpixel_offset(
+        correlation[frame, i0, (i1 - 1) % n1],
+        center,
+        correlation[frame, i0, (i1 + 1) % n1],
+    )
+    # Peaks in the upper half of the correlation correspond to negative shifts
+    shift0 = np.where(i0 > n0 // 2, i0 - n0, i0) + d0
+    shift1 = np.where(i1 > n1 // 2, i1 - n1, i1) + d1
+    return np.stack([shift0, shift1], axis=-1)
+
+
+def estimate_shifts(
+    images: sc.Variable | sc.DataArray,
+    dims: tuple[str, str] | list[str],
+    *,
+    reference: sc.Variable | sc.DataArray | None = None,
+    window: bool = True,
+    chunk_size: int = 64,
+    workers: int | None = None,
+) -> sc.DataGroup:
+    """
+    Estimate the translation of every image in a stack relative to a reference image
+    by phase correlation.
+
+    The Fourier transform of the reference is computed once, and the images are
+    processed in chunks of ``chunk_size`` frames with batched FFTs.
+    The shifts are refined to subpixel precision along each axis from the ratio of
+    the correlation peak to its larger neighbor (Foroosh et al., 2002).
+
+    Parameters
+    ----------
+    images:
+        The image stack. All dimensions other than ``dims``, e.g., ``time``,
+        are treated as frames.
+    dims:
+        The two image dimensions.
+    reference:
+        The reference image, with the dimensions ``dims``.
+        Defaults to the first frame of the stack.
+    window:
+        If ``True``, a Hann window is applied to the images to suppress the effect
+        of the discontinuities at the image edges. Only disable this for images that
+        are periodic.
+    chunk_size:
+        Number of frames transformed at once.
+    workers:
+        Number of threads used by the FFTs. Defaults to the number of cores.
+
+    Returns
+    -------
+    :
+        Data group with the shift along each of ``dims``, in pixels, such that an
+        image is the reference moved by the shift. The shifts have the dimensions of
+        the stack other than ``dims``.
+    """
+    dims = tuple(dims)
+    workers = workers or -1
+    frames, other = _as_frames(images, dims)
+    if reference is None:
+        reference = frames[0]
+    else:
+        reference = _as_frames(reference, dims)[0][0]
+    taper = None
+    if window:
+        taper = np.outer(np.hanning(frames.shape[-2]), np.hanning(frames.shape[-1]))
+        reference = reference * taper
+    reference_fft = np.conj(fft.rfft2(reference, workers=workers))
+
+    shifts = np.concatenate(
+        [
+            _chunk_shifts(
+                frames[start : start + chunk_size], reference_fft, taper, workers
+            )
+            for start in range(0, len(frames), chunk_size)
+        ]
+    )
+    sizes = {dim: images.sizes[dim] for dim in other}
+    coords = (
+        {}
+        if isinstance(images, sc.Variable)
+        else {
+            name: coord
+            for name, coord in images.coords.items()
+            if not set(coord.dims) & set(dims)
+        }
+    )
+    return sc.DataGroup(
+        {
+            dim: sc.DataArray(
+                sc.array(dims=['frame'], values=shifts[:, i]).fold(
+                    'frame', sizes=sizes
+                ),
+                coords=coords,
+            )
+            for i, dim in enumerate(dims)
+        }
+    )
+
+
+def apply_shifts(
+    images: sc.Variable | sc.DataArray,
+    shifts: sc.DataGroup,
+    *,
+    chunk_size: int = 64,
+    workers: int | None = None,
+) -> sc.Variable | sc.DataArray:
+    """
+    Move every image in a stack back by the given shifts, to align it with the
+    reference image.
+
+    The images are shifted by multiplying their Fourier transform with a phase
+    ramp, which handles subpixel shifts. Pixels that move out of the image on one
+    side re-enter on the other side.
+
+    Parameters
+    ----------
+    images:
+        The image stack.
+    shifts:
+        The shift along each image dimension, as returned by
+        :func:`estimate_shifts`.
+    chunk_size:
+        Number of frames transformed at once.
+    workers:
+        Number of threads used by the FFTs. Defaults to the number of cores.
+
+    Returns
+    -------
+    :
+        The aligned images, as floating point values.
+    """
+    dims = tuple(shifts)
+    frames, other = _as_frames(images, dims)
+    sizes = {dim: images.sizes[dim] for dim in other}
+    shift = np.stack(
+        [
+            shifts[dim].data.broadcast(sizes=sizes).transpose(other).values.reshape(-1)
+            for dim in dims
+        ],
+        axis=-1,
+    )
+    n0, n1 = frames.shape[-2:]
+    k0 = fft.fftfreq(n0)[:, None]
+    k1 = fft.rfftfreq(n1)[None, :]
+    workers = workers or -1
+    aligned = np.empty(frames.shape, dtype=np.float64)
+    for start in range(0, len(frames), chunk_size):
+        s = shift[start : start + chunk_size, :, None, None]
+        ramp = np.exp(2j * np.pi * (k0 * s[:, 0] + k1 * s[:, 1]))
+        aligned[start : start + chunk_size] = fft.irfft2(
+            fft.rfft2(frames[start : start + chunk_size], workers=workers) * ramp,
+            s=(n0, n1),
+            workers=workers,
+        )
+
+    data = images if isinstance(images, sc.Variable) else images.data
+    out = sc.array(
+        dims=[*other, *dims],
+        values=aligned.reshape(*(sizes[dim] for dim in other), n0, n1),
+        unit=data.unit,
+    ).transpose(data.dims)
+    if isinstance(images, sc.Variable):
+        return out
+    return sc.DataArray(out, coords=images.coords, masks=images.masks)
@@ -1,6 +1,104 @@
+from functools import lru_cache
+
 import numpy as np
 import scipp as sc
 from numpy.typing import NDArray
+from scipy import fft, sparse
+
+from .analysis import blockify
+
+
+def _fractional_positions(events: sc.DataArray, edges: sc.Variable) -> NDArray:
+    """Positions of the events relative to the range of the edges, in [0, 1]."""
+    coord = events.coords[edges.dim].to(unit=edges.unit, dtype='float64').values
+    low, high = edges[0].value, edges[-1].value
+    return (coord - low) / (high - low)
+
+
+class _OccupancyCounter:
+    """Counts the events in all pixels of candidate grids.
+
+    The events are reduced once to their time bin index and their fractional
+    position in the x and y range. If the events have few distinct positions, e.g.,
+    the positions of the detector pixels, the counts are accumulated into a cube of
+    cumulative counts over the time bins and the distinct positions, with at most
+    ``max_cells`` cells. Evaluating a grid of pixels then only looks up the corners
+    of every pixel, so its cost is proportional to the number of pixels. Otherwise,
+    evaluating a grid is a ``bincount`` over all events, so its cost is linear in
+    the number of events. The counts are exact in both cases.
+    """
+
+    def __init__(
+        self,
+        events: sc.DataArray,
+        x_edges: sc.Variable,
+        y_edges: sc.Variable,
+        time_bin_edges: sc.Variable,
+        max_cells: int = 2**23,
+    ) -> None:
+        t = events.coords[time_bin_edges.dim]
+        t = t.to(unit=time_bin_edges.unit, dtype='float64').values
+        time_edges = time_bin_edges.to(dtype='float64').values
+        self.ntime = len(time_edges) - 1
+        time_index = np.searchsorted(time_edges, t, side='right') - 1
+        v = _fractional_positions(events, y_edges)
+        if x_edges.dim == y_edges.dim:
+            # Binning with the same dim twice only applies the last edges
+            self.binned_x = False
+            u = np.zeros_like(v)
+        else:
+            self.binned_x = True
+            u = _fractional_positions(events, x_edges)
+        # Events on the upper edge are outside the range, as in ``DataArray.bin``
+        keep = (
+            (time_index >= 0)
+            & (time_index < self.ntime)
+            & (u >= 0)
+            & (u < 1)
+            & (v >= 0)
+            & (v < 1)
+        )
+        self.time_index = time_index[keep]
+        self.u = u[keep]
+        self.v = v[keep]
+        self.cumulative = None
+        self.u_values, u_rank = np.unique(self.u, return_inverse=True)
+        self.v_values, v_rank = np.unique(self.v, return_inverse=True)
+        nu, nv = len(self.u_values), len(self.v_values)
+        if self.ntime * (nu + 1) * (nv + 1) <= max_cells:
+            counts = np.bincount(
+                (self.time_index * nu + u_rank) * nv + v_rank,
+                minlength=self.ntime * nu * nv,
+            ).reshape(self.ntime, nu, nv)
+            # Number of events below each pair of distinct positions
+            self.cumulative = np.zeros((self.ntime, nu + 1, nv + 1), dtype=np.int64)
+            self.cumulative[:, 1:, 1:] = counts.cumsum(axis=1).cumsum(axis=2)
+
+    @staticmethod
+    def _pixel_bounds(values: NDArray, npixels: int) -> NDArray:
+        # Index of the first distinct position in every pixel, the pixel index is
+        # computed as for the events so that the counts are identical.
+        index = np.minimum((values * npixels).astype(np.int64), npixels - 1)
+        return np.searchsorted(index, np.arange(npixels + 1), side='left')
+
+    def min_counts(self, nx: int, ny: int) -> int:
+        """Minimum number of events in a pixel of a grid of ``nx`` by ``ny`` edges."""
+        npx, npy = (nx - 1 if self.binned_x else 1), ny - 1
+        if self.cumulative is not None:
+            bu = self._pixel_bounds(self.u_values, npx)
+            bv = self._pixel_bounds(self.v_values, npy)
+            corners = self.cumulative[:, bu[:, None], bv]
+            counts = (
+                corners[:, 1:, 1:]
+                - corners[:, :-1, 1:]
+                - corners[:, 1:, :-1]
+                + corners[:, :-1, :-1]
+            )
+            return int(counts.min())
+        ix = np.minimum((self.u * npx).astype(np.int64), npx - 1)
+        iy = np.minimum((self.v * npy).astype(np.int64), npy - 1)
+        index = (self.time_index * npx + ix) * npy + iy
+        return int(np.bincount(index, minlength=self.ntime * npx * npy).min())
 
 
 def maximum_resolution_achievable(
@@ -8,7 +106,7 @@ def maximum_resolution_achievable(
     coarse_x_bin_edges: sc.Variable,
     coarse_y_bin_edges: sc.Variable,
     time_bin_edges: sc.Variable,
-    max_tries: int = 10,
+    max_tries: int | None = None,
     max_pixels_x: int = 2048,
     max_pixels_y: int = 2048,
     raise_if_not_maximum: bool = False,
@@ -20,6 +118,14 @@ def maximum_resolution_achievable(
     as the resolution in ``xy`` such that
     there is at least one event in every ``xyt`` pixel.
 
+    The events are reduced to their time bin and their relative position in
+    ``x`` and ``y`` once, so that each candidate resolution is evaluated by counting
+    the events per pixel without binning the events again. If the events have few
+    distinct positions, e.g., the positions of the detector pixels, the counts of a
+    candidate are computed from cumulative counts at a cost proportional to the
+    number of pixels. Otherwise, the cost of every candidate is linear in the number
+    of events.
+
     Parameters
     -------------
     events:
@@ -35,16 +141,15 @@ def maximum_resolution_achievable(
         Desired resolution in ``t``.
     max_tries:
         The maximum number of iterations before giving up.
+        By default, the search continues until the maximum is found.
     max_pixels_x:
         The maximum number of pixels in ``x``.
     max_pixels_y:
         The maximum number of pixels in ``y``.
     raise_if_not_maximum:
-        Often it is not important to find the exact maximum resolution.
-        Therefore this parameter is ``False`` by default, and the function
-        returns an estimate of the maximum resolution.
-        If you want the returned resolution to be exactly the maximum resolution,
-        set the value of this parameter to ``True``.
+        If the search was stopped after ``max_tries`` iterations, the returned
+        resolution is only an estimate of the maximum resolution.
+        Set this parameter to ``True`` to raise an error in that case instead.
 
     Returns
     -------------
@@ -59,27 +164,14 @@ def maximum_resolution_achievable(
 
     nx = int(2**0.5 * lower_nx) + 1
     ny = int(2**0.5 * lower_ny) + 1
-    events = events.bin({time_bin_edges.dim: time_bin_edges})
-
-    for _ in range(max_tries):
-        xbins = sc.linspace(
-            coarse_x_bin_edges.dim, coarse_x_bin_edges[0], coarse_x_bin_edges[-1], nx
-        )
-        ybins = sc.linspace(
-            coarse_y_bin_edges.dim, coarse_y_bin_edges[0], coarse_y_bin_edges[-1], ny
-        )
-        min_counts_per_pixel = (
-            events.bin(
-                {
-                    coarse_x_bin_edges.dim: xbins,
-                    coarse_y_bin_edges.dim: ybins,
-                }
-            )
-            .bins.size()
-            .min()
-        )
+    counter = _OccupancyCounter(
+        events, coarse_x_bin_edges, coarse_y_bin_edges, time_bin_edges
+    )
 
-        if min_counts_per_pixel.value > 0:
+    tries = 0
+    while max_tries is None or tries < max_tries:
+        tries += 1
+        if counter.min_counts(nx, ny) > 0:
             lower_nx = nx
             lower_ny = ny
             nx = max(min(round((upper_nx * nx) ** 0.5), nx * 2), lower_nx + 1)
@@ -88,7 +180,7 @@ def maximum_resolution_achievable(
             upper_nx = nx
             upper_ny = ny
             nx = min(round((lower_nx * nx) ** 0.5), upper_nx - 1)
-            ny = min(round((lower_ny * ny) ** 0.5), upper_nx - 1)
+            ny = min(round((lower_ny * ny) ** 0.5), upper_ny - 1)
 
         if upper_nx - lower_nx < 2 and upper_ny - lower_ny < 2:
             break
@@ -116,21 +208,165 @@ def maximum_resolution_achievable(
     )
 
 
-def _radial_profile(data: NDArray) -> NDArray:
-    '''Integrate ellipses around center of image.'''
-    y, x = np.indices(data.shape)
-    cy, cx = np.array(data.shape) / 2.0
+def maximum_resolution_frontier(
+    events: sc.DataArray,
+    coarse_x_bin_edges: sc.Variable,
+    coarse_y_bin_edges: sc.Variable,
+    time_bin_edges: sc.Variable,
+    max_pixels_x: int = 2048,
+    max_pixels_y: int = 2048,
+) -> sc.DataArray:
+    """
+    Finds all combinations of resolutions in ``x`` and ``y`` that are achievable
+    given a desired binning in time, and that cannot be refined further along either
+    axis.
+
+    A resolution is achievable if there is at least one event in every ``xyt``
+    pixel, see :func:`maximum_resolution_achievable`. Unlike that function,
+    the numbers of bins in ``x`` and ``y`` are optimized independently, which
+    is useful for detectors with anisotropic count distributions.
+    For every number of bin edges ``nx``, the largest achievable ``ny`` is found by
+    bisection, and ranges of ``nx`` with the same largest ``ny`` are skipped.
+    This assumes that refining the binning along one axis never makes an
+    unachievable resolution achievable, which does not hold exactly for the
+    occupancy of a finite number of events.
+    The search is therefore heuristic: the returned resolutions are achievable and
+    do not dominate each other, but better resolutions may exist that were
+    not evaluated.
+
+    Parameters
+    -------------
+    events:
+        1D DataArray containing events with associated x, y, and t coordinates.
+    coarse_x_bin_edges:
+        Minimum acceptable resolution in ``x``.
+    coarse_y_bin_edges:
+        Minimum acceptable resolution in ``y``.
+    time_bin_edges:
+        Desired resolution in ``t``.
+    max_pixels_x:
+        The maximum number of pixels in ``x``.
+    max_pixels_y:
+        The maximum number of pixels in ``y``.
+
+    Returns
+    -------------
+    :
+        The Pareto set of the evaluated achievable resolutions, ordered by
+        strictly increasing ``nx`` and strictly decreasing ``ny``.
+        The data is the number of pixels in the ``xy`` plane, and the coordinates
+        ``nx`` and ``ny`` are the numbers of bin edges, from
+        ``coarse_x_bin_edges[0]`` to ``coarse_x_bin_edges[-1]`` and similarly
+        for ``y``. The set is empty if the coarse resolution is not achievable.
+    """
+    counter = _OccupancyCounter(
+        events, coarse_x_bin_edges, coarse_y_bin_edges, time_bin_edges
+    )
+    min_nx, min_ny = coarse_x_bin_edges.size, coarse_y_bin_edges.size
+    max_nx, max_ny = max_pixels_x + 1, max_pixels_y + 1
+    largest_ny = {}
+
+    def find_largest_ny(nx: int, low: int, high: int) -> int:
+        # Largest achievable ny in [low, high], or min_ny - 1 if there is none
+        if nx not in largest_ny:
+            low = max(low, min_ny)
+            if counter.min_counts(nx, low) == 0:
+                largest_ny[nx] = min_ny - 1
+            else:
+                while low < high:
+                    mid = (low + high + 1) // 2
+                    if counter.min_counts(nx, mid) > 0:
+                        low = mid
+                    else:
+                        high = mid - 1
+                largest_ny[nx] = low
+        return largest_ny[nx]
+
+    find_largest_ny(max_nx, min_ny, find_largest_ny(min_nx, min_ny, max_ny))
+    stack = [(min_nx, max_nx)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2 or largest_ny[a] == largest_ny[b]:
+            continue
+        mid = (a + b) // 2
+        find_largest_ny(mid, largest_ny[b], largest_ny[a])
+        stack.extend([(a, mid), (mid, b)])
+
+    nxs = sorted(largest_ny)
+    # Only keep the points that are not dominated by a point with a larger nx
+    frontier = []
+    best_ny = min_ny - 1
+    for nx in reversed(nxs):
+        if largest_ny[nx] > best_ny:
+            best_ny = largest_ny[nx]
+            frontier.append((nx, best_ny))
+    frontier.reverse()
+    nx = np.array([p[0] for p in frontier], dtype=np.int64)
+    ny = np.array([p[1] for p in frontier], dtype=np.int64)
+    return sc.DataArray(
+        sc.array(dims=['candidate'], values=(nx - 1) * (ny - 1)),
+        coords={
+            'nx': sc.array(dims=['candidate'], values=nx),
+            'ny': sc.array(dims=['candidate'], values=ny),
+        },
+    )
+
+
+@lru_cache(maxsize=16)
+def _radial_bins(shape: tuple[int, int]) -> sparse.csr_array:
+    """Matrix that integrates the magnitude of a real FFT over ellipses around the
+    center of the (shifted) full spectrum.
+
+    The radius of every position of the full spectrum is mapped to the element of
+    the real FFT with the same magnitude, using the conjugate symmetry of the
+    spectrum of a real image. Row ``r`` of the matrix averages the elements of
+    the real FFT over the full spectrum positions in the ring ``r``.
+    """
+    n0, n1 = shape
+    y, x = np.indices(shape)
+    cy, cx = n0 / 2.0, n1 / 2.0
     r = np.hypot((cx * cy) ** 0.5 * (x - cx) / cx, (cx * cy) ** 0.5 * (y - cy) / cy)
-    r = r.astype(np.int32)
-    tbin = np.bincount(r.ravel(), data.ravel())
-    nr = np.bincount(r.ravel())
-    return tbin / (nr + 1e-15)
+    r = r.astype(np.int32).ravel()
+    # Frequencies of the positions of the spectrum after ``fftshift``
+    k0 = (y - n0 // 2).ravel()
+    k1 = (x - n1 // 2).ravel()
+    negative = k1 < 0
+    source = np.where(negative, -k0, k0) % n0 * (n1 // 2 + 1) + np.abs(k1)
+    nr = np.bincount(r)
+    return sparse.csr_array(
+        (1.0 / nr[r], (r, source)), shape=(len(nr), n0 * (n1 // 2 + 1))
+    )
+
+
+def _radial_profiles(frames: NDArray, chunk_size: int, workers: int) -> NDArray:
+    """Radially integrated magnitude of the Fourier transform of every frame."""
+    bins = _radial_bins(frames.shape[-2:])
+    profiles = np.empty((len(frames), bins.shape[0]))
+    for start in range(0, len(frames), chunk_size):
+        chunk = frames[start : start + chunk_size]
+        magnitude = np.abs(fft.rfft2(chunk, workers=workers))
+        profiles[start : start + chunk_size] = (
+            bins @ magnitude.reshape(len(chunk), -1).T
+        ).T
+    return profiles
+
+
+def _normalized_frames(
+    image: sc.DataArray, dims: tuple[str, str], other: list[str]
+) -> NDArray:
+    values = image.transpose([*other, *dims]).values.astype(np.float64)
+    values = values.reshape(-1, *values.shape[-2:])
+    return values / values.sum(axis=(-2, -1), keepdims=True)
 
 
 def modulation_transfer_function(
     measured_image: sc.DataArray,
     open_beam_image: sc.DataArray,
     target: sc.DataArray,
+    *,
+    dims: tuple[str, str] | list[str] | None = None,
+    chunk_size: int = 64,
+    workers: int | None = None,
 ) -> sc.DataArray:
     '''
     Computes the modulation transfer function (MTF) of
@@ -138,21 +374,37 @@ def modulation_transfer_function(
     ideal image that would have been captured if
     the instrument had infinite resolution.
 
+    The measured image can be a stack of images, e.g., over ``time``,
+    ``position`` or exposure, in which case an MTF is computed for every
+    image of the stack.
+
     Parameters
     ------------
     measured_image:
-        The image of the sample captured by the camera.
+        The image of the sample captured by the camera,
+        or a stack of images.
     open_beam_image:
         The image without the sample captured by the camera.
+        Can be a single image or a stack like `measured_image`.
     target:
         A perfect image of the sample
         on the same grid as `measured_image`.
+    dims:
+        The two image dimensions. Other dimensions of `measured_image`
+        are treated as frames of a stack.
+        Defaults to the dimensions of `measured_image`, which must then be 2d.
+    chunk_size:
+        Number of images transformed at once.
+    workers:
+        Number of threads used by the FFTs. Defaults to the number of cores.
 
     Returns
     ------------
     :
         The modulation transfer function as a function
         of "frequency" representing "line pairs" per pixel.
+        Stacks have an MTF for every image, with the dimensions of the
+        stack and ``frequency``.
 
     Notes
     -----------
@@ -238,58 +490,185 @@ def modulation_transfer_function(
 
     The modulation transfer function at frequency :math:`f` can be estimated as the ratio of the Fourier transform of the image (integrated over constant frequency magnitude) to the Fourier transform of the open beam image multiplied by the sample mask (also integrated over constant frequency magnitude).
     '''  # noqa: E501
-    _measured = measured_image.values
-    # Can't do inplace because dtype of sum might be different from dtype of input
-    _measured = _measured / _measured.sum()
-    _reference = (open_beam_image * target).to(unit=measured_image.unit).values
-    _reference = _reference / _reference.sum()
-    f_ideal = np.abs(np.fft.fftshift(np.fft.fft2(_reference)))
-    f_measured = np.abs(np.fft.fftshift(np.fft.fft2(_measured)))
-    _mtf = _radial_profile(f_measured) / _radial_profile(f_ideal)
+    dims = measured_image.dims if dims is None else tuple(dims)
+    other = [dim for dim in measured_image.dims if dim not in dims]
+    sizes = {dim: measured_image.sizes[dim] for dim in other}
+    workers = workers or -1
+    reference = (open_beam_image * target).to(unit=measured_image.unit)
+    if any(dim in sizes for dim in reference.dims):
+        reference = reference.broadcast(sizes={**sizes, **reference.sizes})
+        reference_other = other
+    else:
+        reference_other = []
+    f_measured = _radial_profiles(
+        _normalized_frames(measured_image, dims, other), chunk_size, workers
+    )
+    f_ideal = _radial_profiles(
+        _normalized_frames(reference, dims, reference_other), chunk_size, workers
+    )
+    _mtf = (f_measured / f_ideal).reshape(*sizes.values(), -1)
     return sc.DataArray(
-        sc.array(dims=['frequency'], values=_mtf),
+        sc.array(dims=[*other, 'frequency'], values=_mtf),
         # Unit of frequency is line_pairs / pixel but since both of those are
         # a kind of counts I think in our unit system that is best
         # represented as 'dimensionless'.
         # The largest frequency magnitude in 2d fft is sqrt(1/2).
-        coords={'frequency': sc.linspace('frequency', 0, (1 / 2) ** 0.5, len(_mtf))},
+        coords={
+            'frequency': sc.linspace('frequency', 0, (1 / 2) ** 0.5, _mtf.shape[-1]),
+            **{
+                name: coord
+                for name, coord in measured_image.coords.items()
+                if not set(coord.dims) & set(dims)
+            },
+        },
         # We're only interested in frequencies below 0.5 oscillations per pixel
         # because those above are unphysical.
     )['frequency', : sc.scalar(0.5)]
 
 
-def estimate_cut_off_frequency(mtf: sc.DataArray) -> sc.Variable:
-    '''Estimates the cut off frequency of
-    the modulation transfer function (mtf).
+def _edge_positions(
+    image: NDArray, center: NDArray | None = None, width: float | None = None
+) -> NDArray:
+    """Centroid of the derivative across the edge in every row of the image."""
+    derivative = np.abs(np.diff(image, axis=1))
+    columns = np.arange(derivative.shape[1]) + 0.5
+    if center is not None:
+        # Suppress noise far from the edge with a Hamming window around the edge
+        distance = np.clip((columns - center[:, None]) / width, -1, 1)
+        derivative = derivative * (0.54 + 0.46 * np.cos(np.pi * distance))
+    return (derivative * columns).sum(axis=1) / derivative.sum(axis=1)
+
+
+def slanted_edge_mtf(
+    image: sc.DataArray,
+    *,
+    roi: dict[str, slice] | None = None,
+    oversampling: int = 4,
+) -> sc.DataArray:
+    '''
+    Computes the modulation transfer function (MTF) of
+    the camera from the image of a straight, slightly slanted edge,
+    following the slanted-edge method of ISO 12233.
+
+    The edge is located in every row of a small region around the edge
+    and a straight line is fitted to the edge positions.
+    The pixels are projected onto the normal of the edge and averaged in bins of
+    ``1 / oversampling`` pixels to obtain an oversampled edge spread function.
+    Its derivative, the line spread function, is Fourier transformed
+    to obtain the MTF.
+    Unlike :func:`modulation_transfer_function`, this requires no image of an ideal
+    target, and only the region around the edge is transformed.
 
     Parameters
-    -------------
-    mtf:
-        A (potentially noisy) modulation transfer function curve
-        having a coordinate named "frequency".
+    ------------
+    image:
+        A 2d image containing a straight edge that crosses the region of interest.
+        The edge should be tilted by a few degrees relative to the pixel grid,
+        so that the projected pixels cover all bins of the edge spread function.
+    roi:
+        Region of interest around the edge, e.g., ``{'x': slice(100, 150)}``.
+        Slices can be given as indices or as coordinate values.
+    oversampling:
+        Number of bins per pixel of the edge spread function.
 
     Returns
-    -------------
+    ------------
     :
-        An estimate of the frequency where the modulation
-        transfer function goes to zero, the "cut off frequency".
+        The modulation transfer function as a function
+        of "frequency" representing "line pairs" per pixel.
     '''
-    _freq = np.concat([[0.0], mtf.coords['frequency'].values])
-    _mtf = np.concat([[1.0], mtf.values])
+    for dim, selection in (roi or {}).items():
+        image = image[dim, selection]
+    if image.ndim != 2:
+        raise ValueError(f"Expected a 2d image, got dimensions {image.dims}.")
+    values = image.values.astype(np.float64)
+    # Orient the image such that the edge crosses the rows
+    if np.abs(np.diff(values, axis=0)).sum() > np.abs(np.diff(values, axis=1)).sum():
+        values = values.T
+    rows = np.arange(values.shape[0])
+    fit = np.polyfit(rows, _edge_positions(values), 1)
+    fit = np.polyfit(
+        rows,
+        _edge_positions(values, np.polyval(fit, rows), values.shape[1] / 2),
+        1,
+    )
+    edge = np.polyval(fit, rows)
+    # Distance of the pixel centers from the edge, along the normal of the edge
+    cos = 1 / np.hypot(1, fit[0])
+    distance = (np.arange(values.shape[1]) + 0.5 - edge[:, None]) * cos
+    # Only keep distances that are covered by every row
+    half_width = min(-distance[:, 0].max(), distance[:, -1].min())
+    if half_width < 2:
+        raise ValueError("The region of interest is too small around the edge.")
+    nbins = int(half_width * oversampling)
+    index = np.floor(distance * oversampling).astype(np.int64) + nbins
+    keep = (index >= 0) & (index < 2 * nbins)
+    total = np.bincount(index[keep], values[keep], minlength=2 * nbins)
+    counts = np.bincount(index[keep], minlength=2 * nbins)
+    filled = counts > 0
+    bins = np.arange(2 * nbins)
+    esf = np.interp(bins, bins[filled], total[filled] / counts[filled])
+
+    lsf = np.gradient(esf) * np.hamming(len(esf))
+    f_lsf = np.abs(np.fft.rfft(lsf))
+    frequency = np.fft.rfftfreq(len(lsf), d=1 / oversampling)
+    # Correct for the response of the finite difference used for the derivative
+    _mtf = f_lsf / f_lsf[0] / np.sinc(2 * frequency / oversampling)
+    return sc.DataArray(
+        sc.array(dims=['frequency'], values=_mtf),
+        coords={'frequency': sc.array(dims=['frequency'], values=frequency)},
+    )['frequency', : sc.scalar(0.5)]
+
+
+def _cut_off_frequencies(
+    frequency: NDArray, mtf: NDArray, valid: NDArray | None = None
+) -> NDArray:
+    """Cut off frequencies of a batch of MTF curves along the last axis.
+
+    A line through (0, 1) is fitted to every curve, iteratively excluding the
+    frequencies where the line is negative. The weighted least squares fit is
+    computed in closed form, for all curves that have not converged yet at once.
+    Points that are not ``valid`` are excluded from the fits.
+    """
+    x = np.concat([[0.0], frequency])
+    y = np.concatenate([np.ones((len(mtf), 1)), mtf], axis=1)
     # The line should go through (0, 1), so give it a big weight.
     # 10 x total_weight was determined good enough by trial and error.
-    w = np.concat([[10 * len(mtf)], np.ones(len(mtf))])
-    m = np.ones(len(_freq), dtype='bool')
-    fc = np.nan
+    # The weights apply to the residuals, as in ``np.polyfit``.
+    w = np.concat([[10 * len(frequency)], np.ones(len(frequency))]) ** 2
+    if valid is None:
+        valid = np.ones(mtf.shape, dtype='bool')
+    valid = np.concatenate([np.ones((len(mtf), 1), dtype='bool'), valid], axis=1)
+    y = np.where(valid, y, 0.0)
+    m = valid.copy()
+    fc = np.full(len(y), np.nan)
+    active = np.arange(len(y))
     maxiters = 100
     for _ in range(maxiters):
-        p = np.polyfit(_freq[m], _mtf[m], 1, w=w[m])
+        wm = w * m[active]
+        wy = wm * y[active]
+        sw = wm.sum(axis=1)
+        sx = wm @ x
+        sxx = wm @ x**2
+        sy = wy.sum(axis=1)
+        sxy = wy @ x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (sw * sxy - sx * sy) / (sw * sxx - sx**2)
+            estimate = -(sy - slope * sx) / sw / slope
         # 1e-4 is used as a threshold because the method is not
         # accurate to less than 1e-4 anyway so we can just as well stop there.
-        if abs(-p[1] / p[0] - fc) < 1e-4:
+        # Fits that failed, e.g., with fewer than two valid points, are not repeated.
+        converged = (np.abs(estimate - fc[active]) < 1e-4) | ~np.isfinite(estimate)
+        fc[active] = estimate
+        active, slope, estimate = (
+            active[~converged],
+            slope[~converged],
+            estimate[~converged],
+        )
+        if len(active) == 0:
             break
-        fc = -p[1] / p[0]
-        m = np.polyval(p, _freq) >= 0
+        # The line is non-negative below the estimate if the slope is negative
+        m[active] = valid[active] & (slope[:, None] * (x - estimate[:, None]) >= 0)
     # Correction factor 9/8 is the ratio between where a linear approximation
     # of the MTF of a circular apparture crosses 0 and where the actual cutoff frequency
     # of the same circular apparture is.
@@ -297,7 +676,185 @@ def estimate_cut_off_frequency(mtf: sc.DataArray) -> sc.Variable:
     # import sympy as sp
     # x, f, a = sp.symbols('x, f, a', positive=True)
     # sp.solve(sp.integrate(sp.diff((1 - a * x - 2 / sp.pi * (sp.acos(x/f) - x/f * sp.sqrt(1 - x**2/f**2)))**2, a), (x, 0, f)), f)  # noqa: E501
-    return 9 / 8 * sc.scalar(-p[1] / p[0], unit=mtf.coords['frequency'].unit)
+    return 9 / 8 * fc
+
+
+def estimate_cut_off_frequency(mtf: sc.DataArray) -> sc.Variable:
+    '''Estimates the cut off frequency of
+    the modulation transfer function (mtf).
+
+    Parameters
+    -------------
+    mtf:
+        A (potentially noisy) modulation transfer function curve
+        having a coordinate named "frequency".
+
+    Returns
+    -------------
+    :
+        An estimate of the frequency where the modulation
+        transfer function goes to zero, the "cut off frequency".
+    '''
+    fc = _cut_off_frequencies(mtf.coords['frequency'].values, mtf.values[None])
+    return sc.scalar(fc[0], unit=mtf.coords['frequency'].unit)
+
+
+def estimate_cut_off_frequencies(mtf: sc.DataArray) -> sc.DataArray:
+    '''Estimates the cut off frequencies of a batch of
+    modulation transfer functions (mtf), e.g., of tiles, frames or pixels.
+
+    This gives the same results as :func:`estimate_cut_off_frequency` applied to
+    every curve, but all curves are fitted at once.
+
+    Parameters
+    -------------
+    mtf:
+        (Potentially noisy) modulation transfer function curves
+        along the dimension "frequency", with a coordinate named "frequency".
+        All other dimensions are batch dimensions.
+        Masked and non-finite values are excluded from the fits.
+
+    Returns
+    -------------
+    :
+        An estimate of the frequency where the modulation
+        transfer function goes to zero, the "cut off frequency",
+        for every curve. The result has the batch dimensions,
+        and the coordinates and masks of ``mtf`` that do not depend on "frequency".
+        The estimate is NaN for curves with too few valid points.
+    '''
+    frequency = mtf.coords['frequency']
+    batch_dims = [dim for dim in mtf.dims if dim != 'frequency']
+    curves = mtf.transpose([*batch_dims, 'frequency'])
+    values = curves.values.reshape(-1, mtf.sizes['frequency'])
+    valid = np.isfinite(values)
+    for mask in mtf.masks.values():
+        if 'frequency' in mask.dims:
+            mask = mask.broadcast(sizes=curves.sizes).transpose(curves.dims)
+            valid &= ~mask.values.reshape(valid.shape)
+    fc = _cut_off_frequencies(frequency.values, values, valid)
+    return sc.DataArray(
+        sc.array(
+            dims=batch_dims,
+            values=fc.reshape(curves.shape[:-1]),
+            unit=frequency.unit,
+        ),
+        coords={
+            name: coord
+            for name, coord in mtf.coords.items()
+            if 'frequency' not in coord.dims
+        },
+        masks={
+            name: mask.copy()
+            for name, mask in mtf.masks.items()
+            if 'frequency' not in mask.dims
+        },
+    )
+
+
+def _tiles(image: sc.DataArray, sizes: dict[str, int]) -> sc.DataArray:
+    """Split an image into tiles, dropping the pixels that do not fill a tile.
+
+    Coordinates along the tiled dimensions are replaced by the tile centers.
+    """
+    for dim, size in sizes.items():
+        image = image[dim, : image.sizes[dim] // size * size]
+    tiled = image.drop_coords(
+        [name for name, coord in image.coords.items() if set(coord.dims) & set(sizes)]
+    )
+    tiled = blockify(tiled, sizes=sizes)
+    for dim, size in sizes.items():
+        if dim in image.coords and not image.coords.is_edges(dim):
+            coord = blockify(image.coords[dim], sizes={dim: size})
+            tiled.coords[dim] = coord.mean(set(coord.dims) - {dim})
+    return tiled
+
+
+def local_modulation_transfer_function(
+    measured_image: sc.DataArray,
+    open_beam_image: sc.DataArray,
+    target: sc.DataArray,
+    sizes: dict[str, int],
+    *,
+    chunk_size: int = 64,
+    workers: int | None = None,
+) -> sc.DataArray:
+    '''
+    Computes the modulation transfer function (MTF) in every tile of
+    the field of view, to see how the resolution varies across the detector.
+
+    The images are split into tiles with :func:`blockify`, and the MTFs of all
+    tiles are computed in one batched pass of
+    :func:`modulation_transfer_function`.
+
+    Parameters
+    ------------
+    measured_image:
+        The image of the sample captured by the camera,
+        or a stack of images.
+    open_beam_image:
+        The image without the sample captured by the camera.
+    target:
+        A perfect image of the sample
+        on the same grid as `measured_image`.
+    sizes:
+        The size of the tiles along the two image dimensions,
+        e.g., ``{'y': 64, 'x': 64}``.
+        Pixels at the end of the image that do not fill a tile are ignored.
+    chunk_size:
+        Number of tiles transformed at once.
+    workers:
+        Number of threads used by the FFTs. Defaults to the number of cores.
+
+    Returns
+    ------------
+    :
+        The modulation transfer function of every tile, with the image dimensions
+        indexing the tiles, and ``frequency``. The coordinates of the image
+        dimensions, if any, are the centers of the tiles.
+    '''
+    if len(sizes) != 2:
+        raise ValueError(f"Expected tile sizes for two dimensions, got {sizes}.")
+    tiled = [
+        _tiles(image, sizes) for image in (measured_image, open_beam_image, target)
+    ]
+    tile_dims = tuple(dim for dim in tiled[0].dims if dim not in measured_image.dims)
+    return modulation_transfer_function(
+        *tiled, dims=tile_dims, chunk_size=chunk_size, workers=workers
+    )
+
+
+def cut_off_frequency_map(
+    measured_image: sc.DataArray,
+    open_beam_image: sc.DataArray,
+    target: sc.DataArray,
+    sizes: dict[str, int],
+    *,
+    chunk_size: int = 64,
+    workers: int | None = None,
+) -> sc.DataArray:
+    '''
+    Estimates the cut off frequency of the modulation transfer function in every
+    tile of the field of view.
+
+    See :func:`local_modulation_transfer_function` for the parameters, and
+    :func:`estimate_cut_off_frequencies` for how the cut off frequency is estimated.
+
+    Returns
+    ------------
+    :
+        The cut off frequency of every tile, with the image dimensions
+        indexing the tiles.
+    '''
+    mtf = local_modulation_transfer_function(
+        measured_image,
+        open_beam_image,
+        target,
+        sizes,
+        chunk_size=chunk_size,
+        workers=workers,
+    )
+    return estimate_cut_off_frequencies(mtf)
 
 
 def mtf_less_than(mtf: sc.DataArray, limit: sc.Variable) -> sc.Variable:
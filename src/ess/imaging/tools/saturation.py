@@ -1,10 +1,49 @@
+from typing import Literal
+
 import numpy as np
 import scipp as sc
+from numpy.typing import NDArray
+
+
+def _randomized_left_singular_vectors(
+    values: NDArray, rank: int, oversampling: int = 8, power_iterations: int = 4
+) -> NDArray:
+    """The first ``rank`` left singular vectors of a matrix, using a randomized
+    range finder (Halko et al., SIAM Rev. 53, 217 (2011)).
+
+    The random projections use a fixed seed, so the result is deterministic.
+    """
+    rng = np.random.default_rng(0)
+    sketch = rng.standard_normal((values.shape[1], rank + oversampling))
+    q = np.linalg.qr(values @ sketch)[0]
+    # Power iterations sharpen the separation of the singular values
+    for _ in range(power_iterations):
+        q = np.linalg.qr(values.T @ q)[0]
+        q = np.linalg.qr(values @ q)[0]
+    return q @ np.linalg.svd(q.T @ values, full_matrices=False)[0][:, :rank]
+
+
+def _signed_indicators(gain: NDArray, indicators: NDArray) -> NDArray:
+    # The sign of indicator is arbitrary, to make sure the extremum is a maximum
+    # multiply by the sign of the second derivative.
+    curvature = np.polyfit(gain, indicators.T, 2)[0]
+    return indicators * -np.sign(curvature)[:, None]
+
+
+def _indicator(
+    gain: sc.Variable, indicator: NDArray, threshold: float
+) -> tuple[sc.DataArray, sc.Variable]:
+    indicator = _signed_indicators(gain.values, indicator[None])[0]
+    return sc.DataArray(
+        sc.array(dims=['gain'], values=indicator), coords={'gain': gain}
+    ), threshold * gain['gain', np.argmax(indicator)]
 
 
 def saturation_indicator(
     intensity: sc.DataArray,
     threshold: float = 0.9,
+    *,
+    method: Literal['full', 'randomized'] = 'full',
 ) -> tuple[sc.DataArray, sc.Variable]:
     """
     The intensity is supposed to be a signal that scales with the gain
@@ -24,26 +63,201 @@ def saturation_indicator(
         Must be between 0 and 1.
         Corresponds to the acceptable reduction in intensity
         to create margin to the saturation region.
+    method:
+        How the second component is computed.
+        ``'full'`` computes the full singular value decomposition.
+        ``'randomized'`` only computes the first two components with a randomized
+        algorithm, which is much faster for fine wavelength binnings and long gain
+        scans.
 
     Returns
     -------------
         The saturation indicator value as a function of 'gain',
         and the maximum gain value acceptable according to the
         provided threshold.
+
+    See also
+    -------------
+    IncrementalSaturationIndicator:
+        Updates the indicator as new gain steps are acquired.
+    saturation_map:
+        Computes the indicator for every region of the camera.
     """
     if intensity.dims != ('gain', 'wavelength'):
         raise ValueError(
             'Expected two dimensional input, with dimensions "gain" and "wavelength".'
         )
 
-    gain = intensity.coords['gain']
     # The change in the amplitude of the second component indicates
     # a new component is present in the signal.
-    indicator = np.linalg.svd(intensity.values, full_matrices=False)[0][:, 1]
-    # The sign of indicator is arbitrary, to make sure the extremum is a maximum
-    # multiply by the sign of the second derivative.
-    indicator *= -np.sign(np.polyfit(gain.values, indicator, 2)[0])
+    if method == 'full':
+        vectors = np.linalg.svd(intensity.values, full_matrices=False)[0]
+    elif method == 'randomized':
+        vectors = _randomized_left_singular_vectors(intensity.values, rank=2)
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'full' or 'randomized'.")
+    return _indicator(intensity.coords['gain'], vectors[:, 1], threshold)
 
-    return sc.DataArray(
-        sc.array(dims=['gain'], values=indicator), coords={'gain': gain}
-    ), threshold * gain['gain', np.argmax(indicator)]
+
+class IncrementalSaturationIndicator:
+    """
+    Saturation indicator that is updated as new gain steps of a gain scan are
+    acquired, see :func:`saturation_indicator`.
+
+    A truncated singular value decomposition of the intensity is updated with every
+    new gain step (Brand, Linear Algebra Appl. 415, 20 (2006)), so the cost of an
+    update does not grow with the number of gain steps, and the intensities of
+    previous gain steps are not stored.
+
+    Parameters
+    ----------
+    wavelength:
+        The wavelength coordinate of the intensities.
+    rank:
+        The number of components of the decomposition that are kept.
+        Must be at least 2.
+    """
+
+    def __init__(self, wavelength: sc.Variable, *, rank: int = 8) -> None:
+        if rank < 2:
+            raise ValueError(f"The rank must be at least 2, got {rank}.")
+        self._wavelength = wavelength
+        self._rank = rank
+        self._gains = []
+        self._u = np.zeros((0, 0))
+        self._s = np.zeros(0)
+        self._vt = np.zeros((0, wavelength.sizes['wavelength']))
+
+    def __len__(self) -> int:
+        return len(self._gains)
+
+    def add(self, intensity: sc.DataArray) -> None:
+        """
+        Add one or more gain steps.
+
+        Parameters
+        ----------
+        intensity:
+            The intensity as a function of wavelength, with a scalar ``gain``
+            coordinate, or as a function of gain and wavelength.
+        """
+        if intensity.dims == ('wavelength',):
+            intensity = intensity.broadcast(
+                dims=['gain', 'wavelength'], shape=[1, intensity.shape[0]]
+            ).assign_coords(gain=intensity.coords['gain'].broadcast(sizes={'gain': 1}))
+        if intensity.dims != ('gain', 'wavelength'):
+            raise ValueError(
+                'Expected dimensions "wavelength" or "gain" and "wavelength", '
+                f'got {intensity.dims}.'
+            )
+        if not sc.identical(intensity.coords['wavelength'], self._wavelength):
+            raise ValueError('The wavelength coordinate does not match.')
+        gain = intensity.coords['gain']
+        if self._gains and gain.unit != self._gains[0].unit:
+            gain = gain.to(unit=self._gains[0].unit)
+        for i, row in enumerate(intensity.values):
+            self._add_row(row)
+            self._gains.append(gain['gain', i])
+
+    def _add_row(self, row: NDArray) -> None:
+        # Append the row to U S Vt: the new row is split into its projection
+        # onto the current right singular vectors and the orthogonal residual.
+        projection = self._vt @ row
+        residual = row - projection @ self._vt
+        norm = np.linalg.norm(residual)
+        if norm <= 1e-10 * np.linalg.norm(row):
+            # The row is in the span of the current basis, up to rounding errors
+            residual[:] = 0.0
+            norm = 0.0
+        k = len(self._s)
+        middle = np.zeros((k + 1, k + 1))
+        middle[:k, :k] = np.diag(self._s)
+        middle[k, :k] = projection
+        middle[k, k] = norm
+        u, s, vt = np.linalg.svd(middle)
+        basis = np.vstack([self._vt, residual / norm if norm > 0 else residual])
+        left = np.zeros((len(self._u) + 1, k + 1))
+        left[:-1, :k] = self._u
+        left[-1, k] = 1.0
+        rank = min(self._rank, k + 1)
+        self._u = (left @ u)[:, :rank]
+        self._s = s[:rank]
+        self._vt = (vt @ basis)[:rank]
+
+    def compute(self, threshold: float = 0.9) -> tuple[sc.DataArray, sc.Variable]:
+        """
+        The saturation indicator of the gain steps added so far, and the maximum
+        gain acceptable according to the provided threshold.
+        See :func:`saturation_indicator`.
+        """
+        if len(self) < 3:
+            raise ValueError(f'At least 3 gain steps are required, got {len(self)}.')
+        gain = sc.concat(self._gains, 'gain')
+        return _indicator(gain, self._u[:, 1], threshold)
+
+
+def saturation_map(
+    intensity: sc.DataArray,
+    threshold: float = 0.9,
+) -> tuple[sc.DataArray, sc.DataArray]:
+    """
+    Computes the saturation indicator of :func:`saturation_indicator` separately
+    for every region of the camera, because saturation can set in at different
+    gains across the camera.
+
+    The second component of the decomposition of all regions is computed at once,
+    from the eigenvectors of the ``gain`` by ``gain`` matrices
+    :math:`I I^T` of the intensities :math:`I` of the regions.
+
+    Parameters
+    -------------
+    intensity:
+        The intensity as a function of gain, wavelength and the region of the
+        camera, for example, the image dimensions of a :func:`blockify`-ed or
+        :func:`resample`-d image.
+        All dimensions other than ``gain`` and ``wavelength`` index the regions.
+    threshold:
+        Safety factor to avoid saturation region.
+        Must be between 0 and 1.
+        Corresponds to the acceptable reduction in intensity
+        to create margin to the saturation region.
+
+    Returns
+    -------------
+        The saturation indicator value as a function of the region and 'gain',
+        and the maximum gain value acceptable in every region according to the
+        provided threshold.
+    """
+    if not {'gain', 'wavelength'} <= set(intensity.dims):
+        raise ValueError('Expected input with dimensions "gain" and "wavelength".')
+    regions = [dim for dim in intensity.dims if dim not in ('gain', 'wavelength')]
+    sizes = {dim: intensity.sizes[dim] for dim in regions}
+    values = intensity.transpose([*regions, 'gain', 'wavelength']).values
+    values = values.reshape(-1, *values.shape[-2:])
+
+    # The eigenvectors of I I^T are the left singular vectors of I,
+    # and eigh sorts the eigenvalues in ascending order.
+    gram = values @ values.transpose(0, 2, 1)
+    indicators = np.linalg.eigh(gram)[1][..., -2]
+    gain = intensity.coords['gain']
+    indicators = _signed_indicators(gain.values, indicators)
+
+    coords = {
+        name: coord
+        for name, coord in intensity.coords.items()
+        if not set(coord.dims) & {'gain', 'wavelength'}
+    }
+    indicator = sc.DataArray(
+        sc.array(
+            dims=[*regions, 'gain'],
+            values=indicators.reshape(*sizes.values(), -1),
+        ),
+        coords={**coords, 'gain': gain},
+    )
+    max_gain = threshold * gain.values[np.argmax(indicators, axis=-1)]
+    return indicator, sc.DataArray(
+        sc.array(
+            dims=regions, values=max_gain.reshape(*sizes.values()), unit=gain.unit
+        ),
+        coords=coords,
+    )
@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+"""
+Contains the providers to compute wavelength-dependent transmission from event data.
+"""
+
+from .compact import _double_precision_weights, poisson_variances
+from .tools import blockify
+from .types import (
+    CorrectedDetector,
+    OpenBeamRun,
+    RunType,
+    SampleRun,
+    SuperPixelSizes,
+    TransmissionCube,
+    TransmissionSpectrum,
+    WavelengthBins,
+    WavelengthCube,
+    WavelengthSpectrum,
+)
+
+
+def histogram_wavelength_spectrum(
+    da: CorrectedDetector[RunType], bins: WavelengthBins
+) -> WavelengthSpectrum[RunType]:
+    """
+    Histogram the events of all pixels in wavelength.
+
+    The events are histogrammed directly from the event buffer, without first
+    concatenating the event lists of all pixels.
+    If the events have no variances, the variances are set to the counts.
+    Single precision event weights are summed in double precision.
+
+    Parameters
+    ----------
+    da:
+        Detector data with a wavelength event coordinate.
+    bins:
+        Wavelength bin edges.
+    """
+    return WavelengthSpectrum[RunType](
+        poisson_variances(
+            _double_precision_weights(da).hist(wavelength=bins, dim=da.dims)
+        )
+    )
+
+
+def histogram_wavelength_cube(
+    da: CorrectedDetector[RunType], bins: WavelengthBins, sizes: SuperPixelSizes
+) -> WavelengthCube[RunType]:
+    """
+    Histogram the events in wavelength for every super-pixel.
+
+    The pixels are grouped into super-pixels by folding the pixel dimensions, which
+    does not copy the events. The events of all pixels in a super-pixel are then
+    histogrammed in a single pass.
+    If the events have no variances, the variances are set to the counts.
+    Single precision event weights are summed in double precision.
+
+    Parameters
+    ----------
+    da:
+        Detector data with a wavelength event coordinate.
+    bins:
+        Wavelength bin edges.
+    sizes:
+        Number of pixels in each super-pixel along each dimension.
+    """
+    blocked = blockify(_double_precision_weights(da), sizes=sizes)
+    block_dims = tuple(set(blocked.dims) - set(da.dims))
+    out = poisson_variances(blocked.hist(wavelength=bins, dim=block_dims))
+    if 'position' in blocked.coords:
+        out.coords['position'] = blocked.coords['position'].mean(block_dims)
+    return WavelengthCube[RunType](out)
+
+
+def compute_transmission_spectrum(
+    sample: WavelengthSpectrum[SampleRun], open_beam: WavelengthSpectrum[OpenBeamRun]
+) -> TransmissionSpectrum:
+    """
+    Divide the sample wavelength spectrum by the open beam wavelength spectrum.
+
+    Parameters
+    ----------
+    sample:
+        Wavelength spectrum of the sample run.
+    open_beam:
+        Wavelength spectrum of the open beam run.
+    """
+    return TransmissionSpectrum(sample / open_beam)
+
+
+def compute_transmission_cube(
+    sample: WavelengthCube[SampleRun], open_beam: WavelengthCube[OpenBeamRun]
+) -> TransmissionCube:
+    """
+    Divide the per-(super-)pixel wavelength spectra of the sample run by those of the
+    open beam run.
+
+    Parameters
+    ----------
+    sample:
+        Wavelength spectra of the sample run.
+    open_beam:
+        Wavelength spectra of the open beam run.
+    """
+    return TransmissionCube(sample / open_beam)
+
+
+providers = (
+    histogram_wavelength_spectrum,
+    histogram_wavelength_cube,
+    compute_transmission_spectrum,
+    compute_transmission_cube,
+)
+"""Providers to compute wavelength-dependent transmission."""
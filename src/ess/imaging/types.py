@@ -13,11 +13,13 @@ from ess.reduce.uncertainty import UncertaintyBroadcastMode as _UncertaintyBroad
 
 # 1 TypeVars used to parametrize the generic parts of the workflow
 
+EmptyDetector = reduce_t.EmptyDetector
 Filename = reduce_t.Filename
 GravityVector = reduce_t.GravityVector
 NeXusDetectorName = reduce_t.NeXusDetectorName
 NeXusMonitorName = reduce_t.NeXusName
 NeXusComponent = reduce_t.NeXusComponent
+NeXusData = reduce_t.NeXusData
 Position = reduce_t.Position
 RawDetector = reduce_t.RawDetector
 RawMonitor = reduce_t.RawMonitor
@@ -65,6 +67,21 @@ class CoordTransformGraph(sciline.Scope[RunType, dict], dict):
     """
 
 
+class WavelengthConversionFactor(sciline.Scope[RunType, sc.Variable], sc.Variable):
+    """
+    Per-pixel factor :math:`h / (m_n L_{total})` converting time-of-flight to
+    wavelength. It only depends on the detector geometry and can be re-used across runs.
+    """
+
+
+class FrameAcceptance(sciline.Scope[RunType, sc.DataArray], sc.DataArray):
+    """
+    Boolean map of the event time offsets at which neutrons transmitted by the chopper
+    cascade can arrive, as a function of the distance from the source.
+    Events outside the accepted regions are rejected when loading the data.
+    """
+
+
 class WavelengthDetector(sciline.Scope[RunType, sc.DataArray], sc.DataArray):
     """Detector counts with wavelength information."""
 
@@ -90,6 +107,30 @@ NormalizedImage = NewType('NormalizedImage', sc.DataArray)
 beam run."""
 
 
+WavelengthBins = NewType('WavelengthBins', sc.Variable)
+"""Wavelength bin edges used to histogram the detector events."""
+
+SuperPixelSizes = NewType('SuperPixelSizes', dict[str, int])
+"""Number of detector pixels along each spatial dimension that are summed into one
+super-pixel, e.g., ``{'x': 4, 'y': 4}``. An empty dict keeps the full resolution."""
+
+
+class WavelengthSpectrum(sciline.Scope[RunType, sc.DataArray], sc.DataArray):
+    """Detector counts histogrammed in wavelength and summed over all pixels."""
+
+
+class WavelengthCube(sciline.Scope[RunType, sc.DataArray], sc.DataArray):
+    """Detector counts histogrammed in wavelength for every (super-)pixel."""
+
+
+TransmissionSpectrum = NewType('TransmissionSpectrum', sc.DataArray)
+"""Wavelength spectrum of the sample run divided by that of the open beam run."""
+
+TransmissionCube = NewType('TransmissionCube', sc.DataArray)
+"""Per-(super-)pixel wavelength spectra of the sample run divided by those of the open
+beam run."""
+
+
 class ProtonCharge(sciline.Scope[RunType, sc.DataArray], sc.DataArray):
     """Proton charge data for a run."""
 
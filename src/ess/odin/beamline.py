@@ -1,11 +1,22 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
 
+from functools import cache
 from types import MappingProxyType
 
+import numpy as np
 import scipp as sc
 from scippneutron.chopper import DiskChopper
 
+from ..imaging.frames import compute_frame_acceptance
+from ..imaging.lut import build_tof_lookup_table
+from ..imaging.types import (
+    DetectorLtotal,
+    FrameAcceptance,
+    RunType,
+    TimeOfFlightLookupTable,
+)
+
 # Choppers
 Hz = sc.Unit("Hz")
 deg = sc.Unit("deg")
@@ -118,3 +129,78 @@ def choppers(source_position: sc.Variable) -> MappingProxyType[str, DiskChopper]
             for key, ch in parameters.items()
         }
     )
+
+
+@cache
+def _frame_acceptance(distance_min: float, distance_max: float) -> sc.DataArray:
+    source_position = sc.vector([0.0, 0.0, 0.0], unit="m")
+    return compute_frame_acceptance(
+        choppers(source_position),
+        source_position=source_position,
+        distance=sc.arange(
+            "distance", distance_min, distance_max + 0.05, 0.1, unit="m"
+        ),
+        pulse_period=sc.scalar(1.0 / 14.0, unit="s"),
+    )
+
+
+def frame_acceptance(ltotal: DetectorLtotal[RunType]) -> FrameAcceptance[RunType]:
+    """
+    Event time offsets at which neutrons transmitted by the ODIN chopper cascade can
+    arrive at the detector pixels.
+
+    The result only depends on the range of pixel distances, rounded to 10 cm, and is
+    cached so that it is computed once for all runs. Every call returns a copy of
+    the cached table.
+
+    Parameters
+    ----------
+    ltotal:
+        Distance from the source of each detector pixel.
+    """
+    ltotal = ltotal.to(unit="m")
+    distance_min = float(np.floor(ltotal.min().value * 10) / 10)
+    distance_max = float(np.ceil(ltotal.max().value * 10) / 10)
+    return FrameAcceptance[RunType](
+        _frame_acceptance(distance_min, distance_max).copy()
+    )
+
+
+def tof_lookup_table(
+    *,
+    neutrons: int = 5_000_000,
+    max_workers: int | None = None,
+    cache_dir: str | None = None,
+) -> sc.DataArray:
+    """
+    Time-of-flight lookup table for the ODIN chopper settings in :py:data:`parameters`.
+
+    The table is simulated in parallel the first time it is requested and cached on
+    disk. It is simulated again only when the chopper parameters change.
+    See :py:func:`ess.imaging.lut.build_tof_lookup_table`.
+
+    Parameters
+    ----------
+    neutrons:
+        Number of neutrons to simulate.
+    max_workers:
+        The number of worker processes used for the simulation.
+    cache_dir:
+        Directory of the cache.
+    """
+    source_position = sc.vector([0.0, 0.0, 0.0], unit="m")
+    return build_tof_lookup_table(
+        choppers(source_position),
+        source_position=source_position,
+        ltotal_range=(sc.scalar(55.0, unit="m"), sc.scalar(65.0, unit="m")),
+        neutrons=neutrons,
+        pulse_stride=2,
+        error_threshold=0.02,
+        max_workers=max_workers,
+        cache_dir=cache_dir,
+    )
+
+
+def simulated_tof_lookup_table() -> TimeOfFlightLookupTable:
+    """Provider of the cached :py:func:`tof_lookup_table`."""
+    return TimeOfFlightLookupTable(tof_lookup_table())
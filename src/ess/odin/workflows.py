@@ -8,7 +8,14 @@ import sciline
 
 from ess.reduce.time_of_flight.workflow import GenericTofWorkflow
 
+from ..imaging.compact import (
+    assemble_compact_detector_data,
+    assemble_compact_detector_data_in_frames,
+    compute_compact_detector_wavelength,
+)
 from ..imaging.conversion import providers as conversion_providers
+from ..imaging.frames import assemble_detector_data_in_frames
+from ..imaging.transmission import providers as transmission_providers
 from ..imaging.types import (
     BeamMonitor1,
     BeamMonitor2,
@@ -19,7 +26,9 @@ from ..imaging.types import (
     OpenBeamRun,
     PulseStrideOffset,
     SampleRun,
+    SuperPixelSizes,
 )
+from .beamline import frame_acceptance, simulated_tof_lookup_table
 from .masking import providers as masking_providers
 
 
@@ -33,9 +42,32 @@ def default_parameters() -> dict:
     }
 
 
-def OdinWorkflow(**kwargs) -> sciline.Pipeline:
+def OdinWorkflow(
+    *,
+    reject_events_outside_frames: bool = False,
+    simulate_tof_lookup_table: bool = False,
+    compact_events: bool = False,
+    **kwargs,
+) -> sciline.Pipeline:
     """
     Workflow with default parameters for Odin.
+
+    Parameters
+    ----------
+    reject_events_outside_frames:
+        If ``True``, events with a time offset that cannot be reached by neutrons
+        transmitted by the chopper cascade are dropped when loading the data,
+        before the time-of-flight and wavelength conversions.
+    simulate_tof_lookup_table:
+        If ``True``, the time-of-flight lookup table is simulated from the chopper
+        settings in :py:mod:`ess.odin.beamline` when first needed, and cached on disk,
+        instead of being loaded from ``TimeOfFlightLookupTableFilename``.
+    compact_events:
+        If ``True``, event weights and floating-point event coordinates are stored in
+        single precision and the weights have no variances. ``WavelengthSpectrum``
+        and ``WavelengthCube`` sum the weights in double precision and compute the
+        variances from the counts. Plain ``hist`` of the events does neither, use
+        :py:func:`ess.imaging.compact.histogram_events` instead.
     """
     workflow = GenericTofWorkflow(
         run_types=[SampleRun, OpenBeamRun, DarkBackgroundRun],
@@ -44,16 +76,38 @@ def OdinWorkflow(**kwargs) -> sciline.Pipeline:
     )
     for key, param in default_parameters().items():
         workflow[key] = param
+    if reject_events_outside_frames:
+        workflow.insert(frame_acceptance)
+        workflow.insert(
+            assemble_compact_detector_data_in_frames
+            if compact_events
+            else assemble_detector_data_in_frames
+        )
+    elif compact_events:
+        workflow.insert(assemble_compact_detector_data)
+    if simulate_tof_lookup_table:
+        workflow.insert(simulated_tof_lookup_table)
     return workflow
 
 
-def OdinBraggEdgeWorkflow(**kwargs) -> sciline.Pipeline:
+def OdinBraggEdgeWorkflow(
+    *, compact_events: bool = False, **kwargs
+) -> sciline.Pipeline:
     """
     Workflow with default parameters for Odin.
+
+    Accepts the same keyword arguments as :py:func:`OdinWorkflow`.
     """
-    workflow = OdinWorkflow(**kwargs)
-    for provider in (*conversion_providers, *masking_providers):
+    workflow = OdinWorkflow(compact_events=compact_events, **kwargs)
+    for provider in (
+        *conversion_providers,
+        *masking_providers,
+        *transmission_providers,
+    ):
         workflow.insert(provider)
+    if compact_events:
+        workflow.insert(compute_compact_detector_wavelength)
+    workflow[SuperPixelSizes] = {}
     return workflow
 
 
@@ -6,7 +6,7 @@ import importlib.metadata
 
 from . import orca
 from .orca import OrcaNormalizedImagesWorkflow
-from .workflow import TblWorkflow, default_parameters
+from .workflow import TblWorkflow, compute_banks, default_parameters
 
 try:
     __version__ = importlib.metadata.version("esstbl")
@@ -18,6 +18,7 @@ del importlib
 __all__ = [
     "OrcaNormalizedImagesWorkflow",
     "TblWorkflow",
+    "compute_banks",
     "default_parameters",
     "orca",
 ]
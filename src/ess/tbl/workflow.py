@@ -4,16 +4,33 @@
 Default parameters, providers and utility functions for the TBL workflow.
 """
 
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 import sciline
+import scipp as sc
 
 from ess.reduce.time_of_flight.workflow import GenericTofWorkflow
 
+from ..imaging.compact import providers as compact_providers
 from ..imaging.conversion import providers as conversion_providers
+from ..imaging.lut import build_tof_lookup_table
+from ..imaging.transmission import (
+    histogram_wavelength_cube,
+    histogram_wavelength_spectrum,
+)
 from ..imaging.types import (
     BeamMonitor1,
+    CorrectedDetector,
+    NeXusDetectorName,
     NeXusMonitorName,
     PulseStrideOffset,
+    RunType,
     SampleRun,
+    SuperPixelSizes,
+    TimeOfFlightLookupTable,
+    WavelengthDetector,
 )
 
 
@@ -21,21 +38,169 @@ def default_parameters() -> dict:
     return {
         NeXusMonitorName[BeamMonitor1]: "monitor_1",
         PulseStrideOffset: None,
+        SuperPixelSizes: {},
     }
 
 
-providers = (*conversion_providers,)
+def tof_lookup_table_no_choppers(
+    *,
+    neutrons: int = 2_000_000,
+    max_workers: int | None = None,
+    cache_dir: str | None = None,
+) -> sc.DataArray:
+    """
+    Time-of-flight lookup table for TBL without choppers.
+
+    The table is simulated in parallel the first time it is requested and cached on
+    disk. See :py:func:`ess.imaging.lut.build_tof_lookup_table`.
+
+    Parameters
+    ----------
+    neutrons:
+        Number of neutrons to simulate.
+    max_workers:
+        The number of worker processes used for the simulation.
+    cache_dir:
+        Directory of the cache.
+    """
+    return build_tof_lookup_table(
+        {},
+        source_position=sc.vector([0.0, 0.0, 0.0], unit="m"),
+        ltotal_range=(sc.scalar(25.0, unit="m"), sc.scalar(35.0, unit="m")),
+        neutrons=neutrons,
+        pulse_stride=1,
+        error_threshold=1.0,
+        max_workers=max_workers,
+        cache_dir=cache_dir,
+    )
+
+
+def simulated_tof_lookup_table() -> TimeOfFlightLookupTable:
+    """Provider of the cached :py:func:`tof_lookup_table_no_choppers`."""
+    return TimeOfFlightLookupTable(tof_lookup_table_no_choppers())
+
+
+def unmasked_detector(da: WavelengthDetector[RunType]) -> CorrectedDetector[RunType]:
+    """TBL applies no masks, the detector data with wavelengths is used as is."""
+    return CorrectedDetector[RunType](da)
+
+
+providers = (
+    *conversion_providers,
+    unmasked_detector,
+    histogram_wavelength_spectrum,
+    histogram_wavelength_cube,
+)
 
 
-def TblWorkflow(**kwargs) -> sciline.Pipeline:
+def TblWorkflow(
+    *,
+    simulate_tof_lookup_table: bool = False,
+    compact_events: bool = False,
+    **kwargs,
+) -> sciline.Pipeline:
     """
     Workflow with default parameters for TBL.
+
+    Parameters
+    ----------
+    simulate_tof_lookup_table:
+        If ``True``, the time-of-flight lookup table is simulated when first needed,
+        and cached on disk, instead of being loaded from
+        ``TimeOfFlightLookupTableFilename``.
+    compact_events:
+        If ``True``, event weights and floating-point event coordinates are stored in
+        single precision and the weights have no variances.
+        ``WavelengthSpectrum`` and ``WavelengthCube`` sum the weights in double
+        precision and set the variances to the counts. Plain ``hist`` of the events
+        does neither, use :py:func:`ess.imaging.compact.histogram_events` instead.
     """
     workflow = GenericTofWorkflow(
         run_types=[SampleRun], monitor_types=[BeamMonitor1], **kwargs
     )
     for provider in providers:
         workflow.insert(provider)
+    if simulate_tof_lookup_table:
+        workflow.insert(simulated_tof_lookup_table)
+    if compact_events:
+        for provider in compact_providers:
+            workflow.insert(provider)
     for key, param in default_parameters().items():
         workflow[key] = param
     return workflow
+
+
+def compute_banks(
+    workflow: sciline.Pipeline,
+    detector_names: Iterable[str],
+    targets: sciline.typing.Key | tuple[sciline.typing.Key, ...],
+    *,
+    max_workers: int | None = None,
+) -> sc.DataGroup | dict[sciline.typing.Key, sc.DataGroup]:
+    """
+    Compute targets for several detector banks.
+
+    Everything that does not depend on the detector, such as the time-of-flight
+    lookup table, the source and sample positions and the monitors, is computed once
+    and shared between the banks. The banks are then processed concurrently on a
+    thread pool.
+
+    Parameters
+    ----------
+    workflow:
+        Workflow with all parameters set except ``NeXusDetectorName``,
+        e.g., a ``TblWorkflow``.
+    detector_names:
+        Names of the detector banks in the NeXus file.
+    targets:
+        Key or tuple of keys to compute for every bank.
+    max_workers:
+        The number of worker threads. Defaults to one per bank.
+
+    Returns
+    -------
+    :
+        If ``targets`` is a single key, a data group with the result for each bank.
+        Otherwise, a dict mapping each key to such a data group.
+        The data groups are empty if there are no ``detector_names``.
+    """
+    detector_names = list(detector_names)
+    keys = targets if isinstance(targets, tuple) else (targets,)
+    if not detector_names:
+        grouped = {key: sc.DataGroup() for key in keys}
+        return grouped if isinstance(targets, tuple) else grouped[targets]
+
+    pruned = sciline.Pipeline()
+    for key in keys:
+        pruned[key] = workflow[key]
+    pruned[NeXusDetectorName] = None
+    graph = pruned.underlying_graph
+    per_bank = set()
+    stack = [NeXusDetectorName]
+    while stack:
+        for child in graph.successors(stack.pop()):
+            if child not in per_bank:
+                per_bank.add(child)
+                stack.append(child)
+    shared = {
+        parent for node in per_bank for parent in graph.predecessors(node)
+    } - per_bank
+    shared.discard(NeXusDetectorName)
+    shared_values = workflow.compute(shared) if shared else {}
+
+    def compute_bank(name: str) -> dict[sciline.typing.Key, Any]:
+        bank_workflow = pruned.copy()
+        for key, value in shared_values.items():
+            bank_workflow[key] = value
+        bank_workflow[NeXusDetectorName] = name
+        return bank_workflow.compute(keys)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(detector_names)) as pool:
+        results = dict(
+            zip(detector_names, pool.map(compute_bank, detector_names), strict=True)
+        )
+    grouped = {
+        key: sc.DataGroup({name: result[key] for name, result in results.items()})
+        for key in keys
+    }
+    return grouped if isinstance(targets, tuple) else grouped[targets]
@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+from collections.abc import Sequence
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+import scipp as sc
+
+PULSE_PERIOD_NS = 71_428_571
+
+
+def _nx_group(parent: h5py.Group, name: str, nx_class: str) -> h5py.Group:
+    group = parent.create_group(name)
+    group.attrs['NX_class'] = nx_class
+    return group
+
+
+def _nx_translation(component: h5py.Group, path: str, z: float) -> None:
+    transformations = _nx_group(component, 'transformations', 'NXtransformations')
+    translation = transformations.create_dataset('translation', data=z)
+    translation.attrs.update(
+        {
+            'transformation_type': 'translation',
+            'vector': [0.0, 0.0, 1.0],
+            'units': 'm',
+            'depends_on': '.',
+        }
+    )
+    component.create_dataset('depends_on', data=f'{path}/transformations/translation')
+
+
+def _write_events(
+    detector: h5py.Group,
+    rng: np.random.Generator,
+    npulses: int,
+    events_per_pulse: int,
+    npixels: int,
+) -> None:
+    nevents = npulses * events_per_pulse
+    events = _nx_group(detector, 'events', 'NXevent_data')
+    events.create_dataset('event_id', data=rng.integers(1, npixels + 1, nevents))
+    events.create_dataset(
+        'event_time_offset',
+        data=rng.uniform(1e6, 6.5e7, nevents).astype('int64'),
+    ).attrs['units'] = 'ns'
+    event_time_zero = events.create_dataset(
+        'event_time_zero',
+        data=np.arange(npulses, dtype='int64') * PULSE_PERIOD_NS
+        + 1_700_000_000_000_000_000,
+    )
+    event_time_zero.attrs.update({'units': 'ns', 'start': '1970-01-01T00:00:00'})
+    events.create_dataset(
+        'event_index', data=np.arange(npulses, dtype='int64') * events_per_pulse
+    )
+
+
+def write_event_file(
+    path: Path,
+    *,
+    npulses: int = 50,
+    events_per_pulse: int = 200,
+    shape: tuple[int, int] = (8, 8),
+    seed: int = 0,
+    detector_names: Sequence[str] = ('timepix3',),
+    distance: float = 60.0,
+) -> Path:
+    """Write a minimal NeXus file with event-mode detectors of the same shape."""
+    rng = np.random.default_rng(seed)
+    npixels = shape[0] * shape[1]
+    with h5py.File(path, 'w') as f:
+        entry = _nx_group(f, 'entry', 'NXentry')
+        instrument = _nx_group(entry, 'instrument', 'NXinstrument')
+        source = _nx_group(instrument, 'source', 'NXsource')
+        _nx_translation(source, '/entry/instrument/source', 0.0)
+        sample = _nx_group(entry, 'sample', 'NXsample')
+        _nx_translation(sample, '/entry/sample', distance - 0.5)
+
+        for detector_name in detector_names:
+            detector = _nx_group(instrument, detector_name, 'NXdetector')
+            detector.create_dataset(
+                'detector_number', data=np.arange(1, npixels + 1).reshape(shape)
+            )
+            x, y = np.meshgrid(
+                np.arange(shape[0]) * 1e-3, np.arange(shape[1]) * 1e-3, indexing='ij'
+            )
+            detector.create_dataset('x_pixel_offset', data=x).attrs['units'] = 'm'
+            detector.create_dataset('y_pixel_offset', data=y).attrs['units'] = 'm'
+            _nx_translation(detector, f'/entry/instrument/{detector_name}', distance)
+            _write_events(detector, rng, npulses, events_per_pulse, npixels)
+    return path
+
+
+@pytest.fixture
+def event_file_factory(tmp_path):
+    """Factory writing minimal NeXus event files to a temporary directory."""
+
+    def make(name: str, **kwargs) -> Path:
+        return write_event_file(tmp_path / name, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def identity_tof_lookup_table() -> sc.DataArray:
+    """Lookup table where the time-of-flight equals the event time offset."""
+    event_time_offset = sc.linspace(
+        'event_time_offset', 0.0, PULSE_PERIOD_NS / 1000, 201, unit='us'
+    )
+    distance = sc.linspace('distance', 55.0, 65.0, 11, unit='m')
+    return sc.DataArray(
+        sc.broadcast(
+            event_time_offset, sizes={**distance.sizes, **event_time_offset.sizes}
+        ).copy(),
+        coords={
+            'distance': distance,
+            'event_time_offset': event_time_offset,
+            'pulse_period': sc.scalar(PULSE_PERIOD_NS / 1000, unit='us'),
+            'pulse_stride': sc.scalar(1, unit=None),
+            'distance_resolution': distance[1] - distance[0],
+            'time_resolution': event_time_offset[1] - event_time_offset[0],
+            'error_threshold': sc.scalar(0.1),
+        },
+    )
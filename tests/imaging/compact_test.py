@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+from scipp.testing import assert_allclose, assert_identical
+
+from ess import odin, tbl
+from ess.imaging.compact import compact_events, histogram_events, poisson_variances
+from ess.imaging.transmission import (
+    histogram_wavelength_cube,
+    histogram_wavelength_spectrum,
+)
+from ess.imaging.types import (
+    Filename,
+    MaskingRules,
+    NeXusDetectorName,
+    OpenBeamRun,
+    RawDetector,
+    SampleRun,
+    SuperPixelSizes,
+    TimeOfFlightLookupTable,
+    TransmissionCube,
+    TransmissionSpectrum,
+    WavelengthBins,
+    WavelengthCube,
+    WavelengthDetector,
+    WavelengthSpectrum,
+)
+
+
+def test_compact_events_uses_single_precision_without_variances():
+    rng = np.random.default_rng(1)
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[1000], unit='counts', with_variances=True),
+        coords={
+            'tof': sc.array(
+                dims=['event'], values=rng.uniform(0, 1e4, 1000), unit='us'
+            ),
+            'event_id': sc.arange('event', 1000),
+            'pixel': sc.array(dims=['event'], values=rng.integers(0, 4, 1000)),
+        },
+    )
+    da = events.group('pixel')
+    compact = compact_events(da)
+    buffer = compact.bins.constituents['data']
+    assert buffer.dtype == sc.DType.float32
+    assert buffer.variances is None
+    assert buffer.coords['tof'].dtype == sc.DType.float32
+    assert buffer.coords['event_id'].dtype == sc.DType.int64
+    assert_identical(compact.bins.size(), da.bins.size())
+    assert_allclose(
+        compact.bins.coords['tof'].bins.sum(),
+        da.bins.coords['tof'].bins.sum().to(dtype='float32'),
+    )
+    # The input is not modified
+    assert da.bins.constituents['data'].variances is not None
+
+
+def test_histogram_of_compact_events_counts_beyond_single_precision():
+    # Single precision sums stop counting at 2**24, so a bin holding an event
+    # of weight 2**24 would not count the further unit events.
+    n = 1000
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[n + 1], unit='counts', with_variances=True),
+        coords={
+            'wavelength': sc.full(
+                dims=['event'], shape=[n + 1], value=2.0, unit='angstrom'
+            ),
+            'pixel': sc.array(dims=['event'], values=np.arange(n + 1) % 4),
+        },
+    )
+    events.values[0] = 2.0**24
+    compact = compact_events(events.group('pixel'))
+    assert compact.bins.constituents['data'].dtype == sc.DType.float32
+    bins = sc.linspace('wavelength', 1.0, 3.0, 3, unit='angstrom')
+    expected = sc.array(
+        dims=['wavelength'],
+        values=[0.0, 2.0**24 + n],
+        variances=[0.0, 2.0**24 + n],
+        unit='counts',
+    )
+    spectrum = histogram_wavelength_spectrum(compact, bins)
+    assert_identical(spectrum.data, expected)
+    cube = histogram_wavelength_cube(compact, bins, {'pixel': 4})
+    assert_identical(
+        cube.data, expected.broadcast(sizes={'pixel': 1, **expected.sizes})
+    )
+    assert_identical(histogram_events(compact).data.sum(), expected.sum())
+
+
+def test_poisson_variances():
+    counts = sc.array(dims=['x'], values=[1.0, 4.0], unit='counts')
+    assert_identical(
+        poisson_variances(sc.DataArray(counts)).data,
+        sc.array(dims=['x'], values=[1.0, 4.0], variances=[1.0, 4.0], unit='counts'),
+    )
+    with_variances = sc.DataArray(
+        sc.array(dims=['x'], values=[1.0], variances=[3.0], unit='counts')
+    )
+    assert_identical(poisson_variances(with_variances), with_variances)
+    other = sc.DataArray(sc.array(dims=['x'], values=[1.0], unit='m'))
+    assert poisson_variances(other).variances is None
+
+
+@pytest.fixture
+def bragg_edge_files(event_file_factory):
+    return (
+        event_file_factory('sample.nxs', seed=1),
+        event_file_factory('ob.nxs', seed=2),
+    )
+
+
+def make_bragg_edge_workflow(files, lut, **kwargs):
+    wf = odin.OdinBraggEdgeWorkflow(**kwargs)
+    wf[Filename[SampleRun]], wf[Filename[OpenBeamRun]] = files
+    wf[NeXusDetectorName] = 'timepix3'
+    wf[TimeOfFlightLookupTable] = lut
+    wf[MaskingRules] = {}
+    wf[WavelengthBins] = sc.linspace('wavelength', 0.5, 5.0, 21, unit='angstrom')
+    wf[SuperPixelSizes] = {'dim_0': 2, 'dim_1': 2}
+    return wf
+
+
+@pytest.mark.parametrize('reject_events_outside_frames', [False, True])
+def test_compact_bragg_edge_workflow_matches_default(
+    bragg_edge_files, identity_tof_lookup_table, reject_events_outside_frames
+):
+    targets = (TransmissionSpectrum, TransmissionCube, WavelengthDetector[SampleRun])
+    kwargs = {'reject_events_outside_frames': reject_events_outside_frames}
+    expected = make_bragg_edge_workflow(
+        bragg_edge_files, identity_tof_lookup_table, **kwargs
+    ).compute(targets)
+    results = make_bragg_edge_workflow(
+        bragg_edge_files, identity_tof_lookup_table, compact_events=True, **kwargs
+    ).compute(targets)
+    events = results[WavelengthDetector[SampleRun]].bins.constituents['data']
+    assert events.coords['wavelength'].dtype == sc.DType.float32
+    assert events.variances is None
+    for key in (TransmissionSpectrum, TransmissionCube):
+        assert results[key].variances is not None
+        assert_allclose(results[key].data, expected[key].data, rtol=sc.scalar(1e-5))
+
+
+def test_compact_tbl_workflow(event_file_factory, identity_tof_lookup_table):
+    wf = tbl.TblWorkflow(compact_events=True)
+    wf[Filename[SampleRun]] = event_file_factory('sample.nxs', seed=3)
+    wf[NeXusDetectorName] = 'timepix3'
+    wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+    raw, wavelength = wf.compute(
+        (RawDetector[SampleRun], WavelengthDetector[SampleRun])
+    ).values()
+    assert raw.bins.constituents['data'].dtype == sc.DType.float32
+    assert wavelength.bins.coords['wavelength'].bins.constituents['data'].dtype == (
+        sc.DType.float32
+    )
+
+
+def test_compact_tbl_workflow_histograms_match_default(
+    event_file_factory, identity_tof_lookup_table
+):
+    filename = event_file_factory('sample.nxs', seed=3)
+    targets = (WavelengthSpectrum[SampleRun], WavelengthCube[SampleRun])
+    results = []
+    for compact in (False, True):
+        wf = tbl.TblWorkflow(compact_events=compact)
+        wf[Filename[SampleRun]] = filename
+        wf[NeXusDetectorName] = 'timepix3'
+        wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+        wf[WavelengthBins] = sc.linspace('wavelength', 0.5, 5.0, 21, unit='angstrom')
+        wf[SuperPixelSizes] = {'dim_0': 2, 'dim_1': 2}
+        results.append(wf.compute(targets))
+    expected, compact = results
+    for key in targets:
+        assert compact[key].dtype == sc.DType.float64
+        assert compact[key].variances is not None
+        assert_allclose(compact[key].data, expected[key].data, rtol=sc.scalar(1e-5))
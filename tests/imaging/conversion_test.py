@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+from scipp.testing import assert_allclose
+
+from ess.imaging.conversion import (
+    compute_detector_wavelength,
+    compute_wavelength_conversion_factor,
+    make_coordinate_transform_graph,
+    tof_to_wavelength,
+)
+
+
+@pytest.fixture
+def tof_detector() -> sc.DataArray:
+    rng = np.random.default_rng(42)
+    nevents = 10_000
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[nevents], unit='counts', with_variances=True),
+        coords={
+            'tof': sc.array(
+                dims=['event'], values=rng.uniform(1e3, 7e4, nevents), unit='us'
+            ),
+            'detector_number': sc.array(
+                dims=['event'], values=rng.integers(0, 16, nevents)
+            ),
+        },
+    )
+    da = events.group(sc.arange('detector_number', 16)).fold(
+        'detector_number', sizes={'x': 4, 'y': 4}
+    )
+    x, y = np.meshgrid(np.linspace(-0.01, 0.01, 4), np.linspace(-0.01, 0.01, 4))
+    da.coords['position'] = sc.vectors(
+        dims=['x', 'y'],
+        values=np.stack([x, y, np.full_like(x, 60.0)], axis=-1),
+        unit='m',
+    )
+    return da
+
+
+@pytest.fixture
+def graph() -> dict:
+    return make_coordinate_transform_graph(
+        sample_position=sc.vector([0.0, 0.0, 59.0], unit='m'),
+        source_position=sc.vector([0.0, 0.0, 0.0], unit='m'),
+        gravity=sc.vector([0.0, -9.81, 0.0], unit='m/s^2'),
+    )
+
+
+def test_compute_detector_wavelength_matches_transform_coords(tof_detector, graph):
+    expected = tof_detector.transform_coords('wavelength', graph=graph)
+    factor = compute_wavelength_conversion_factor(tof_detector.bins.size(), graph)
+    result = compute_detector_wavelength(tof_detector, factor, graph)
+    assert 'tof' in result.bins.coords
+    assert_allclose(
+        result.bins.coords['wavelength'], expected.bins.coords['wavelength']
+    )
+    assert set(result.coords) == set(expected.coords)
+    for name, coord in expected.coords.items():
+        assert result.coords[name].aligned == coord.aligned
+        assert_allclose(result.coords[name], coord)
+
+
+def test_tof_to_wavelength_inplace_reuses_event_buffer(tof_detector, graph):
+    expected = tof_detector.transform_coords('wavelength', graph=graph)
+    factor = compute_wavelength_conversion_factor(tof_detector.bins.size(), graph)
+    tof_buffer = tof_detector.bins.constituents['data'].coords['tof']
+    result = tof_to_wavelength(tof_detector, factor, inplace=True)
+    assert result is tof_detector
+    assert 'tof' not in result.bins.coords
+    assert_allclose(
+        result.bins.coords['wavelength'], expected.bins.coords['wavelength']
+    )
+    # The time-of-flight buffer was overwritten with the wavelengths
+    np.testing.assert_array_equal(
+        tof_buffer.values,
+        result.bins.constituents['data'].coords['wavelength'].values,
+    )
+
+
+def test_tof_to_wavelength_histogram(tof_detector, graph):
+    factor = compute_wavelength_conversion_factor(tof_detector.bins.size(), graph)
+    hist = tof_detector.hist(tof=10)
+    result = tof_to_wavelength(hist, factor)
+    assert result.coords['wavelength'].unit == 'angstrom'
+    assert result.coords.is_edges('wavelength', 'tof')
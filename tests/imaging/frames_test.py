@@ -0,0 +1,208 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+import tof
+from scippneutron.chopper import DiskChopper
+
+from ess import odin
+from ess.imaging.frames import compute_frame_acceptance, reject_events_outside_frames
+from ess.imaging.types import (
+    DetectorLtotal,
+    Filename,
+    FrameAcceptance,
+    NeXusDetectorName,
+    RawDetector,
+    SampleRun,
+)
+
+SOURCE_POSITION = sc.vector([0.0, 0.0, 0.0], unit='m')
+PULSE_PERIOD = sc.scalar(1.0 / 14.0, unit='s')
+
+
+def lookup_acceptance(
+    acceptance: sc.DataArray, distance: float, eto: np.ndarray
+) -> np.ndarray:
+    row = np.searchsorted(acceptance.coords['distance'].values, distance) - 1
+    width = acceptance.coords['event_time_offset'][1].value
+    return acceptance.values[row][(eto // width).astype(int)]
+
+
+@pytest.fixture
+def single_chopper() -> dict[str, DiskChopper]:
+    return {
+        'chopper': DiskChopper(
+            frequency=sc.scalar(14.0, unit='Hz'),
+            beam_position=sc.scalar(0.0, unit='deg'),
+            phase=sc.scalar(30.0, unit='deg'),
+            axle_position=sc.vector([0.0, 0.0, 10.0], unit='m'),
+            slit_begin=sc.array(dims=['cutout'], values=[0.0], unit='deg'),
+            slit_end=sc.array(dims=['cutout'], values=[10.0], unit='deg'),
+        )
+    }
+
+
+@pytest.mark.parametrize(
+    'choppers',
+    ['single', 'odin'],
+)
+def test_transmitted_neutrons_are_accepted(choppers, single_chopper):
+    choppers = (
+        single_chopper
+        if choppers == 'single'
+        else odin.beamline.choppers(SOURCE_POSITION)
+    )
+    rng = np.random.default_rng(12)
+    n = 500_000
+    source = tof.Source.from_neutrons(
+        birth_times=sc.array(dims=['event'], values=rng.uniform(0, 6e3, n), unit='us'),
+        wavelengths=sc.array(
+            dims=['event'], values=rng.uniform(0.1, 20.0, n), unit='angstrom'
+        ),
+    )
+    detector = tof.Detector(distance=sc.scalar(60.0, unit='m'), name='detector')
+    result = tof.Model(
+        source=source,
+        choppers=[tof.Chopper.from_diskchopper(c, name=k) for k, c in choppers.items()],
+        detectors=[detector],
+    ).run()
+    events = result['detector'].data.squeeze()
+    events = events[~events.masks['blocked_by_others']]
+    eto = events.coords['toa'].to(unit='us').values % PULSE_PERIOD.to(unit='us').value
+
+    acceptance = compute_frame_acceptance(
+        choppers,
+        source_position=SOURCE_POSITION,
+        distance=sc.linspace('distance', 59.5, 60.5, 11, unit='m'),
+        pulse_period=PULSE_PERIOD,
+    )
+    assert acceptance.dims == ('distance', 'event_time_offset')
+    assert lookup_acceptance(acceptance, 60.0, eto).all()
+    assert not acceptance.values.all()
+
+
+def test_single_chopper_acceptance_is_narrow(single_chopper):
+    acceptance = compute_frame_acceptance(
+        single_chopper,
+        source_position=SOURCE_POSITION,
+        distance=sc.linspace('distance', 59.5, 60.5, 11, unit='m'),
+        pulse_period=PULSE_PERIOD,
+        wavelength_range=(
+            sc.scalar(1.0, unit='angstrom'),
+            sc.scalar(4.0, unit='angstrom'),
+        ),
+    )
+    # A 10 degree slit open for 2 ms passes a band of wavelengths that spreads to
+    # roughly (2 ms + 6 ms) * 60 / 10 over the detector
+    assert 0.2 < acceptance.values.mean() < 0.8
+
+
+def test_reject_events_outside_frames_drops_rejected_events():
+    rng = np.random.default_rng(1)
+    nevents = 10_000
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[nevents], unit='counts'),
+        coords={
+            'event_time_offset': sc.array(
+                dims=['event'], values=rng.uniform(0, 1000, nevents), unit='ns'
+            ),
+            'pixel': sc.array(dims=['event'], values=rng.integers(0, 6, nevents)),
+        },
+    )
+    da = events.group(sc.arange('pixel', 6)).fold('pixel', sizes={'x': 2, 'y': 3})
+    ltotal = sc.array(
+        dims=['x', 'y'], values=[[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]], unit='m'
+    )
+    acceptance = sc.DataArray(
+        sc.array(
+            dims=['distance', 'event_time_offset'],
+            values=[[True, False, False, False], [False, False, True, True]],
+        ),
+        coords={
+            'distance': sc.array(dims=['distance'], values=[0.5, 1.5, 2.5], unit='m'),
+            'event_time_offset': sc.linspace(
+                'event_time_offset', 0.0, 1.0, 5, unit='us'
+            ),
+        },
+    )
+    result = reject_events_outside_frames(da, acceptance, ltotal)
+    assert result.sizes == da.sizes
+    first = da['x', 0].bins.concat().value
+    second = da['x', 1].bins.concat().value
+    expected = first.coords['event_time_offset'] < sc.scalar(250.0, unit='ns')
+    assert result['x', 0].bins.size().sum().value == expected.sum().value
+    expected = second.coords['event_time_offset'] >= sc.scalar(500.0, unit='ns')
+    assert result['x', 1].bins.size().sum().value == expected.sum().value
+    kept = result['x', 1].bins.concat().value.coords['event_time_offset']
+    assert kept.min().value >= 500.0
+
+
+@pytest.mark.parametrize(
+    'select',
+    [lambda da: da.transpose(['y', 'x']), lambda da: da['y', 1:]],
+    ids=['transposed', 'sliced'],
+)
+def test_reject_events_outside_frames_handles_non_contiguous_bins(select):
+    rng = np.random.default_rng(2)
+    nevents = 10_000
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[nevents], unit='counts'),
+        coords={
+            'event_time_offset': sc.array(
+                dims=['event'], values=rng.uniform(0, 1000, nevents), unit='ns'
+            ),
+            'pixel': sc.array(dims=['event'], values=rng.integers(0, 6, nevents)),
+        },
+    )
+    da = select(
+        events.group(sc.arange('pixel', 6)).fold('pixel', sizes={'x': 2, 'y': 3})
+    )
+    original = da.copy()
+    ltotal = select(
+        sc.array(dims=['x', 'y'], values=[[1.0, 2.0, 1.0], [2.0, 1.0, 2.0]], unit='m')
+    )
+    acceptance = sc.DataArray(
+        sc.array(
+            dims=['distance', 'event_time_offset'],
+            values=[[True, False, True, False], [False, True, True, False]],
+        ),
+        coords={
+            'distance': sc.array(dims=['distance'], values=[0.5, 1.5, 2.5], unit='m'),
+            'event_time_offset': sc.linspace(
+                'event_time_offset', 0.0, 1.0, 5, unit='us'
+            ),
+        },
+    )
+    result = reject_events_outside_frames(da, acceptance, ltotal)
+    expected = reject_events_outside_frames(da.copy(), acceptance, ltotal)
+    assert sc.identical(result, expected)
+    assert 0 < result.bins.size().sum().value < da.bins.size().sum().value
+    assert sc.identical(da, original)
+
+
+def test_odin_workflow_rejects_events_outside_frames(event_file_factory):
+    wf = odin.OdinWorkflow(reject_events_outside_frames=True)
+    wf[Filename[SampleRun]] = event_file_factory('sample.nxs', seed=3)
+    wf[NeXusDetectorName] = 'timepix3'
+    raw, acceptance, ltotal = wf.compute(
+        (RawDetector[SampleRun], FrameAcceptance[SampleRun], DetectorLtotal[SampleRun])
+    ).values()
+    reference = odin.OdinWorkflow()
+    reference[Filename[SampleRun]] = wf.compute(Filename[SampleRun])
+    reference[NeXusDetectorName] = 'timepix3'
+    everything = reference.compute(RawDetector[SampleRun])
+
+    nevents = raw.bins.size().sum().value
+    assert 0 < nevents < everything.bins.size().sum().value
+    events = raw.bins.concat().value
+    eto = events.coords['event_time_offset'].to(unit='us', dtype='float64').values
+    assert lookup_acceptance(acceptance, ltotal.mean().value, eto).all()
+
+
+def test_odin_frame_acceptance_returns_independent_copies():
+    ltotal = sc.array(dims=['pixel'], values=[60.0, 60.3], unit='m')
+    first = odin.beamline.frame_acceptance(ltotal)
+    expected = first.copy()
+    first.values[...] = ~first.values
+    assert sc.identical(odin.beamline.frame_acceptance(ltotal), expected)
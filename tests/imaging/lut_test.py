@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import dataclasses
+
+import numpy as np
+import scipp as sc
+
+from ess import odin
+from ess.imaging.lut import (
+    _split_into_batches,
+    build_tof_lookup_table,
+    tof_lookup_table_cache_key,
+)
+
+SOURCE_POSITION = sc.vector([0.0, 0.0, 0.0], unit='m')
+LTOTAL_RANGE = (sc.scalar(55.0, unit='m'), sc.scalar(65.0, unit='m'))
+
+
+def test_cache_key_depends_on_chopper_parameters():
+    choppers = dict(odin.beamline.choppers(SOURCE_POSITION))
+    key = tof_lookup_table_cache_key(choppers=choppers, ltotal_range=LTOTAL_RANGE)
+    same = tof_lookup_table_cache_key(
+        choppers=dict(odin.beamline.choppers(SOURCE_POSITION)),
+        ltotal_range=LTOTAL_RANGE,
+    )
+    assert key == same
+    choppers['FOC_1'] = dataclasses.replace(
+        choppers['FOC_1'], phase=choppers['FOC_1'].phase + sc.scalar(0.1, unit='deg')
+    )
+    assert (
+        tof_lookup_table_cache_key(choppers=choppers, ltotal_range=LTOTAL_RANGE) != key
+    )
+    assert (
+        tof_lookup_table_cache_key(
+            choppers=dict(odin.beamline.choppers(SOURCE_POSITION)),
+            ltotal_range=(LTOTAL_RANGE[0], sc.scalar(66.0, unit='m')),
+        )
+        != key
+    )
+
+
+def test_build_tof_lookup_table_is_cached(tmp_path):
+    kwargs = {
+        'source_position': SOURCE_POSITION,
+        'ltotal_range': LTOTAL_RANGE,
+        'neutrons': 50_000,
+        'max_workers': 2,
+        'cache_dir': tmp_path,
+    }
+    table = build_tof_lookup_table({}, **kwargs)
+    assert table.dims == ('distance', 'event_time_offset')
+    assert len(list(tmp_path.iterdir())) == 1
+    assert sc.identical(build_tof_lookup_table({}, **kwargs), table, equal_nan=True)
+    build_tof_lookup_table({}, **{**kwargs, 'neutrons': 40_000})
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_simulation_batches_only_depend_on_neutrons_and_seed():
+    sizes, seeds = _split_into_batches(250_001, seed=1234)
+    assert sizes.sum() == 250_001
+    assert sizes.max() - sizes.min() <= 1
+    assert len(sizes) == len(seeds) == 3
+    same_sizes, same_seeds = _split_into_batches(250_001, seed=1234)
+    np.testing.assert_array_equal(same_sizes, sizes)
+    assert same_seeds == seeds
+    assert len(set(seeds)) == len(seeds)
+    assert _split_into_batches(250_001, seed=1)[1] != seeds
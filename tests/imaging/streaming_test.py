@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import queue
+import threading
+
+import pytest
+import scipp as sc
+import scippnexus as snx
+from scipp.testing import assert_allclose
+
+from ess import odin
+from ess.imaging.streaming import (
+    iter_pulse_chunks,
+    number_of_pulses,
+    queue_source,
+    reduce_in_pulse_chunks,
+    reduce_live,
+    replay_pulse_chunks,
+)
+from ess.imaging.types import (
+    CorrectedDetector,
+    Filename,
+    MaskingRules,
+    NeXusDetectorName,
+    OpenBeamRun,
+    SampleRun,
+    SuperPixelSizes,
+    TimeOfFlightLookupTable,
+    TransmissionCube,
+    TransmissionSpectrum,
+    WavelengthBins,
+    WavelengthCube,
+    WavelengthSpectrum,
+)
+from ess.reduce.nexus.types import NeXusDataLocationSpec
+
+
+@pytest.fixture
+def workflow(event_file_factory, identity_tof_lookup_table):
+    wf = odin.OdinBraggEdgeWorkflow()
+    wf[Filename[SampleRun]] = event_file_factory('sample.nxs', seed=1)
+    wf[Filename[OpenBeamRun]] = event_file_factory('ob.nxs', seed=2, npulses=37)
+    wf[NeXusDetectorName] = 'timepix3'
+    wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+    wf[MaskingRules] = {}
+    wf[WavelengthBins] = sc.linspace('wavelength', 0.5, 5.0, 21, unit='angstrom')
+    wf[SuperPixelSizes] = {'dim_0': 2, 'dim_1': 2}
+    return wf
+
+
+def test_iter_pulse_chunks_covers_all_pulses(workflow):
+    location = workflow.compute(NeXusDataLocationSpec[snx.NXdetector, OpenBeamRun])
+    assert number_of_pulses(location) == 37
+    chunks = list(iter_pulse_chunks(location, pulses_per_chunk=10))
+    assert [chunk.sizes['event_time_zero'] for chunk in chunks] == [10, 10, 10, 7]
+    assert sum(chunk.bins.size().sum().value for chunk in chunks) == 37 * 200
+
+
+def test_reduce_in_pulse_chunks_matches_full_reduction(workflow):
+    targets = (TransmissionSpectrum, TransmissionCube, CorrectedDetector[SampleRun])
+    expected = workflow.compute(targets)
+    results = reduce_in_pulse_chunks(
+        workflow,
+        targets=targets,
+        accumulate=(
+            WavelengthSpectrum[SampleRun],
+            WavelengthSpectrum[OpenBeamRun],
+            WavelengthCube[SampleRun],
+            WavelengthCube[OpenBeamRun],
+            CorrectedDetector[SampleRun],
+        ),
+        run_types=(SampleRun, OpenBeamRun),
+        pulses_per_chunk=7,
+    )
+    assert_allclose(results[TransmissionSpectrum], expected[TransmissionSpectrum])
+    assert_allclose(results[TransmissionCube].data, expected[TransmissionCube].data)
+    assert_allclose(
+        results[CorrectedDetector[SampleRun]].data,
+        expected[CorrectedDetector[SampleRun]].hist().data.to(dtype='float64'),
+    )
+
+
+def test_reduce_in_pulse_chunks_histograms_compact_events_with_variances(
+    event_file_factory, identity_tof_lookup_table
+):
+    wf = odin.OdinBraggEdgeWorkflow(compact_events=True)
+    wf[Filename[SampleRun]] = event_file_factory('sample.nxs', seed=1)
+    wf[NeXusDetectorName] = 'timepix3'
+    wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+    wf[MaskingRules] = {}
+    key = CorrectedDetector[SampleRun]
+    results = reduce_in_pulse_chunks(
+        wf, targets=(key,), accumulate=(key,), pulses_per_chunk=7
+    )
+    expected = wf.compute(key).bins.concat().value
+    assert results[key].dtype == sc.DType.float64
+    assert_allclose(
+        results[key].sum().data,
+        sc.scalar(
+            float(expected.sizes['event']),
+            variance=float(expected.sizes['event']),
+            unit='counts',
+        ),
+    )
+
+
+def test_reduce_live_from_queue_refreshes_with_each_batch(workflow):
+    expected = workflow.compute((TransmissionSpectrum, CorrectedDetector[SampleRun]))
+    batches = queue.Queue()
+
+    def produce():
+        for batch in replay_pulse_chunks(workflow, pulses_per_chunk=10):
+            batches.put(batch)
+        batches.put(None)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    updates = list(
+        reduce_live(
+            workflow,
+            queue_source(batches, timeout=10),
+            targets=(TransmissionSpectrum, CorrectedDetector[SampleRun]),
+            accumulate=(WavelengthSpectrum[SampleRun], CorrectedDetector[SampleRun]),
+        )
+    )
+    producer.join()
+    assert len(updates) == 5
+    counts = [u[CorrectedDetector[SampleRun]].sum().value for u in updates]
+    assert counts == [2000, 4000, 6000, 8000, 10000]
+    assert_allclose(updates[-1][TransmissionSpectrum], expected[TransmissionSpectrum])
+    assert_allclose(
+        updates[-1][CorrectedDetector[SampleRun]].data,
+        expected[CorrectedDetector[SampleRun]].hist().data.to(dtype='float64'),
+    )
+
+
+def test_reduce_live_update_every_always_yields_last_batch(workflow):
+    updates = list(
+        reduce_live(
+            workflow,
+            replay_pulse_chunks(workflow, pulses_per_chunk=10),
+            targets=(CorrectedDetector[SampleRun],),
+            accumulate=(CorrectedDetector[SampleRun],),
+            update_every=2,
+        )
+    )
+    counts = [u[CorrectedDetector[SampleRun]].sum().value for u in updates]
+    assert counts == [4000, 8000, 10000]
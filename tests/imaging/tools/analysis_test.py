@@ -3,6 +3,7 @@
 import numpy as np
 import pytest
 import scipp as sc
+import scipp.testing
 from scitiff.io import load_scitiff
 
 from ess import imaging as img
@@ -86,9 +87,290 @@ def test_laplace_2d() -> None:
     assert laplacian.sizes == resampled.sizes
 
 
+def make_image(nx: int, ny: int, nt: int = 2) -> sc.DataArray:
+    rng = np.random.default_rng(5)
+    return sc.DataArray(
+        sc.array(
+            dims=['t', 'x', 'y'],
+            values=rng.uniform(0, 10, (nt, nx, ny)),
+            variances=rng.uniform(0, 1, (nt, nx, ny)),
+            unit='counts',
+        ),
+        coords={
+            't': sc.arange('t', float(nt), unit='s'),
+            'x': sc.linspace('x', 0.0, 1.0, nx + 1, unit='m'),
+            'y': sc.arange('y', float(ny), unit='m'),
+            'position': sc.vectors(
+                dims=['x', 'y'], values=rng.standard_normal((nx, ny, 3)), unit='m'
+            ),
+        },
+        masks={'x': sc.arange('x', nx) == 3},
+    )
+
+
+@pytest.mark.parametrize('method', ['sum', 'mean'])
+def test_rescale_matches_resize_for_divisible_sizes(method) -> None:
+    da = make_image(12, 8)
+    expected = img.tools.resize(da, sizes={'x': 4, 'y': 2}, method=method)
+    result = img.tools.rescale(da, sizes={'x': 4, 'y': 2}, mode=method)
+    sc.testing.assert_allclose(result.data, expected.data)
+    sc.testing.assert_allclose(result.coords['position'], expected.coords['position'])
+    sc.testing.assert_allclose(result.coords['t'], da.coords['t'])
+    sc.testing.assert_allclose(
+        result.coords['x'], sc.linspace('x', 0.0, 1.0, 5, unit='m')
+    )
+    sc.testing.assert_allclose(
+        result.coords['y'], sc.array(dims=['y'], values=[1.5, 5.5], unit='m')
+    )
+    assert 'x' not in result.masks
+
+
+@pytest.mark.parametrize('method', ['sum', 'mean'])
+def test_rescale_applies_masks_on_different_dims(method) -> None:
+    da = make_image(12, 8)
+    da.masks['y'] = sc.arange('y', 8) == 5
+    da.masks['yx'] = (sc.arange('y', 8) == 1) & (sc.arange('x', 12) == 7)
+    result = img.tools.rescale(da, sizes={'x': 4, 'y': 2}, mode=method)
+    keep = np.ones((12, 8), dtype=bool)
+    keep[3] = False
+    keep[:, 5] = False
+    keep[7, 1] = False
+    blocks = (da.values * keep).reshape(2, 4, 3, 2, 4).sum(axis=(2, 4))
+    if method == 'mean':
+        blocks /= keep.reshape(4, 3, 2, 4).sum(axis=(1, 3))
+    np.testing.assert_allclose(result.values, blocks)
+    assert not result.masks
+
+
+def test_sharpness_with_masks_on_different_dims() -> None:
+    da = sc.values(make_image(12, 8)).drop_coords('position')
+    da.masks['y'] = sc.arange('y', 8) == 5
+    unmasked = da.copy()
+    unmasked.values[:, 3] = 0.0
+    unmasked.values[:, :, 5] = 0.0
+    sharp = img.tools.sharpness(da, dims=('x', 'y'), max_size=6)
+    expected = img.tools.sharpness(
+        unmasked.drop_masks(['x', 'y']), dims=('x', 'y'), max_size=6
+    )
+    sc.testing.assert_allclose(sharp.data, expected.data)
+
+
+@pytest.mark.parametrize('sizes', [{'x': 7, 'y': 5}, {'x': 13}, {'x': 40, 'y': 3}])
+def test_rescale_sum_conserves_total_for_any_size(sizes) -> None:
+    da = make_image(13, 11)
+    result = img.tools.rescale(da, sizes=sizes)
+    assert result.sizes == {**da.sizes, **sizes}
+    sc.testing.assert_allclose(
+        sc.values(result.sum(['x', 'y']).data), sc.values(da.sum(['x', 'y']).data)
+    )
+
+
+def _overlap(n_in: int, n_out: int) -> np.ndarray:
+    edges = np.arange(n_out + 1) * n_in / n_out
+    i = np.arange(n_in)
+    return np.clip(
+        np.minimum(edges[1:, None], i + 1) - np.maximum(edges[:-1, None], i), 0, None
+    )
+
+
+@pytest.mark.parametrize('method', ['sum', 'mean'])
+def test_rescale_matches_dense_area_overlap(method) -> None:
+    da = sc.values(make_image(13, 11)).drop_masks('x')
+    result = img.tools.rescale(da, sizes={'x': 5, 'y': 4}, mode=method)
+    wx, wy = _overlap(13, 5), _overlap(11, 4)
+    if method == 'mean':
+        wx, wy = wx * 5 / 13, wy * 4 / 11
+    expected = np.einsum('ai,bj,tij->tab', wx, wy, da.values)
+    np.testing.assert_allclose(result.values, expected)
+
+
+def test_rescale_bilinear_reproduces_linear_ramp() -> None:
+    x = np.arange(10.0)
+    image = sc.array(dims=['x', 'y'], values=np.add.outer(2 * x, 3 * x[:7]))
+    result = img.tools.rescale(image, sizes={'x': 4, 'y': 21}, mode='bilinear')
+    centers_x = np.clip((np.arange(4) + 0.5) * 10 / 4 - 0.5, 0, 9)
+    centers_y = np.clip((np.arange(21) + 0.5) * 7 / 21 - 0.5, 0, 6)
+    np.testing.assert_allclose(
+        result.values, np.add.outer(2 * centers_x, 3 * centers_y)
+    )
+
+
+def test_sharpness_of_prime_sized_image_is_downsampled() -> None:
+    image = sc.values(make_image(521, 509, nt=1)).drop_masks('x')
+    resized = img.tools.rescale(image, sizes={'x': 64, 'y': 64})
+    np.testing.assert_allclose(
+        img.tools.sharpness(image, dims=('x', 'y'), max_size=64).values,
+        img.tools.laplace_2d(resized, dims=('x', 'y')).var(['x', 'y'], ddof=1).values,
+    )
+
+
+def _shifted_slice_laplacian(image: np.ndarray) -> np.ndarray:
+    out = np.zeros_like(image)
+    h, w = image.shape[-2:]
+    out[..., 1:-1, 1:-1] = 8 * image[..., 1:-1, 1:-1]
+    for i in range(3):
+        for j in range(3):
+            if (i, j) != (1, 1):
+                out[..., 1:-1, 1:-1] -= image[..., i : h - 2 + i, j : w - 2 + j]
+    return out
+
+
+def test_laplace_2d_matches_shifted_slice_sum() -> None:
+    rng = np.random.default_rng(12)
+    values = rng.standard_normal((3, 20, 17))
+    da = sc.DataArray(
+        sc.array(dims=['t', 'x', 'y'], values=values, unit='counts'),
+        coords={'x': sc.arange('x', 20.0, unit='mm')},
+        masks={'bad': sc.zeros(dims=['y'], shape=[17], dtype=bool)},
+    )
+    laplacian = img.tools.laplace_2d(da.transpose(['x', 't', 'y']), dims=('x', 'y'))
+    assert laplacian.dims == ('x', 't', 'y')
+    assert laplacian.unit == sc.units.dimensionless
+    assert set(laplacian.coords) == {'x'}
+    assert set(laplacian.masks) == {'bad'}
+    np.testing.assert_allclose(
+        laplacian.transpose(['t', 'x', 'y']).values, _shifted_slice_laplacian(values)
+    )
+
+
+@pytest.mark.parametrize(
+    'kernel',
+    [
+        np.arange(15.0).reshape(3, 5),
+        np.outer([1.0, 2.0, 1.0], [-1.0, 0.0, 1.0]),
+        np.array([[0.5, -1.0], [2.0, 0.0]]),
+    ],
+)
+def test_convolve_2d_valid_matches_scipy(kernel) -> None:
+    from scipy.signal import convolve2d
+
+    rng = np.random.default_rng(3)
+    values = rng.standard_normal((5, 13, 11))
+    image = sc.array(dims=['t', 'x', 'y'], values=values, unit='counts')
+    result = img.tools.convolve_2d(
+        image, kernel, dims=('x', 'y'), mode='valid', chunk_size=2
+    )
+    expected = np.stack([convolve2d(frame, kernel, mode='valid') for frame in values])
+    assert result.sizes == {
+        't': 5,
+        'x': 13 - kernel.shape[0] + 1,
+        'y': 12 - kernel.shape[1],
+    }
+    np.testing.assert_allclose(result.values, expected, atol=1e-12)
+
+
+def test_convolve_2d_same_fills_border_and_propagates_variances() -> None:
+    image = sc.array(
+        dims=['y', 'x'],
+        values=np.arange(30.0).reshape(5, 6),
+        variances=np.ones((5, 6)),
+        unit='counts',
+    )
+    kernel = sc.array(dims=['x', 'y'], values=[[1.0, 1.0, 1.0]], unit='1/mm')
+    result = img.tools.convolve_2d(
+        image, kernel, dims=('x', 'y'), mode='same', fill_value=np.nan
+    )
+    assert result.dims == ('y', 'x')
+    assert result.unit == 'counts/mm'
+    assert np.isnan(result.values[[0, -1]]).all()
+    np.testing.assert_allclose(result.values[1:-1], image.values[1:-1] * 3)
+    np.testing.assert_allclose(result.variances[1:-1], 3.0)
+
+
+def test_convolve_2d_kernel_larger_than_image_raises() -> None:
+    image = sc.zeros(dims=['x', 'y'], shape=[2, 2])
+    with pytest.raises(ValueError, match="larger than the image"):
+        img.tools.convolve_2d(image, np.ones((3, 3)), dims=('x', 'y'))
+
+
 def test_sharpness() -> None:
     da = load_scitiff(siemens_star_path())["image"]
     sharp = img.tools.sharpness(da, dims=('x', 'y'))
     assert (sharp['t', 0] < sharp['t', 1]).value
     assert (sharp['t', 0] > sharp['t', 2]).value
     assert (sharp['t', 1] > sharp['t', 2]).value
+
+
+def make_events(nx: int, ny: int, nevents: int = 5000) -> sc.DataArray:
+    rng = np.random.default_rng(1234)
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[nevents], unit='counts'),
+        coords={
+            'wavelength': sc.array(
+                dims=['event'], values=rng.uniform(1.0, 9.0, nevents), unit='angstrom'
+            ),
+            'detector_number': sc.array(
+                dims=['event'], values=rng.integers(0, nx * ny, nevents)
+            ),
+        },
+    )
+    da = events.group(sc.arange('detector_number', nx * ny)).fold(
+        'detector_number', sizes={'x': nx, 'y': ny}
+    )
+    da.coords['position'] = sc.vectors(
+        dims=['x', 'y'], values=rng.standard_normal((nx, ny, 3)), unit='m'
+    )
+    return da
+
+
+def test_resample_events_innermost_dim_does_not_copy_events() -> None:
+    da = make_events(6, 8)
+    resampled = img.tools.resample_events(da, sizes={'y': 4})
+    assert resampled.sizes == {'x': 6, 'y': 2}
+    assert sc.identical(
+        resampled.bins.size().data, img.tools.resample(da.bins.size(), {'y': 4}).data
+    )
+    assert np.shares_memory(
+        resampled.bins.constituents['data'].coords['wavelength'].values,
+        da.bins.constituents['data'].coords['wavelength'].values,
+    )
+
+
+def test_resample_events_matches_dense_resample() -> None:
+    da = make_events(6, 8)
+    wavelength = sc.linspace('wavelength', 1.0, 9.0, 11, unit='angstrom')
+    resampled = img.tools.resample_events(da, sizes={'x': 3, 'y': 2})
+    assert resampled.sizes == {'x': 2, 'y': 4}
+    expected = img.tools.resample(da.hist(wavelength=wavelength), {'x': 3, 'y': 2})
+    result = resampled.hist(wavelength=wavelength)
+    assert sc.identical(result.data, expected.data)
+    np.testing.assert_allclose(
+        result.coords['position'].values, expected.coords['position'].values
+    )
+
+
+def test_histogram_of_blockified_events_matches_resample_events() -> None:
+    da = make_events(6, 8)
+    da.masks['first_row'] = sc.arange('x', 6) == 0
+    wavelength = sc.linspace('wavelength', 1.0, 9.0, 11, unit='angstrom')
+    blocked = img.tools.blockify(da, sizes={'x': 3, 'y': 2})
+    # Folding the pixel dims does not copy the events
+    assert np.shares_memory(
+        blocked.bins.constituents['data'].coords['wavelength'].values,
+        da.bins.constituents['data'].coords['wavelength'].values,
+    )
+    block_dims = [dim for dim in blocked.dims if dim not in da.dims]
+    expected = img.tools.resample_events(da, sizes={'x': 3, 'y': 2})
+    assert sc.identical(
+        blocked.hist(wavelength=wavelength, dim=block_dims).data,
+        expected.hist(wavelength=wavelength).data,
+    )
+
+
+def test_resample_events_converts_pixel_masks_to_event_masks() -> None:
+    da = make_events(4, 4)
+    da.masks['first_row'] = sc.array(dims=['x'], values=[True, False, False, False])
+    resampled = img.tools.resample_events(da, sizes={'x': 2, 'y': 2})
+    assert 'first_row' not in resampled.masks
+    assert 'first_row' in resampled.bins.masks
+    assert sc.identical(
+        resampled.hist().data, img.tools.resample(da.hist(), {'x': 2, 'y': 2}).data
+    )
+    # The input is not modified
+    assert 'first_row' in da.masks
+    assert 'first_row' not in da.bins.masks
+
+
+def test_resample_events_dense_data_raises() -> None:
+    with pytest.raises(ValueError, match="requires binned data"):
+        img.tools.resample_events(sc.DataArray(sc.ones(sizes={'x': 4})), {'x': 2})
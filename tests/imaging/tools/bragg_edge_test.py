@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+from scipy.special import erfc
+
+from ess.imaging.tools import fit_bragg_edges
+
+
+def make_spectra(seed, shape, noise, with_variances):
+    rng = np.random.default_rng(seed)
+    wavelength = sc.linspace('wavelength', 3.5, 4.6, 111, unit='angstrom')
+    edge = rng.uniform(3.9, 4.2, shape)
+    width = rng.uniform(0.02, 0.05, shape)
+    height = rng.uniform(0.2, 0.4, shape)
+    offset = rng.uniform(0.4, 0.6, shape)
+    lam = sc.midpoints(wavelength).values
+    values = offset[..., None] + 0.5 * height[..., None] * erfc(
+        (lam - edge[..., None]) / (np.sqrt(2) * width[..., None])
+    )
+    values += noise * rng.standard_normal(values.shape)
+    dims = ['x', 'y'][: len(shape)]
+    da = sc.DataArray(
+        sc.array(
+            dims=[*dims, 'wavelength'],
+            values=values,
+            variances=np.full_like(values, noise**2) if with_variances else None,
+        ),
+        coords={'wavelength': wavelength},
+    )
+    return da, {'edge': edge, 'width': width, 'height': height, 'offset': offset}
+
+
+@pytest.mark.parametrize('with_variances', [True, False])
+def test_fit_bragg_edges_recovers_parameters(with_variances):
+    da, truth = make_spectra(
+        seed=0, shape=(20, 30), noise=0.005, with_variances=with_variances
+    )
+    result = fit_bragg_edges(da, edge=sc.scalar(4.05, unit='angstrom'), chunk_size=128)
+    assert set(result.keys()) == {'edge', 'width', 'height', 'offset'}
+    assert result['edge'].sizes == {'x': 20, 'y': 30}
+    assert result['edge'].unit == 'angstrom'
+    assert not result['edge'].masks['not_converged'].values.any()
+    np.testing.assert_allclose(result['edge'].values, truth['edge'], atol=5e-3)
+    np.testing.assert_allclose(result['height'].values, truth['height'], atol=1e-2)
+    np.testing.assert_allclose(result['offset'].values, truth['offset'], atol=1e-2)
+    np.testing.assert_allclose(result['width'].values, truth['width'], atol=5e-3)
+    # The estimated uncertainties should be consistent with the actual errors
+    pull = (result['edge'].values - truth['edge']) / np.sqrt(result['edge'].variances)
+    assert 0.5 < pull.std() < 2.0
+
+
+def test_fit_bragg_edges_ignores_masked_and_nan_values():
+    da, truth = make_spectra(seed=1, shape=(50,), noise=0.0, with_variances=False)
+    da.values[:, :10] = np.nan
+    da.masks['bad'] = sc.zeros(sizes={'wavelength': 110}, dtype=bool)
+    da.masks['bad'].values[-10:] = True
+    da.values[:, -10:] = 100.0
+    result = fit_bragg_edges(da, edge=sc.scalar(4.05, unit='angstrom'))
+    np.testing.assert_allclose(result['edge'].values, truth['edge'], atol=1e-5)
+
+
+def test_fit_bragg_edges_accepts_per_spectrum_initial_guess():
+    da, truth = make_spectra(seed=2, shape=(40,), noise=0.0, with_variances=False)
+    guess = sc.array(dims=['x'], values=truth['edge'] + 0.02, unit='angstrom')
+    result = fit_bragg_edges(da, edge=guess.to(unit='nm'), max_workers=2)
+    np.testing.assert_allclose(result['edge'].values, truth['edge'], atol=1e-5)
@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+
+
+@pytest.fixture
+def intensity_as_function_of_gain_and_wavelength(seed, noise_floor):
+    np.random.seed(seed)
+    saturation_intensity = 1000
+    wavelength = sc.linspace('wavelength', 2, 8.0, 1000, unit='angstrom')
+    gains = sc.linspace('gain', 10, 200, 20)
+
+    # Some maximum signal - could be anything
+    maximum_intensity = (saturation_intensity / 10) * sc.sin(
+        wavelength * sc.scalar(3.14, unit='rad/angstrom')
+    ) + saturation_intensity
+
+    def true_intensity(gain):
+        return sc.scalar(noise_floor) + gain * sc.scalar(1.0, unit='1/angstrom^2') * (
+            wavelength - wavelength.min()
+        ) * (wavelength.max() - wavelength)
+
+    def measured_intensity(gain):
+        tI = true_intensity(gain)
+        return sc.where(tI < maximum_intensity, tI, maximum_intensity) + sc.array(
+            dims=tI.dims, values=noise_floor * np.random.randn(*tI.shape)
+        )
+
+    return sc.DataArray(
+        sc.concat([measured_intensity(gain) for gain in gains], 'gain'),
+        coords={'gain': gains, 'wavelength': wavelength},
+    )
@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+import scipp as sc
+from scipy.ndimage import gaussian_filter, sobel
+
+from ess import imaging as img
+
+FOCUS = 180.0
+
+
+def _star(size: int) -> np.ndarray:
+    x, y = np.meshgrid(np.linspace(-1, 1, size), np.linspace(-1, 1, size))
+    return 1000.0 * (np.sin(24 * np.arctan2(y, x)) > 0) + 100.0
+
+
+def defocused_image(position: float, size: int = 96) -> np.ndarray:
+    """Image of a Siemens star, blurred more the further it is from the focus."""
+    return gaussian_filter(_star(size), sigma=0.3 + abs(position - FOCUS) / 4)
+
+
+def write_focus_scan(path: Path, positions: np.ndarray) -> None:
+    with h5py.File(path, 'w') as f:
+        entry = f.create_group('entry')
+        entry.attrs['NX_class'] = 'NXentry'
+        instrument = entry.create_group('instrument')
+        instrument.attrs['NX_class'] = 'NXinstrument'
+        detector = instrument.create_group('orca_detector')
+        detector.attrs['NX_class'] = 'NXdetector'
+        detector.attrs['axes'] = ['time', 'dim_1', 'dim_2']
+        detector.create_dataset(
+            'data',
+            data=np.stack([defocused_image(p) for p in positions]).astype('uint16'),
+        )
+        stage = instrument.create_group('camera_stage')
+        stage.attrs['NX_class'] = 'NXpositioner'
+        log = stage.create_group('position_setpoint')
+        log.attrs['NX_class'] = 'NXlog'
+        log.create_dataset('value', data=positions).attrs['units'] = 'mm'
+        log.create_dataset('time', data=np.arange(len(positions))).attrs['units'] = 's'
+
+
+@pytest.fixture
+def focus_scan(tmp_path: Path) -> tuple[Path, np.ndarray]:
+    positions = np.linspace(150.0, 210.0, 21)
+    path = tmp_path / 'focus.hdf'
+    write_focus_scan(path, positions)
+    return path, positions
+
+
+def test_estimate_focus_point_weighted_mean_of_top_quartile() -> None:
+    sharp = sc.DataArray(
+        sc.array(dims=['position'], values=[1.0, 2.0, 3.0, 8.0, 4.0, 2.0, 1.0, 0.5]),
+        coords={'position': sc.arange('position', 8.0, unit='mm')},
+    )
+    focus = img.tools.estimate_focus_point(sharp)
+    assert sc.allclose(focus, sc.scalar((8 * 3 + 4 * 4) / 12, unit='mm'))
+
+
+@pytest.mark.parametrize('frames_per_chunk', [1, 4, 50])
+def test_stream_sharpness_matches_sharpness_of_full_stack(
+    focus_scan, frames_per_chunk
+) -> None:
+    path, positions = focus_scan
+    result = img.tools.stream_sharpness(
+        path,
+        dims=('dim_1', 'dim_2'),
+        frames_per_chunk=frames_per_chunk,
+        max_size=48,
+        max_workers=2,
+    )
+    images = sc.DataArray(
+        sc.array(
+            dims=['position', 'dim_1', 'dim_2'],
+            values=np.stack([defocused_image(p) for p in positions]).astype('int32'),
+        )
+    )
+    expected = img.tools.sharpness(images, dims=('dim_1', 'dim_2'), max_size=48)
+    sharp = result['sharpness']
+    assert sc.identical(sharp.data, expected.data)
+    assert sc.identical(
+        sharp.coords['position'],
+        sc.array(dims=['position'], values=positions, unit='mm'),
+    )
+    assert abs(result['focus_point'].value - FOCUS) < 3.0
+    assert result['focus_point'].unit == 'mm'
+
+
+def test_stream_sharpness_without_positions_uses_frame_index(focus_scan) -> None:
+    path, positions = focus_scan
+    result = img.tools.stream_sharpness(path, dims=('dim_1', 'dim_2'), position=None)
+    assert sc.identical(
+        result['sharpness'].coords['position'],
+        sc.arange('position', len(positions)),
+    )
+
+
+@pytest.mark.parametrize('focus', [153.0, 180.0, 181.7, 207.5])
+def test_find_focus_converges_with_few_acquisitions(focus) -> None:
+    positions = []
+
+    def acquire(position: sc.Variable) -> sc.Variable:
+        positions.append(position.value)
+        return sc.array(
+            dims=['dim_1', 'dim_2'],
+            values=defocused_image(position.value - focus + FOCUS),
+        )
+
+    result = img.tools.find_focus(
+        acquire,
+        bounds=(sc.scalar(150.0, unit='mm'), sc.scalar(210.0, unit='mm')),
+        dims=('dim_1', 'dim_2'),
+        tolerance=sc.scalar(0.5, unit='mm'),
+    )
+    assert abs(result['focus_point'].value - focus) < 0.5
+    assert result['focus_point'].unit == 'mm'
+    # A dense scan with the same precision needs 120 images
+    assert len(positions) < 20
+    assert result['sharpness'].sizes == {'position': len(set(positions))}
+    assert np.all(np.diff(result['sharpness'].coords['position'].values) > 0)
+
+
+def test_find_focus_respects_max_acquisitions() -> None:
+    count = 0
+
+    def acquire(position: sc.Variable) -> sc.DataArray:
+        nonlocal count
+        count += 1
+        return sc.DataArray(
+            sc.array(dims=['y', 'x'], values=defocused_image(position.value))
+        )
+
+    result = img.tools.find_focus(
+        acquire,
+        bounds=(sc.scalar(0.15, unit='m'), sc.scalar(0.21, unit='m')),
+        dims=('x', 'y'),
+        tolerance=sc.scalar(1e-6, unit='mm'),
+        max_acquisitions=8,
+    )
+    assert count == 8
+    assert result['focus_point'].unit == 'm'
+
+
+def focus_series(positions: np.ndarray) -> sc.DataArray:
+    return sc.DataArray(
+        sc.array(
+            dims=['position', 'y', 'x'],
+            values=np.stack([defocused_image(p) for p in positions]),
+            unit='counts',
+        ),
+        coords={'position': sc.array(dims=['position'], values=positions, unit='mm')},
+    )
+
+
+def test_focus_metrics_all_peak_at_focus() -> None:
+    positions = np.linspace(160.0, 200.0, 9)
+    result = img.tools.focus_metrics(focus_series(positions), dims=('x', 'y'))
+    assert set(result) == set(img.tools.focus.FOCUS_METRICS)
+    for name, metric in result.items():
+        assert metric.dims == ('position',), name
+        assert metric.coords['position'].values[np.argmax(metric.values)] == FOCUS
+    assert result['tenengrad'].unit == 'counts**2'
+    assert result['fft_high_frequency'].unit == sc.units.one
+
+
+def test_focus_metrics_match_direct_computation() -> None:
+    rng = np.random.default_rng(1)
+    values = rng.uniform(1, 2, (3, 12, 10))
+    image = sc.array(dims=['t', 'y', 'x'], values=values)
+    result = img.tools.focus_metrics(image, dims=('y', 'x'), chunk_size=2)
+    for t, frame in enumerate(values):
+        gy = sobel(frame, axis=0)[1:-1, 1:-1]
+        gx = sobel(frame, axis=1)[1:-1, 1:-1]
+        np.testing.assert_allclose(
+            result['tenengrad'].values[t], (gx**2 + gy**2).mean()
+        )
+        brenner = ((frame[2:] - frame[:-2]) ** 2).mean() + (
+            (frame[:, 2:] - frame[:, :-2]) ** 2
+        ).mean()
+        np.testing.assert_allclose(result['brenner'].values[t], brenner)
+        np.testing.assert_allclose(
+            result['normalized_variance'].values[t], frame.var(ddof=1) / frame.mean()
+        )
+    assert sc.identical(
+        result['laplacian'], img.tools.sharpness(image, dims=('y', 'x'), max_size=None)
+    )
+
+
+def test_focus_metrics_roi_and_selection() -> None:
+    da = focus_series(np.array([170.0, 180.0]))
+    roi = {'x': slice(10, 40), 'y': slice(20, 60)}
+    result = img.tools.focus_metrics(da, dims=('x', 'y'), metrics=['brenner'], roi=roi)
+    assert set(result) == {'brenner'}
+    expected = img.tools.focus_metrics(
+        da['x', 10:40]['y', 20:60], dims=('x', 'y'), metrics=['brenner']
+    )
+    assert sc.identical(result['brenner'], expected['brenner'])
+    with pytest.raises(ValueError, match='Unknown focus metrics'):
+        img.tools.focus_metrics(da, dims=('x', 'y'), metrics=['sharp'])
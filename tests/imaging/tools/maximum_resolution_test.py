@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+
+from ess.imaging.tools import maximum_resolution_frontier
+from ess.imaging.tools.resolution import _OccupancyCounter
+
+
+@pytest.mark.parametrize('discrete', [False, True])
+@pytest.mark.parametrize(('nx', 'ny'), [(2, 2), (5, 9), (17, 4), (40, 40)])
+def test_occupancy_counts_match_binning(nx, ny, discrete):
+    rng = np.random.default_rng(nx * ny)
+    n = 5000
+    x = rng.uniform(-0.1, 1.1, n)
+    y = rng.uniform(0, 1, n)
+    if discrete:
+        # Events at the centers of the pixels of a detector
+        x = (np.floor(x * 64) + 0.5) / 64
+        y = (np.floor(y * 48) + 0.5) / 48
+    events = sc.DataArray(
+        sc.ones(dims=['events'], shape=(n,)),
+        coords={
+            'x': sc.array(dims=['events'], values=x, unit='m'),
+            'y': sc.array(dims=['events'], values=y, unit='m'),
+            't': sc.array(dims=['events'], values=rng.uniform(0, 3, n), unit='s'),
+        },
+    )
+    time_edges = sc.array(dims=['t'], values=[0.0, 0.5, 2.0, 2.5], unit='s')
+    counter = _OccupancyCounter(
+        events,
+        sc.linspace('x', 0, 100, 2, unit='cm'),
+        sc.linspace('y', 0, 1, 2, unit='m'),
+        time_edges,
+    )
+    assert (counter.cumulative is not None) == discrete
+    expected = events.bin(
+        t=time_edges,
+        x=sc.linspace('x', 0, 1, nx, unit='m'),
+        y=sc.linspace('y', 0, 1, ny, unit='m'),
+    )
+    assert counter.min_counts(nx, ny) == expected.bins.size().min().value
+
+
+def test_occupancy_counts_from_cumulative_counts_match_event_counts():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    events = sc.DataArray(
+        sc.ones(dims=['events'], shape=(n,)),
+        coords={
+            'x': sc.array(dims=['events'], values=rng.integers(0, 200, n) / 200),
+            'y': sc.array(dims=['events'], values=rng.integers(0, 150, n) / 150),
+            't': sc.array(dims=['events'], values=rng.uniform(0, 1, n)),
+        },
+    )
+    args = (
+        events,
+        sc.linspace('x', 0, 1, 2),
+        sc.linspace('y', 0, 1, 2),
+        sc.linspace('t', 0, 1, 3),
+    )
+    cumulative = _OccupancyCounter(*args)
+    per_event = _OccupancyCounter(*args, max_cells=0)
+    assert cumulative.cumulative is not None
+    assert per_event.cumulative is None
+    for nx, ny in [(2, 2), (3, 7), (11, 5), (21, 16), (50, 60), (201, 151)]:
+        assert cumulative.min_counts(nx, ny) == per_event.min_counts(nx, ny)
+
+
+def test_frontier_is_close_to_exhaustive_search():
+    rng = np.random.default_rng(3)
+    n = 3000
+    # Anisotropic detector with many more events per unit length along x
+    events = sc.DataArray(
+        sc.ones(dims=['events'], shape=(n,)),
+        coords={
+            'x': sc.array(dims=['events'], values=rng.random(n) * 0.2),
+            'y': sc.array(dims=['events'], values=rng.random(n)),
+            't': sc.ones(dims=['events'], shape=(n,)),
+        },
+    )
+    args = (
+        events,
+        sc.linspace('x', 0, 0.2, 2),
+        sc.linspace('y', 0, 1, 2),
+        sc.linspace('t', 0, 2, 2),
+    )
+    frontier = maximum_resolution_frontier(*args, max_pixels_x=60, max_pixels_y=60)
+    counter = _OccupancyCounter(*args)
+    achievable = {
+        (nx, ny)
+        for nx in range(2, 62)
+        for ny in range(2, 62)
+        if counter.min_counts(nx, ny) > 0
+    }
+    result = list(
+        zip(frontier.coords['nx'].values, frontier.coords['ny'].values, strict=True)
+    )
+    # A finer resolution is occasionally achievable where a coarser one is not,
+    # so the bisection may miss some points, but not the best ones.
+    assert all(p in achievable for p in result)
+    assert np.all(np.diff(frontier.coords['nx'].values) > 0)
+    assert np.all(np.diff(frontier.coords['ny'].values) < 0)
+    best = max(achievable, key=lambda p: (p[0] - 1) * (p[1] - 1))
+    assert frontier.max().value >= 0.9 * (best[0] - 1) * (best[1] - 1)
+
+
+def test_frontier_has_no_dominated_points():
+    rng = np.random.default_rng(0)
+    n = 200_000
+    events = sc.DataArray(
+        sc.ones(dims=['events'], shape=(n,)),
+        coords={
+            'x': sc.array(dims=['events'], values=rng.random(n) ** 2),
+            'y': sc.array(dims=['events'], values=rng.random(n)),
+            't': sc.ones(dims=['events'], shape=(n,)),
+        },
+    )
+    frontier = maximum_resolution_frontier(
+        events,
+        sc.linspace('x', 0, 1, 2),
+        sc.linspace('y', 0, 1, 2),
+        sc.linspace('t', 0, 2, 2),
+        max_pixels_x=300,
+        max_pixels_y=300,
+    )
+    assert len(frontier) > 10
+    assert np.all(np.diff(frontier.coords['nx'].values) > 0)
+    assert np.all(np.diff(frontier.coords['ny'].values) < 0)
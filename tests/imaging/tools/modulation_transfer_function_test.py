@@ -2,13 +2,19 @@ import numpy as np
 import pytest
 import scipp as sc
 from scipp.testing import assert_allclose
+from scipy.ndimage import gaussian_filter
 from scipy.signal import fftconvolve
+from scipy.special import ndtr
 
 from ess.imaging import data
 from ess.imaging.tools import (
+    cut_off_frequency_map,
+    estimate_cut_off_frequencies,
     estimate_cut_off_frequency,
+    local_modulation_transfer_function,
     modulation_transfer_function,
     mtf_less_than,
+    slanted_edge_mtf,
 )
 
 
@@ -114,3 +120,171 @@ def test_modulation_transfer_function_ideal_case(xlims, ylims):
     assert_allclose(
         estimate_cut_off_frequency(mtf), sc.scalar(f_c), rtol=sc.scalar(5e-2)
     )
+
+
+@pytest.mark.parametrize('stacked_open_beam', [False, True])
+def test_modulation_transfer_function_of_stack_matches_single_images(
+    stacked_open_beam,
+):
+    rng = np.random.default_rng(1)
+    target = create_star((128, 96), 64, 48, 36)
+    images = sc.DataArray(
+        sc.array(
+            dims=['y', 'position', 'x'],
+            values=rng.uniform(0.5, 1.5, (128, 5, 96)),
+            unit='counts',
+        ),
+        coords={'position': sc.arange('position', 5.0, unit='mm')},
+    )
+    ob = sc.DataArray(
+        sc.array(dims=['y', 'x'], values=rng.uniform(0.5, 1.5, (128, 96)))
+    )
+    if stacked_open_beam:
+        ob = ob * sc.arange('position', 1.0, 6.0)
+    ob.unit = 'counts'
+
+    mtf = modulation_transfer_function(
+        images, ob, target, dims=('y', 'x'), chunk_size=2
+    )
+    assert mtf.dims == ('position', 'frequency')
+    assert sc.identical(mtf.coords['position'], images.coords['position'])
+    for i in range(5):
+        single = modulation_transfer_function(
+            images['position', i].drop_coords('position'),
+            ob['position', i] if stacked_open_beam else ob,
+            target,
+        )
+        assert_allclose(mtf['position', i].drop_coords('position'), single)
+
+
+def slanted_edge(shape, angle, sigma, transpose=False):
+    '''Image of an edge tilted by ``angle`` degrees, blurred by a Gaussian.'''
+    y, x = np.indices(shape) + 0.5
+    t = np.deg2rad(angle)
+    d = (x - shape[1] / 2) * np.cos(t) - (y - shape[0] / 2) * np.sin(t)
+    values = 100 + 900 * ndtr(d / sigma)
+    values += np.random.default_rng(0).normal(0, 2, shape)
+    return sc.DataArray(
+        sc.array(dims=('y', 'x'), values=values.T if transpose else values)
+    )
+
+
+@pytest.mark.parametrize(
+    ('angle', 'sigma', 'transpose'),
+    [(5, 1.0, False), (-8, 1.5, True), (3, 0.7, False)],
+)
+def test_slanted_edge_mtf_of_gaussian_blur(angle, sigma, transpose):
+    image = slanted_edge((60, 50), angle, sigma, transpose)
+    mtf = slanted_edge_mtf(image)
+    f = mtf.coords['frequency'].values
+    assert f.max() <= 0.5
+    expected = np.exp(-2 * np.pi**2 * sigma**2 * f**2)
+    np.testing.assert_allclose(mtf.values[f < 0.35], expected[f < 0.35], atol=0.02)
+    assert_allclose(
+        mtf_less_than(mtf, 0.5),
+        sc.scalar((np.log(2) / 2) ** 0.5 / np.pi / sigma),
+        atol=sc.scalar(0.03),
+    )
+
+
+def test_slanted_edge_mtf_roi():
+    image = slanted_edge((200, 200), 4, 1.0)
+    roi = {'y': slice(70, 130), 'x': slice(75, 125)}
+    assert_allclose(
+        slanted_edge_mtf(image, roi=roi),
+        slanted_edge_mtf(image['y', 70:130]['x', 75:125]),
+    )
+    with pytest.raises(ValueError, match='too small'):
+        slanted_edge_mtf(image, roi={'x': slice(98, 102)})
+
+
+def test_cut_off_frequency_map_resolves_blur_across_field_of_view():
+    N = 300
+    target = create_star((N, N), 2 * N / 2, 2 * N / 2, 135)
+    values = target.values.astype('float64')
+    # The left half of the detector is more blurred than the right half
+    image = np.concatenate(
+        [
+            gaussian_filter(values, 3)[:, : N // 2],
+            gaussian_filter(values, 1)[:, N // 2 :],
+        ],
+        axis=1,
+    )
+    image = sc.DataArray(
+        sc.array(dims=('y', 'x'), values=image),
+        coords={'x': sc.arange('x', float(N), unit='mm')},
+    )
+    ob = sc.DataArray(sc.ones(dims=('y', 'x'), shape=(N, N)))
+    sizes = {'y': 64, 'x': 64}
+
+    mtf = local_modulation_transfer_function(image, ob, target, sizes)
+    assert mtf.sizes['y'] == 4
+    assert mtf.sizes['x'] == 4
+    assert_allclose(
+        mtf.coords['x'],
+        sc.array(dims=['x'], values=[31.5, 95.5, 159.5, 223.5], unit='mm'),
+    )
+    single = modulation_transfer_function(
+        image['y', 64:128]['x', 128:192].drop_coords('x'),
+        ob['y', 64:128]['x', 128:192],
+        target['y', 64:128]['x', 128:192],
+    )
+    assert_allclose(mtf['y', 1]['x', 2].drop_coords('x'), single)
+
+    fc = cut_off_frequency_map(image, ob, target, sizes)
+    assert fc.dims == ('y', 'x')
+    assert sc.identical(fc.coords['x'], mtf.coords['x'])
+    for y in range(4):
+        for x in range(4):
+            assert_allclose(
+                fc['y', y]['x', x].data,
+                estimate_cut_off_frequency(mtf['y', y]['x', x]),
+            )
+    assert (fc['x', :2].max() < fc['x', 2:].min()).value
+
+
+def noisy_mtf_curves(cut_off, noise, nfrequency=60):
+    rng = np.random.default_rng(2)
+    frequency = np.linspace(0, 0.5, nfrequency)
+    values = np.clip(1 - frequency / cut_off[..., None], 0, None)
+    values += rng.normal(0, noise, values.shape)
+    return sc.DataArray(
+        sc.array(dims=['time', 'tile', 'frequency'], values=values),
+        coords={
+            'frequency': sc.array(dims=['frequency'], values=frequency),
+            'time': sc.arange('time', float(cut_off.shape[0]), unit='s'),
+        },
+    )
+
+
+def test_estimate_cut_off_frequencies_matches_single_curves():
+    rng = np.random.default_rng(1)
+    mtf = noisy_mtf_curves(rng.uniform(0.05, 0.6, (4, 50)), noise=0.1)
+    mtf = mtf.transpose(['frequency', 'tile', 'time'])
+    mtf.masks['bad'] = sc.arange('tile', 50) == 3
+    fc = estimate_cut_off_frequencies(mtf)
+    assert fc.dims == ('tile', 'time')
+    assert sc.identical(fc.coords['time'], mtf.coords['time'])
+    assert sc.identical(fc.masks['bad'], mtf.masks['bad'])
+    for t in range(4):
+        for i in range(50):
+            assert_allclose(
+                fc['time', t]['tile', i].data,
+                estimate_cut_off_frequency(mtf['time', t]['tile', i]),
+            )
+
+
+def test_estimate_cut_off_frequencies_ignores_masked_and_invalid_values():
+    mtf = noisy_mtf_curves(np.full((2, 3), 0.3), noise=0.0)
+    expected = estimate_cut_off_frequencies(mtf)
+    mtf.values[0, 0, 10] = np.nan
+    mtf.values[0, 1, 20] = 100.0
+    mtf.masks['outlier'] = (sc.arange('frequency', 60) == 20) & (
+        sc.arange('tile', 3) == 1
+    )
+    mtf.values[1, 2] = np.nan
+    fc = estimate_cut_off_frequencies(mtf)
+    assert 'outlier' not in fc.masks
+    assert_allclose(fc['time', 0], expected['time', 0], rtol=sc.scalar(1e-3))
+    assert_allclose(fc['time', 1]['tile', :2], expected['time', 1]['tile', :2])
+    assert np.isnan(fc.values[1, 2])
@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import gc
+
+import numpy as np
+import pytest
+import scipp as sc
+from scipp.testing import assert_allclose, assert_identical
+
+from ess import imaging as img
+
+
+@pytest.fixture
+def stack() -> sc.DataArray:
+    rng = np.random.default_rng(8)
+    return sc.DataArray(
+        sc.array(
+            dims=['time', 'y', 'x'],
+            values=rng.uniform(0, 100, (3, 70, 64)),
+            unit='counts',
+        ),
+        coords={
+            'time': sc.arange('time', 3.0, unit='s'),
+            'position': sc.vectors(
+                dims=['y', 'x'], values=rng.standard_normal((70, 64, 3)), unit='m'
+            ),
+        },
+    )
+
+
+@pytest.mark.parametrize('cache', [False, True])
+def test_pyramid_levels_match_repeated_resample(stack, tmp_path, cache) -> None:
+    pyramid = img.tools.ImagePyramid(
+        stack, dims=('x', 'y'), min_size=8, cache_dir=tmp_path if cache else None
+    )
+    assert len(pyramid) == 4
+    assert pyramid.sizes(3) == {'time': 3, 'y': 8, 'x': 8}
+    expected = stack
+    for level in range(1, 4):
+        size = {dim: pyramid.sizes(level)[dim] * 2 for dim in ('x', 'y')}
+        expected = img.tools.resample(
+            expected['x', : size['x']]['y', : size['y']],
+            sizes={'x': 2, 'y': 2},
+            method='mean',
+        )
+        result = pyramid.level(level)
+        assert_allclose(result.data, expected.data)
+        assert_allclose(result.coords['position'], expected.coords['position'])
+        assert_identical(result.coords['time'], stack.coords['time'])
+    assert len(list(tmp_path.glob('*/level-3-values.npy'))) == cache
+
+
+def test_pyramids_can_share_cache_dir(stack, tmp_path) -> None:
+    first = img.tools.ImagePyramid(stack, dims=('x', 'y'), cache_dir=tmp_path)
+    second = img.tools.ImagePyramid(stack * 2, dims=('x', 'y'), cache_dir=tmp_path)
+    expected = first.level(1).copy()
+    assert_allclose(second.level(1).data, 2 * expected.data)
+    assert_identical(first.level(1), expected)
+    assert len(list(tmp_path.glob('*/level-1-values.npy'))) == 2
+
+
+def test_pyramid_removes_its_cache_files(stack, tmp_path) -> None:
+    with img.tools.ImagePyramid(stack, dims=('x', 'y'), cache_dir=tmp_path) as first:
+        expected = first.level(2).copy()
+        assert len(list(tmp_path.iterdir())) == 1
+    assert not list(tmp_path.iterdir())
+    # Levels are recomputed in memory after closing
+    assert_identical(first.level(2), expected)
+    assert not list(tmp_path.iterdir())
+
+    second = img.tools.ImagePyramid(stack, dims=('x', 'y'), cache_dir=tmp_path)
+    second.level(1)
+    assert len(list(tmp_path.iterdir())) == 1
+    del second
+    gc.collect()
+    assert not list(tmp_path.iterdir())
+
+
+def test_pyramid_window_maps_full_resolution_region_to_level(stack) -> None:
+    pyramid = img.tools.ImagePyramid(stack, dims=('x', 'y'), method='sum')
+    region = {'x': slice(10, 30), 'y': slice(5, 40), 'time': slice(1, 2)}
+    window = pyramid.window(2, region)
+    assert_identical(window, pyramid.level(2)['x', 2:8]['y', 1:10]['time', 1:2])
+    assert_identical(
+        pyramid.window(0, region), stack['x', 10:30]['y', 5:40]['time', 1:2]
+    )
+
+
+def test_pyramid_window_does_not_use_full_resolution_once_computed(stack) -> None:
+    pyramid = img.tools.ImagePyramid(stack, dims=('x', 'y'))
+    expected = pyramid.level(2).copy()
+    stack.values[...] = 0.0
+    assert_identical(pyramid.level(2), expected)
+    assert_identical(pyramid.window(2, {'x': slice(0, 16)}), pyramid.level(2)['x', :4])
+
+
+def test_pyramid_level_out_of_range_raises(stack) -> None:
+    pyramid = img.tools.ImagePyramid(stack, dims=('x', 'y'), min_size=32)
+    assert len(pyramid) == 2
+    with pytest.raises(IndexError, match='out of range'):
+        pyramid.level(2)
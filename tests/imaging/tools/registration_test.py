@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+from scipy.ndimage import fourier_shift, gaussian_filter
+
+from ess import imaging as img
+
+
+def drifting_stack(
+    shifts: np.ndarray, size: int = 128, periodic: bool = False
+) -> sc.DataArray:
+    rng = np.random.default_rng(4)
+    if periodic:
+        scene = gaussian_filter(rng.uniform(0, 1, (size, size)), 1.5, mode='wrap')
+        crop = slice(None)
+    else:
+        # Crop the shifted images from a larger scene, so that they are not periodic
+        scene = gaussian_filter(rng.uniform(0, 1, (2 * size, 2 * size)), 1.5)
+        crop = slice(size // 2, size // 2 + size)
+    frames = [
+        np.fft.ifft2(fourier_shift(np.fft.fft2(scene), shift)).real[crop, crop]
+        for shift in shifts
+    ]
+    return sc.DataArray(
+        sc.array(dims=['time', 'y', 'x'], values=np.stack(frames), unit='counts'),
+        coords={'time': sc.arange('time', float(len(shifts)), unit='s')},
+    )
+
+
+@pytest.fixture
+def shifts() -> np.ndarray:
+    rng = np.random.default_rng(9)
+    return rng.uniform(-4, 4, (25, 2))
+
+
+@pytest.mark.parametrize('window', [True, False])
+def test_estimate_shifts_recovers_subpixel_drift(shifts, window) -> None:
+    # Without a window, phase correlation is only accurate for periodic images
+    stack = drifting_stack(shifts, periodic=not window)
+    reference = drifting_stack(np.zeros((1, 2)), periodic=not window)['time', 0]
+    result = img.tools.estimate_shifts(
+        stack, dims=('y', 'x'), reference=reference, window=window, chunk_size=7
+    )
+    assert set(result) == {'y', 'x'}
+    assert sc.identical(result['y'].coords['time'], stack.coords['time'])
+    np.testing.assert_allclose(result['y'].values, shifts[:, 0], atol=0.1)
+    np.testing.assert_allclose(result['x'].values, shifts[:, 1], atol=0.1)
+
+
+def test_estimate_shifts_defaults_to_first_frame(shifts) -> None:
+    stack = drifting_stack(shifts)
+    result = img.tools.estimate_shifts(stack, dims=('y', 'x'))
+    assert abs(result['x'].values[0]) < 1e-6
+    np.testing.assert_allclose(
+        result['x'].values, shifts[:, 1] - shifts[0, 1], atol=0.1
+    )
+
+
+def test_apply_shifts_aligns_stack(shifts) -> None:
+    stack = drifting_stack(shifts)
+    reference = drifting_stack(np.zeros((1, 2)))['time', 0]
+    estimated = img.tools.estimate_shifts(stack, dims=('y', 'x'), reference=reference)
+    aligned = img.tools.apply_shifts(stack.transpose(['y', 'time', 'x']), estimated)
+    assert aligned.dims == ('y', 'time', 'x')
+    # Pixels near the edges wrap around, compare the interior
+    interior = (slice(None), slice(8, -8), slice(8, -8))
+    residual = aligned.transpose(['time', 'y', 'x']).values - reference.values
+    assert np.abs(residual[interior]).std() < 0.05 * reference.values.std()
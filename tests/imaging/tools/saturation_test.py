@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+
+from ess.imaging.tools import (
+    IncrementalSaturationIndicator,
+    saturation_indicator,
+    saturation_map,
+)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('noise_floor', [0, 1, 10, 100])
+def test_randomized_saturation_indicator_matches_full_decomposition(
+    intensity_as_function_of_gain_and_wavelength,
+):
+    intensity = intensity_as_function_of_gain_and_wavelength
+    indicator, gain = saturation_indicator(intensity)
+    randomized, randomized_gain = saturation_indicator(intensity, method='randomized')
+    assert sc.allclose(randomized.data, indicator.data, atol=sc.scalar(1e-3))
+    assert sc.identical(randomized_gain, gain)
+    with pytest.raises(ValueError, match='Unknown method'):
+        saturation_indicator(intensity, method='lanczos')
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('noise_floor', [0, 1, 10, 100])
+def test_incremental_saturation_indicator_matches_full_decomposition(
+    intensity_as_function_of_gain_and_wavelength,
+):
+    intensity = intensity_as_function_of_gain_and_wavelength
+    indicator, _ = saturation_indicator(intensity)
+
+    incremental = IncrementalSaturationIndicator(intensity.coords['wavelength'])
+    incremental.add(intensity['gain', :5])
+    for i in range(5, intensity.sizes['gain']):
+        incremental.add(intensity['gain', i])
+    assert len(incremental) == intensity.sizes['gain']
+    updated, updated_gain = incremental.compute()
+    assert sc.identical(updated.coords['gain'], indicator.coords['gain'])
+    assert sc.allclose(updated.data, indicator.data, atol=sc.scalar(0.05))
+    assert updated_gain < 100
+    assert updated_gain > 80
+
+
+def test_saturation_map_matches_saturation_indicator_of_every_region():
+    rng = np.random.default_rng(4)
+    wavelength = sc.linspace('wavelength', 2, 8.0, 200, unit='angstrom')
+    gains = sc.linspace('gain', 10, 200, 20)
+    profile = (wavelength - wavelength.min()) * (wavelength.max() - wavelength)
+    profile = profile.values
+    # Saturation sets in at lower gains in the center of the camera
+    saturation = np.array([[1000.0, 800.0, 1000.0], [600.0, 400.0, 600.0]])
+    true = gains.values[:, None] * profile[None, :]
+    values = np.minimum(true[..., None, None], saturation)
+    values += rng.normal(0, 1, values.shape)
+    intensity = sc.DataArray(
+        sc.array(dims=['gain', 'wavelength', 'y', 'x'], values=values),
+        coords={
+            'gain': gains,
+            'wavelength': wavelength,
+            'x': sc.arange('x', 3.0, unit='mm'),
+        },
+    )
+
+    indicator, max_gain = saturation_map(intensity.transpose(), threshold=0.8)
+    assert indicator.dims == ('x', 'y', 'gain')
+    assert max_gain.dims == ('x', 'y')
+    assert sc.identical(max_gain.coords['x'], intensity.coords['x'])
+    for y in range(2):
+        for x in range(3):
+            expected, expected_gain = saturation_indicator(
+                intensity['y', y]['x', x].drop_coords('x'), threshold=0.8
+            )
+            assert sc.allclose(
+                indicator['y', y]['x', x].data, expected.data, atol=sc.scalar(1e-6)
+            )
+            assert sc.identical(max_gain['y', y]['x', x].data, expected_gain)
+    assert (max_gain['y', 1] < max_gain['y', 0]).all().value
+    assert (max_gain['x', 1] < max_gain['x', 0]).all().value
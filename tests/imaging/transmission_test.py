@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2025 Scipp contributors (https://github.com/scipp)
+import numpy as np
+import pytest
+import scipp as sc
+from scipp.testing import assert_allclose, assert_identical
+
+from ess import odin
+from ess.imaging.transmission import (
+    histogram_wavelength_cube,
+    histogram_wavelength_spectrum,
+)
+from ess.imaging.types import (
+    CorrectedDetector,
+    OpenBeamRun,
+    SampleRun,
+    SuperPixelSizes,
+    TransmissionCube,
+    TransmissionSpectrum,
+    WavelengthBins,
+)
+
+
+def make_detector(seed: int, nevents: int = 20_000) -> sc.DataArray:
+    rng = np.random.default_rng(seed)
+    events = sc.DataArray(
+        sc.ones(dims=['event'], shape=[nevents], unit='counts', with_variances=True),
+        coords={
+            'wavelength': sc.array(
+                dims=['event'], values=rng.uniform(1.0, 9.0, nevents), unit='angstrom'
+            ),
+            'detector_number': sc.array(
+                dims=['event'], values=rng.integers(0, 64, nevents)
+            ),
+        },
+    )
+    da = events.group(sc.arange('detector_number', 64)).fold(
+        'detector_number', sizes={'x': 8, 'y': 8}
+    )
+    x, y = np.meshgrid(np.arange(8.0), np.arange(8.0), indexing='ij')
+    da.coords['position'] = sc.vectors(
+        dims=['x', 'y'], values=np.stack([x, y, np.zeros_like(x)], axis=-1), unit='m'
+    )
+    return da
+
+
+@pytest.fixture
+def wavelength_bins() -> sc.Variable:
+    return sc.linspace('wavelength', 1.0, 9.0, 41, unit='angstrom')
+
+
+def test_wavelength_spectrum_matches_concatenated_histogram(wavelength_bins):
+    da = make_detector(seed=1)
+    da.masks['edge'] = da.coords['position'].fields.x == sc.scalar(0.0, unit='m')
+    da.bins.masks['short'] = da.bins.coords['wavelength'] < sc.scalar(
+        2.0, unit='angstrom'
+    )
+    spectrum = histogram_wavelength_spectrum(da, wavelength_bins)
+    expected = da.bins.concat().hist(wavelength=wavelength_bins)
+    assert_identical(spectrum.data, expected.data)
+
+
+def test_wavelength_cube_sums_super_pixels(wavelength_bins):
+    da = make_detector(seed=2)
+    cube = histogram_wavelength_cube(da, wavelength_bins, {'x': 4, 'y': 2})
+    assert cube.sizes == {'x': 2, 'y': 4, 'wavelength': 40}
+    expected = da['x', :4]['y', :2].bins.concat().hist(wavelength=wavelength_bins)
+    assert_allclose(cube['x', 0]['y', 0].data, expected.data)
+    assert_allclose(
+        cube.coords['position']['x', 0]['y', 0],
+        sc.vector([1.5, 0.5, 0.0], unit='m'),
+    )
+
+
+def test_wavelength_cube_without_super_pixels_keeps_resolution(wavelength_bins):
+    da = make_detector(seed=3)
+    cube = histogram_wavelength_cube(da, wavelength_bins, {})
+    assert_identical(cube, da.hist(wavelength=wavelength_bins))
+
+
+def test_bragg_edge_workflow_computes_transmission(wavelength_bins):
+    wf = odin.OdinBraggEdgeWorkflow()
+    sample = make_detector(seed=4)
+    open_beam = make_detector(seed=5)
+    wf[CorrectedDetector[SampleRun]] = sample
+    wf[CorrectedDetector[OpenBeamRun]] = open_beam
+    wf[WavelengthBins] = wavelength_bins
+    wf[SuperPixelSizes] = {'x': 2, 'y': 2}
+    results = wf.compute((TransmissionSpectrum, TransmissionCube))
+    assert_allclose(
+        results[TransmissionSpectrum].data,
+        (
+            sample.bins.concat().hist(wavelength=wavelength_bins)
+            / open_beam.bins.concat().hist(wavelength=wavelength_bins)
+        ).data,
+    )
+    assert results[TransmissionCube].sizes == {'x': 4, 'y': 4, 'wavelength': 40}
@@ -100,3 +100,52 @@ def test_can_compute_wavelength(workflow, bank_name):
     da = workflow.compute(WavelengthDetector[SampleRun])
 
     assert "wavelength" in da.bins.coords
+
+
+def test_compute_banks_matches_sequential_computation(
+    event_file_factory, identity_tof_lookup_table
+):
+    banks = ["bank0", "bank1", "bank2"]
+    wf = tbl.TblWorkflow()
+    wf[Filename[SampleRun]] = event_file_factory("banks.nxs", detector_names=banks)
+    wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+
+    results = tbl.compute_banks(
+        wf, banks, (RawDetector[SampleRun], WavelengthDetector[SampleRun])
+    )
+    assert isinstance(results[WavelengthDetector[SampleRun]], sc.DataGroup)
+    assert list(results[WavelengthDetector[SampleRun]]) == banks
+    for bank in banks:
+        wf[NeXusDetectorName] = bank
+        expected = wf.compute(WavelengthDetector[SampleRun])
+        assert sc.identical(
+            results[WavelengthDetector[SampleRun]][bank], expected, equal_nan=True
+        )
+    # Each bank has its own events
+    assert not sc.identical(
+        results[RawDetector[SampleRun]]["bank0"].bins.size(),
+        results[RawDetector[SampleRun]]["bank1"].bins.size(),
+    )
+
+
+def test_compute_banks_single_target_returns_data_group(
+    event_file_factory, identity_tof_lookup_table
+):
+    wf = tbl.TblWorkflow()
+    wf[Filename[SampleRun]] = event_file_factory("banks.nxs", detector_names=["a", "b"])
+    wf[TimeOfFlightLookupTable] = identity_tof_lookup_table
+    results = tbl.compute_banks(wf, ["a", "b"], TofDetector[SampleRun])
+    assert isinstance(results, sc.DataGroup)
+    assert set(results) == {"a", "b"}
+
+
+def test_compute_banks_without_banks_returns_empty_data_groups():
+    wf = tbl.TblWorkflow()
+    result = tbl.compute_banks(wf, [], TofDetector[SampleRun])
+    assert isinstance(result, sc.DataGroup)
+    assert len(result) == 0
+    results = tbl.compute_banks(
+        wf, [], (RawDetector[SampleRun], WavelengthDetector[SampleRun])
+    )
+    assert set(results) == {RawDetector[SampleRun], WavelengthDetector[SampleRun]}
+    assert all(len(group) == 0 for group in results.values())